@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Coroutine, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """
+    Fire-and-forget coroutines that stay referenced until they finish.
+
+    The event loop only holds weak references to tasks, so an unreferenced
+    one can be garbage-collected mid-flight, and its exception is never
+    seen. Tasks spawned here are kept in a set until done, then dropped;
+    failures are logged with the task name and counted.
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.spawned = 0
+        self.failed = 0
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        self.spawned += 1
+        return task
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.failed += 1
+            logger.error("Background task %s failed: %r", task.get_name(), error, exc_info=error)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def get_metrics(self) -> Dict:
+        return {'pending': len(self._tasks), 'spawned': self.spawned, 'failed': self.failed}
@@ -0,0 +1,169 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Supported bar timeframes (seconds)
+BAR_TIMEFRAMES = {'1s': 1, '5s': 5, '1m': 60, '5m': 300}
+
+
+@dataclass
+class Bar:
+    symbol: str
+    timeframe: str
+    start: float        # Epoch seconds of the bar open
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+    ticks: int = 0      # Ticks folded into the bar (0 = flat fill for an empty interval)
+
+
+def candle_to_bar(symbol: str, timeframe: str, candle: Dict) -> Bar:
+    """Hyperliquid candle snapshot entry -> Bar"""
+    return Bar(
+        symbol=symbol,
+        timeframe=timeframe,
+        start=candle['t'] / 1000,
+        open=float(candle['o']),
+        high=float(candle['h']),
+        low=float(candle['l']),
+        close=float(candle['c']),
+        volume=float(candle.get('v', 0)),
+        ticks=int(candle.get('n', 1))
+    )
+
+
+class BarAggregator:
+    """
+    Incremental OHLCV bars per symbol for a fixed set of timeframes.
+
+    Every tick updates the forming bar of each timeframe in O(1). A bar closes
+    on the first tick of a later interval; intervals that saw no ticks at all
+    (quiet market, reconnect) are filled with flat bars at the previous close,
+    so N bars always span the same wall-clock time.
+    """
+
+    def __init__(self, timeframes=tuple(BAR_TIMEFRAMES), history_length: int = 500):
+        self.timeframes = {timeframe: BAR_TIMEFRAMES[timeframe] for timeframe in timeframes}
+        self.history_length = history_length
+        self._forming: Dict[Tuple[str, str], Bar] = {}
+        self._bars: Dict[Tuple[str, str], deque] = {}
+        self._closes: Dict[Tuple[str, str], deque] = {}  # Parallel close series for the strategies
+        self._versions: Dict[Tuple[str, str], int] = {}
+
+        # Metrics
+        self.ticks_processed = 0
+        self.bars_closed = 0
+        self.bars_filled = 0
+        self.late_ticks = 0
+
+    def _series(self, key: Tuple[str, str]) -> deque:
+        if key not in self._bars:
+            self._bars[key] = deque(maxlen=self.history_length)
+            self._closes[key] = deque(maxlen=self.history_length)
+            self._versions[key] = 0
+        return self._bars[key]
+
+    def _append(self, key: Tuple[str, str], bar: Bar):
+        self._series(key).append(bar)
+        self._closes[key].append(bar.close)
+        self._versions[key] += 1
+
+    def update(self, symbol: str, price: float, timestamp: float, volume: float = 0.0) -> List[Bar]:
+        """Fold one tick into every timeframe; returns the bars it closed"""
+        self.ticks_processed += 1
+        closed = []
+        for timeframe, seconds in self.timeframes.items():
+            key = (symbol, timeframe)
+            start = timestamp - timestamp % seconds
+            bar = self._forming.get(key)
+
+            if bar is not None and start == bar.start:
+                if price > bar.high:
+                    bar.high = price
+                elif price < bar.low:
+                    bar.low = price
+                bar.close = price
+                bar.volume += volume
+                bar.ticks += 1
+                continue
+
+            if bar is not None:
+                if start < bar.start:
+                    self.late_ticks += 1
+                    continue
+                self._append(key, bar)
+                self.bars_closed += 1
+                closed.append(bar)
+
+                # Empty intervals become flat bars (capped at what the history can hold)
+                missing = int(round((start - bar.start) / seconds)) - 1
+                for i in range(max(0, missing - self.history_length), missing):
+                    fill_start = bar.start + (i + 1) * seconds
+                    flat = Bar(symbol, timeframe, fill_start, bar.close, bar.close, bar.close, bar.close)
+                    self._append(key, flat)
+                    self.bars_filled += 1
+                    closed.append(flat)
+
+            self._forming[key] = Bar(symbol, timeframe, start, price, price, price, price, volume, 1)
+        return closed
+
+    def seed(self, symbol: str, timeframe: str, bars: List[Bar]):
+        """Merge closed bars (candle bootstrap / gap backfill) into the series by start time"""
+        if not bars:
+            return
+        key = (symbol, timeframe)
+        merged = {bar.start: bar for bar in self._series(key)}
+        merged.update((bar.start, bar) for bar in bars)
+        ordered = [merged[start] for start in sorted(merged)][-self.history_length:]
+
+        self._bars[key].clear()
+        self._closes[key].clear()
+        self._bars[key].extend(ordered)
+        self._closes[key].extend(bar.close for bar in ordered)
+        self._versions[key] += 1
+
+        forming = self._forming.get(key)
+        if forming is not None and forming.start <= ordered[-1].start:
+            del self._forming[key]
+
+    def forget(self, symbol: str):
+        """Free every timeframe of a symbol that is no longer traded"""
+        for timeframe in self.timeframes:
+            key = (symbol, timeframe)
+            self._forming.pop(key, None)
+            self._bars.pop(key, None)
+            self._closes.pop(key, None)
+            self._versions.pop(key, None)
+
+    def closes(self, symbol: str, timeframe: str) -> List[float]:
+        """Closed-bar close prices, oldest first"""
+        return list(self._closes.get((symbol, timeframe), ()))
+
+    def bars(self, symbol: str, timeframe: str) -> List[Bar]:
+        return list(self._bars.get((symbol, timeframe), ()))
+
+    def bar_count(self, symbol: str, timeframe: str) -> int:
+        return len(self._bars.get((symbol, timeframe), ()))
+
+    def latest(self, symbol: str, timeframe: str) -> Optional[Bar]:
+        series = self._bars.get((symbol, timeframe))
+        return series[-1] if series else None
+
+    def forming(self, symbol: str, timeframe: str) -> Optional[Bar]:
+        return self._forming.get((symbol, timeframe))
+
+    def tip(self, symbol: str, timeframe: str) -> tuple:
+        """Changes whenever the closed series does (indicator cache key)"""
+        return (self._versions.get((symbol, timeframe), 0), self.bar_count(symbol, timeframe))
+
+    def get_metrics(self) -> Dict:
+        return {
+            'timeframes': list(self.timeframes),
+            'series': len(self._bars),
+            'ticks_processed': self.ticks_processed,
+            'bars_closed': self.bars_closed,
+            'bars_filled': self.bars_filled,
+            'late_ticks': self.late_ticks,
+        }
@@ -0,0 +1,109 @@
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class AdaptiveBatchScheduler:
+    """
+    Decides per symbol when the per-batch work (marking, exit checks) runs.
+
+    The batch size follows the observed tick rate so that filling a batch takes
+    about `latency_target` seconds: busy markets amortize the per-batch work
+    over many ticks, quiet ones process every tick. The p99 of the measured
+    queue delay (oldest pending tick -> processed) feeds back into a headroom
+    factor that shrinks batches whenever the target is missed. A stop trigger
+    nearby ('urgent') or a move of `move_threshold` since the last flush
+    ('move') flushes immediately regardless of batch size; a move resets the
+    reference price, so it fires once per move rather than once per tick.
+    """
+
+    def __init__(self, latency_target: float = 1.0, max_batch: int = 20, move_threshold: float = 0.002,
+                 rate_halflife: float = 30.0, window: int = 512):
+        self.latency_target = latency_target      # p99 queue delay budget (seconds)
+        self.max_batch = max_batch
+        self.move_threshold = move_threshold      # Relative move that skips batching
+        self.rate_halflife = rate_halflife        # Tick-rate EWMA half-life (seconds)
+        self.headroom = 1.0                       # Feedback factor on rate x target (0.1 - 1.0)
+
+        self._rate: Dict[str, float] = {}         # symbol -> ticks/second (EWMA)
+        self._last_tick: Dict[str, float] = {}
+        self._pending_since: Dict[str, float] = {}
+        self._pending: Dict[str, int] = {}
+        self._flush_price: Dict[str, float] = {}
+        self._delays = deque(maxlen=window)
+
+        # Metrics
+        self.flushes = 0
+        self.urgent_flushes = 0
+        self.move_flushes = 0
+        self.ticks_batched = 0
+
+    def forget(self, symbol: str):
+        for state in (self._rate, self._last_tick, self._pending_since, self._pending, self._flush_price):
+            state.pop(symbol, None)
+
+    def batch_size(self, symbol: str) -> int:
+        rate = self._rate.get(symbol, 0.0)
+        return max(1, min(self.max_batch, int(rate * self.latency_target * self.headroom)))
+
+    def on_tick(self, symbol: str, price: float, now: Optional[float] = None, urgent: bool = False) -> Optional[str]:
+        """Record a tick; 'urgent', 'move' or 'batch' when the symbol's batch should run now, else None"""
+        now = time.time() if now is None else now
+        last = self._last_tick.get(symbol)
+        if last is not None:
+            interval = max(now - last, 1e-3)
+            alpha = 1 - 0.5 ** (interval / self.rate_halflife)
+            self._rate[symbol] = self._rate.get(symbol, 1.0 / interval) * (1 - alpha) + alpha / interval
+        self._last_tick[symbol] = now
+
+        self._pending[symbol] = self._pending.get(symbol, 0) + 1
+        self._pending_since.setdefault(symbol, now)
+        self.ticks_batched += 1
+
+        reference = self._flush_price.get(symbol)
+        if reference and abs(price - reference) / reference >= self.move_threshold:
+            self.move_flushes += 1
+            return 'move'
+        if urgent:
+            self.urgent_flushes += 1
+            return 'urgent'
+        if (self._pending[symbol] >= self.batch_size(symbol) or
+                now - self._pending_since[symbol] >= self.latency_target):
+            return 'batch'
+        return None
+
+    def on_flush(self, symbol: str, price: float, now: Optional[float] = None):
+        """The symbol's batch was processed - record its queue delay and adapt"""
+        now = time.time() if now is None else now
+        since = self._pending_since.pop(symbol, None)
+        self._pending[symbol] = 0
+        self._flush_price[symbol] = price
+        if since is None:
+            return
+        self._delays.append(now - since)
+        self.flushes += 1
+
+        if self.flushes % 32 == 0:
+            p99 = self.queue_delay(99)
+            if p99 > self.latency_target:
+                self.headroom = max(0.1, self.headroom * 0.8)
+            elif p99 < self.latency_target / 2:
+                self.headroom = min(1.0, self.headroom * 1.05)
+
+    def queue_delay(self, percentile: float) -> float:
+        return float(np.percentile(self._delays, percentile)) if self._delays else 0.0
+
+    def get_metrics(self) -> Dict:
+        return {
+            'batch_sizes': {symbol: self.batch_size(symbol) for symbol in self._rate},
+            'tick_rates': {symbol: round(rate, 3) for symbol, rate in self._rate.items()},
+            'queue_delay_p50_ms': self.queue_delay(50) * 1000,
+            'queue_delay_p99_ms': self.queue_delay(99) * 1000,
+            'headroom': self.headroom,
+            'flushes': self.flushes,
+            'urgent_flushes': self.urgent_flushes,
+            'move_flushes': self.move_flushes,
+            'avg_batch': self.ticks_batched / self.flushes if self.flushes else 0.0,
+        }
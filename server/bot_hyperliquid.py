@@ -1,45 +1,61 @@
+# First import, so the startup report includes everything below
+from startup import STARTUP
 import asyncio
-import websockets
-import json
 import numpy as np
-import pandas as pd
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import logging
 from collections import deque
 import pickle
 import os
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error
 import math
-from hyperliquid.info import Info
-from hyperliquid.exchange import Exchange
-from hyperliquid.utils import constants
-from eth_account import Account
 import time
-import statistics
+from rest_client import HyperliquidRestClient, RateLimitExceeded
+from ws_feed import RedundantWebsocketFeed
+from state_store import StateSnapshotStore
+from trade_journal import TradeJournal
+from performance_analytics import PerformanceAnalytics
+from state_stream import StateStream
+from runtime_config import (RUNTIME_KEYS, ConfigControl, ConfigWatcher, load_runtime_config,
+                            validate_runtime_config)
+from fill_tracker import FillTracker, parse_order_status
+from background import BackgroundTasks
+from logging_setup import configure_logging
+from market_bus import IndicatorCache, MarketDataBus, load_fleet_config
+from bar_aggregator import BAR_TIMEFRAMES, BarAggregator, candle_to_bar
+from tiered_history import TieredPriceHistory
+from batch_scheduler import AdaptiveBatchScheduler
+from conflation import LatestValueSlots
+from order_state import IN_FLIGHT, OPENING, OrderStateMachine
+from regime import RANGING, TRENDING, VOLATILE, RegimeClassifier
+from portfolio_risk import EWCovariance
+from risk_engine import MonteCarloRiskEngine
+from loop_watchdog import LoopWatchdog
+from profiler import ProfilingControl, estimate_container_size, estimate_size
+from sim_exchange import PaperInfo, SimulatedExchange
 
-# Configure logging with UTF-8 encoding for Windows
 import sys
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('hyperliquid_advanced_bot.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+import threading
 
-# Set console to handle UTF-8 on Windows
-if sys.platform == 'win32':
-    try:
-        import locale
-        locale.setlocale(locale.LC_ALL, 'en_US.UTF-8')
-    except:
-        pass
+# Logging goes through a queue to a background writer thread (never blocks the loop) - configured in main
+# Set JSON_LOG_FILE (e.g. 'hyperliquid_advanced_bot.jsonl') for a structured sink
+JSON_LOG_FILE = None
 logger = logging.getLogger(__name__)
+STARTUP.mark("imports")
+
+# Hyperliquid candle intervals used for warm-start / gap backfill
+CANDLE_INTERVAL_SECONDS = {'1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800, '1h': 3600}
+
+def preload_sdk():
+    """
+    Import the Hyperliquid SDK and eth_account (~0.5s). Nothing imports them
+    at module level - the exchange gateway does on first use - so replays and
+    tests never pay for them; main() warms them in a thread during setup.
+    """
+    import eth_account  # noqa: F401
+    import hyperliquid.exchange  # noqa: F401
+    import hyperliquid.info  # noqa: F401
 
 @dataclass
 class MarketData:
@@ -71,6 +87,7 @@ class Position:
     current_price: float
     unrealized_pnl: float
     timestamp: datetime
+    strategy: str = ""
 
 class AdvancedMathematicalModels:
     """
@@ -268,6 +285,10 @@ class MachineLearningEngine:
         if len(features_history) < 10:
             return
         
+        # sklearn costs ~1s to import - only the ML path pays for it
+        from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+        
         X = np.array(features_history)
         y = np.array(targets)
         
@@ -293,7 +314,7 @@ class MachineLearningEngine:
         # Save models
         self.save_models()
         
-        logger.info(f"Trained ML models for {symbol} with {len(features_history)} samples")
+        logger.info("Trained ML models for %s with %s samples", symbol, len(features_history))
     
     def predict(self, symbol: str, features: np.array) -> Tuple[float, float]:
         """Predict price movement and confidence"""
@@ -318,7 +339,7 @@ class MachineLearningEngine:
             
             return prediction, confidence
         except Exception as e:
-            logger.error(f"ML prediction error for {symbol}: {e}")
+            logger.error("ML prediction error for %s: %s", symbol, e)
             return 0.0, 0.0
     
     def update_performance(self, symbol: str, predicted: float, actual: float):
@@ -335,7 +356,7 @@ class MachineLearningEngine:
             overall_error = np.mean(list(self.performance_history[symbol]))
             
             if recent_error > overall_error * 1.5:
-                logger.info(f"Performance degraded for {symbol}, scheduling retrain")
+                logger.info("Performance degraded for %s, scheduling retrain", symbol)
                 # Could trigger retraining here
     
     def save_models(self):
@@ -348,7 +369,7 @@ class MachineLearningEngine:
                     'performance_history': dict(self.performance_history)
                 }, f)
         except Exception as e:
-            logger.error(f"Error saving models: {e}")
+            logger.error("Error saving models: %s", e)
     
     def load_models(self):
         """DISABLED - Using simple momentum strategy instead"""
@@ -364,36 +385,56 @@ class HyperliquidAdvancedBot:
         self.symbols = ["BTC", "ETH", "SOL"]  
         self.stop_loss_pct = 0.02    # 2% stop loss (as requested)
         self.take_profit_pct = 20    # $20 profit target (10% ROE on $200 margin)
-        self.data_points_per_symbol = 50   # REDUCED: 50 periods (realistic for live trading)
-        self.total_data_points_target = 150  # 3 tokens × 50 points = 5-10 minutes
+        self.data_points_per_symbol = 50   # Closed bars needed per symbol until configured (then required_bars())
+        self.total_data_points_target = 150  # 3 tokens × 50 bars
         
-        # Hull MA Strategy Parameters (ADJUSTED for live trading)
+        # Hull MA Strategy Parameters (original Pine Script periods, in bars)
         self.decision_threshold = 0.0010  # "dt" parameter
         self.hull_period = 7              # "Wow" parameter  
-        self.wma1_period = 21             # Reduced from 34
-        self.wma2_period = 50             # Reduced from 144  
-        self.wma3_period = 50             # Reduced from 377 (same as requirement)
+        self.wma1_period = 34
+        self.wma2_period = 144
+        self.wma3_period = 377
+        
+        # Strategies evaluate on bar closes, not raw ticks (1s/5s/1m/5m bars built incrementally)
+        self.strategy_timeframe = "1m"
+        self.bar_history_length = 500     # Closed bars kept per symbol and timeframe (>= longest period)
+        self.bars = BarAggregator(history_length=self.bar_history_length)
+        
+        # Long-lookback closes: raw-tick hot buffer + compressed 1s/1m tiers (~7 days per symbol)
+        self.price_history = {symbol: TieredPriceHistory() for symbol in self.symbols}
+        self.strategy_lookback = 500      # Closes handed to the strategies (tiered history holds thousands)
+        self.history_seed_candles = 5000  # 1m candles prepended to the tiered history on bootstrap
         self.position_size_pct = 1.50     # 150% of equity (use full margin + some leverage)
         
         # MAXIMUM AGGRESSION STRATEGY 
         self.max_positions = 2            # 2 BIG positions ($250 margin each = $500 total = 99% utilization)
         
         # LIVE TRADING MODE - All fixes implemented
+        # Paper trading routes orders to a local matching simulator fed by the live mids
+        # (book depth, latency, fees, partial fills and funding - see sim_exchange.SimulatedExchange)
         self.paper_trading_mode = False  # LIVE TRADING ENABLED
-        
-        # Force live trading mode (override any cache issues)
-        assert self.paper_trading_mode == False, "Paper trading should be disabled!"
-        
-        # Data buffering for batch processing
-        self.data_buffer = {symbol: [] for symbol in self.symbols}
-        self.buffer_size = 5  # Process every 5 data points
-        self.last_batch_process = {symbol: time.time() for symbol in self.symbols}
+        self.paper_balance = 10000.0      # Simulated USDC
+        self.paper_latency = 0.05         # Seconds per simulated order round trip
+        self.paper_venue = None
+        
+        # Position marking and exit checks run per batch of ticks (batch size adapts to tick rate and latency target)
+        self.batch_latency_target = 1.0  # p99 seconds a tick may wait for its batch
+        self.batch_move_threshold = 0.002  # 0.2% move since the last batch -> process (and re-evaluate) immediately
+        self.stop_proximity = 0.25       # Within 25% of the stop distance -> process every tick
+        self.batch_scheduler = AdaptiveBatchScheduler(latency_target=self.batch_latency_target,
+                                                      move_threshold=self.batch_move_threshold)
+        
+        # Socket reader -> strategy hand-off: newest tick per symbol, closed strategy-timeframe bars accumulate
+        self.max_pending_bars = 64
+        self.strategy_slots = LatestValueSlots(
+            merge=lambda pending, latest: (latest[0], (pending[1] + latest[1])[-self.max_pending_bars:]))
         
         # Hyperliquid configuration - USER INPUT
         self.private_key = None
         self.wallet = None
         self.info = None
         self.exchange = None
+        self.rest = None  # HyperliquidRestClient - all REST traffic goes through here
         
         # User will be prompted for these during startup
         self.user_config = {
@@ -402,6 +443,7 @@ class HyperliquidAdvancedBot:
             'stop_loss_pct': 0.02,
             'take_profit_target': 20,
             'trading_strategy': 'hull_ma',
+            'timeframe': '1m',
             'position_size_pct': 1.0,
             'max_positions': 2
         }
@@ -410,6 +452,7 @@ class HyperliquidAdvancedBot:
         self.market_data_history = {symbol: deque(maxlen=200) for symbol in self.symbols}
         self.current_positions = {}
         self.trading_signals = deque(maxlen=1000)
+        self.latest_signals = {}          # symbol -> last generated TradingSignal (dashboard state)
         
         # DISABLED ML Engine (using simple momentum instead)
         # self.ml_engine = MachineLearningEngine()
@@ -418,7 +461,39 @@ class HyperliquidAdvancedBot:
         self.total_trades = 0
         self.profitable_trades = 0
         self.total_pnl = 0.0
+        self.total_fees = 0.0
         self.data_collection_complete = False
+        self.bars_collected = 0            # Updated by check_data_collection_status
+        self.analytics = PerformanceAnalytics(return_interval=60)  # Equity curve, drawdown, Sharpe, attribution
+        
+        # Fill-accurate positions from the userFills / orderUpdates streams
+        self.fill_tracking_enabled = True
+        self.fill_tracker = FillTracker()
+        self.order_states = OrderStateMachine()  # idle -> opening -> open -> closing -> closed per symbol
+        
+        # Exchange-native SL/TP trigger orders submitted with the entry (tpsl grouping)
+        self.native_tpsl_enabled = True
+        self.market_slippage = 0.05     # Same worst-price bound as the SDK's market orders
+        self.protective_orders = {}     # symbol -> {'tp': spec, 'sl': spec}
+        self.cloid_counter = int(time.time() * 1000) << 16
+        
+        # Warm start - seed history from candle snapshots instead of waiting for live ticks
+        self.bootstrap_enabled = True
+        self.bootstrap_interval = "1m"     # Hyperliquid candle interval used for seeding
+        self.history_gap_threshold = 30    # Seconds without a tick before we backfill the gap
+        self.last_tick_time = {symbol: None for symbol in self.symbols}
+        self.backfilling = set()
+        
+        # Crash-safe state snapshots (positions, cooldowns, PnL, history, signals)
+        self.snapshot_enabled = True
+        self.snapshot_interval = 5         # Seconds between incremental snapshots
+        self.state_store = StateSnapshotStore('bot_state')
+        self.snapshot_requested = None     # asyncio.Event, created in run()
+        
+        # Durable trade journal (SQLite, WAL) - signals, orders, fills and position events, written off-loop
+        self.journal_enabled = True
+        self.journal_path = "trade_journal.db"
+        self.journal = None                # TradeJournal, opened in start_session (shared in fleet mode)
         
         # HULL MA: Quality over quantity signals
         self.recent_signals = {symbol: [] for symbol in self.symbols}
@@ -428,8 +503,25 @@ class HyperliquidAdvancedBot:
         
         # Incremental Learning & Risk Management
         self.model_retrain_interval = 100  # Retrain every 100 data points (less frequent)
-        self.market_condition = "normal"  # normal, volatile, trending
-        self.volatility_threshold = 0.02  # 2% volatility threshold
+        
+        # Per-symbol market regime from rolling bar returns (volatile / trending / ranging)
+        self.volatility_threshold = 0.02  # Typical move over the regime window above 2% -> volatile
+        self.trend_threshold = 2.0        # Net move above 2x the typical move -> trending
+        self.regime = RegimeClassifier(volatility_threshold=self.volatility_threshold,
+                                       trend_threshold=self.trend_threshold)
+        self.regime_size_multipliers = {VOLATILE: 0.5, TRENDING: 1.0, RANGING: 1.0}
+        self.regime_strategies = {}       # Optional per-regime strategy override, e.g. {'ranging': 'mean_reversion'}
+        
+        # Portfolio-level limits from an EW covariance across all symbols (BTC/ETH/SOL longs are one bet)
+        self.covariance = EWCovariance(sample_interval=5.0, halflife=3600.0)
+        self.max_correlated_leverage = 15.0  # Order + correlation-weighted same-side notional, x account value
+        self.max_portfolio_var_pct = 0.30    # 99% VaR of the book over var_horizon, fraction of account value
+        self.var_horizon = 3600              # Seconds
+        
+        # Monte Carlo pre-trade sizing (20x on a small account - simulate before sending)
+        self.risk_engine = MonteCarloRiskEngine(paths=10000, steps=12, horizon=self.var_horizon)
+        self.max_liquidation_prob = 0.01     # Simulated chance of hitting maintenance margin within the horizon
+        self.max_shortfall_pct = 0.25        # 97.5% expected shortfall, fraction of account value
         
         # Retry mechanisms
         self.max_retries = 3
@@ -437,7 +529,34 @@ class HyperliquidAdvancedBot:
         
         # WebSocket connection
         self.ws_url = "wss://api.hyperliquid.xyz/ws"
+        self.ws_connections = 1       # >1 = hot-standby sockets, first arrival of each frame wins
+        self.ws_stall_timeout = 15    # Recycle a socket that goes quiet this long
+        self.ws_feed = None
         self.is_running = False
+        self.background = BackgroundTasks()  # Fire-and-forget work (SL/TP upkeep, backfills, paper fills)
+        
+        # Headless fleet mode - a MarketDataBus owns the feed, history and indicator cache
+        self.name = "bot"
+        self.market_bus = None
+        self.indicator_cache = IndicatorCache()
+        
+        # On-demand profiling (SIGUSR1 = CPU profile, SIGUSR2 = allocation snapshot; port 0 = no TCP control)
+        self.profile_dir = "profiles"
+        self.control_port = 0                # 127.0.0.1 only, e.g. `echo "profile 30" | nc 127.0.0.1 <port>`
+        self.profiling = None
+        
+        # Hot-reloadable settings: edits to this JSON file (RUNTIME_KEYS) apply live, as do
+        # `config` / `set` / `reload` on the control port - history and indicator state are kept
+        self.runtime_config_path = "bot_config.json"   # Watched only if it exists
+        self.config_watcher = None
+        
+        # Live state stream for dashboards (snapshot + deltas over a local websocket; port 0 = off)
+        self.stream_port = 0
+        self.stream_fps = 10.0
+        self.state_stream = None
+        
+        # Event-loop stall watchdog - anything synchronous on the loop delays stops for every symbol
+        self.watchdog = LoopWatchdog(interval=0.1, threshold=0.25)
         
         logger.info("🤖 HYPERLIQUID TRADING BOT STARTING...")
         logger.info("⚙️ USER CONFIGURATION REQUIRED")
@@ -446,72 +565,146 @@ class HyperliquidAdvancedBot:
         # User configuration will be set during run()
         self.config_complete = False
     
-    def verify_account_connection(self):
+    async def verify_account_connection(self):
         """Verify we can connect to the account and see balances"""
         try:
-            logger.info(f"Wallet Address: {self.wallet.address}")
+            logger.info("Wallet Address: %s", self.wallet.address)
             
             # Check user state
-            user_state = self.info.user_state(self.wallet.address)
-            logger.info(f"Account connection test: {user_state}")
+            user_state = await self.rest.user_state(self.wallet.address)
+            logger.info("Account connection test: %s", user_state)
             
             if user_state:
                 # Try to get account value
                 account_value = float(user_state.get('marginSummary', {}).get('accountValue', 0))
-                logger.info(f"Account Value: ${account_value:.2f}")
+                logger.info("Account Value: $%.2f", account_value)
+                self.analytics.set_starting_equity(account_value)
                 
                 # Check positions
                 positions = user_state.get('assetPositions', [])
-                logger.info(f"Current positions: {len(positions)}")
+                logger.info("Current positions: %s", len(positions))
                 for pos in positions:
-                    logger.info(f"  Position: {pos}")
+                    logger.info("  Position: %s", pos)
             else:
                 logger.warning("Could not retrieve user state - check network/API configuration")
                 
         except Exception as e:
-            logger.error(f"Account verification failed: {e}")
+            logger.error("Account verification failed: %s", e)
     
     async def connect_websocket(self):
-        """Connect to Hyperliquid WebSocket with retry mechanism"""
-        subscription = {
+        """Connect to Hyperliquid WebSocket(s) with retry and hot-standby failover"""
+        subscriptions = [{
             "method": "subscribe",
             "subscription": {
                 "type": "allMids"
             }
-        }
+        }]
+        
+        # Push-based position state: our own fills and order lifecycle (paper fills come from the simulator)
+        if self.fill_tracking_enabled and self.wallet and self.paper_venue is None:
+            for channel in ("userFills", "orderUpdates"):
+                subscriptions.append({
+                    "method": "subscribe",
+                    "subscription": {
+                        "type": channel,
+                        "user": self.wallet.address
+                    }
+                })
+        
+        self.ws_feed = RedundantWebsocketFeed(
+            self.ws_url,
+            subscriptions,
+            self.process_ws_message,
+            connections=self.ws_connections,
+            stall_timeout=self.ws_stall_timeout,
+            retry_delay=self.retry_delay,
+            max_retries=self.max_retries
+        )
+        await self.ws_feed.run(lambda: self.is_running)
+    
+    async def process_ws_message(self, data: Dict):
+        """Route websocket frames by channel"""
+        channel = data.get("channel")
+        if channel == "allMids":
+            if not STARTUP.finished:
+                STARTUP.finish("first tick")
+            await self.process_market_data(data)
+        elif channel == "userFills":
+            await self.process_user_fills(data.get("data", {}))
+        elif channel == "orderUpdates":
+            for update in data.get("data", []):
+                self.fill_tracker.apply_order_update(update)
+    
+    async def process_user_fills(self, data: Dict):
+        """Apply our fills incrementally - this is the source of truth for positions and PnL"""
+        fills = data.get("fills", [])
+        if data.get("isSnapshot"):
+            # Historical fills sent on subscribe - already reflected in exchange state
+            self.fill_tracker.mark_seen(fills)
+            return
         
-        retry_count = 0
-        while self.is_running:
-            try:
-                async with websockets.connect(
-                    self.ws_url, 
-                    ping_interval=30,  # Keep connection alive
-                    close_timeout=10
-                ) as websocket:
-                    await websocket.send(json.dumps(subscription))
-                    logger.info("Connected to Hyperliquid WebSocket")
-                    retry_count = 0  # Reset on successful connection
-                    
-                    async for message in websocket:
-                        if not self.is_running:
-                            break
-                        
-                        try:
-                            data = json.loads(message)
-                            await self.process_market_data(data)
-                        except Exception as e:
-                            # Silent fail for individual message errors
-                            pass
-                            
-            except Exception as e:
-                retry_count += 1
-                wait_time = min(60, self.retry_delay * (2 ** min(retry_count, 6)))  # Cap at 60 seconds
-                
-                if retry_count <= self.max_retries or retry_count % 10 == 0:  # Log occasionally
-                    logger.warning(f"🔌 WebSocket disconnected (attempt {retry_count}), retrying in {wait_time}s...")
-                
-                if self.is_running:
-                    await asyncio.sleep(wait_time)
+        for fill in fills:
+            update = self.fill_tracker.apply_fill(fill)
+            if update is None:
+                continue  # Duplicate
+            
+            self.total_fees += update.fee
+            symbol = update.coin
+            
+            if self.journal:
+                self.journal.record_fill(self.name, fill)
+            
+            if update.closed is not None:
+                net_pnl = update.closed.realized_pnl - update.closed.fees
+                self.total_pnl += net_pnl
+                if net_pnl > 0:
+                    self.profitable_trades += 1
+                logger.info("✅ POSITION CLOSED (fill): %s | Net PnL: $%.2f (fees $%.2f) | Total PnL: $%.2f",
+                           symbol, net_pnl, update.closed.fees, self.total_pnl)
+                previous = self.current_positions.get(symbol)
+                self.analytics.on_close(symbol, net_pnl, update.closed.fees,
+                                        strategy=previous.strategy if previous else None)
+                if self.journal:
+                    self.journal.record_position(
+                        self.name, symbol, "close", "long" if update.closed.size > 0 else "short",
+                        abs(update.closed.size), update.closed.entry_price, exit_price=update.fill_price,
+                        pnl=net_pnl, fees=update.closed.fees, strategy=previous.strategy if previous else None)
+            
+            # Keep exchange-side SL/TP in step with the true exposure
+            protective = self.protective_orders.get(symbol)
+            if protective and update.size == 0:
+                self.background.spawn(self.cancel_protective_orders(symbol), name=f"{self.name}-cancel-sltp-{symbol}")
+            elif protective and any(abs(spec['size'] - abs(update.size)) > 1e-12 for spec in protective.values()):
+                self.background.spawn(self.amend_protective_orders(symbol, abs(update.size)),
+                                      name=f"{self.name}-amend-sltp-{symbol}")
+            
+            self.order_states.sync(symbol, update.size)
+            if update.size == 0:
+                self.current_positions.pop(symbol, None)
+            else:
+                side = "long" if update.size > 0 else "short"
+                position = self.current_positions.get(symbol)
+                if position is None:
+                    position = Position(
+                        symbol=symbol,
+                        side=side,
+                        size=abs(update.size),
+                        entry_price=update.entry_price,
+                        current_price=update.fill_price,
+                        unrealized_pnl=0.0,
+                        timestamp=datetime.now()
+                    )
+                    self.current_positions[symbol] = position
+                    self.analytics.on_open(symbol)
+                position.side = side
+                position.size = abs(update.size)
+                position.entry_price = update.entry_price
+                self.mark_position(position, position.current_price)
+            
+            logger.info("🧾 FILL %s: %s %s @ %s | Fee: $%.4f | Position: %+.6f @ %.4f",
+                       symbol, fill.get('dir', fill.get('side')), update.fill_size, update.fill_price,
+                       update.fee, update.size, update.entry_price)
+            self.request_snapshot()
     
     async def process_market_data(self, data: Dict):
         """Process incoming market data with buffering and batch processing"""
@@ -519,7 +712,6 @@ class HyperliquidAdvancedBot:
             return
         
         mids = data.get("data", {}).get("mids", {})
-        current_time = time.time()
         
         for symbol_key, price_str in mids.items():
             # Extract symbol name (remove any suffix)
@@ -532,35 +724,219 @@ class HyperliquidAdvancedBot:
                 price = float(price_str)
                 timestamp = datetime.now()
                 
-                # WebSocket-only mode - calculate metrics without API calls
-                market_info = await self.calculate_market_metrics(symbol, price)
-                
-                market_data = MarketData(
-                    symbol=symbol,
-                    price=price,
-                    timestamp=timestamp,
-                    volume=market_info.get('volume', 1000),
-                    bid=market_info.get('bid', price),
-                    ask=market_info.get('ask', price),
-                    spread=market_info.get('spread', 0)
-                )
-                
-                # Add to buffer for batch processing
-                self.data_buffer[symbol].append(market_data)
-                
-                # Process buffer when it reaches target size or time threshold
-                time_since_last = current_time - self.last_batch_process[symbol]
-                
-                if (len(self.data_buffer[symbol]) >= self.buffer_size or 
-                    time_since_last > 5):  # Process every 5 seconds max
-                    
-                    await self.process_data_batch(symbol)
-                    self.last_batch_process[symbol] = current_time
+                # Reconnect / stall gap - backfill the missing stretch from candles
+                last_tick = self.last_tick_time.get(symbol)
+                if (last_tick and symbol not in self.backfilling and
+                        (timestamp - last_tick).total_seconds() > self.history_gap_threshold):
+                    self.backfilling.add(symbol)
+                    self.background.spawn(self.backfill_gap(symbol, last_tick, timestamp),
+                                          name=f"{self.name}-backfill-{symbol}")
+                self.last_tick_time[symbol] = timestamp
                 
+                market_data = await self.build_market_data(symbol, price, timestamp)
+                closed_bars = self.bars.update(symbol, price, timestamp.timestamp(), market_data.volume)
+                self.price_history[symbol].append(timestamp.timestamp(), price)
+                self.covariance.observe(symbol, price, timestamp.timestamp())
+                self.market_data_history[symbol].append(market_data)
             except Exception as e:
-                # Reduce logging spam - only log critical errors
-                if "429" not in str(e):  # Don't log rate limit errors
-                    pass  # Silent fail for non-critical errors
+                # Reduce logging spam - per-tick errors only at debug level
+                logger.debug("Market data error for %s: %s", symbol, e)
+                continue
+            
+            self.deliver_market_data(market_data, closed_bars)
+    
+    async def build_market_data(self, symbol: str, price: float, timestamp: datetime) -> MarketData:
+        """Turn a decoded mid into a MarketData point"""
+        # WebSocket-only mode - calculate metrics without API calls
+        market_info = await self.calculate_market_metrics(symbol, price)
+        
+        return MarketData(
+            symbol=symbol,
+            price=price,
+            timestamp=timestamp,
+            volume=market_info.get('volume', 1000),
+            bid=market_info.get('bid', price),
+            ask=market_info.get('ask', price),
+            spread=market_info.get('spread', 0)
+        )
+    
+    def deliver_paper_fill(self, fill: Dict):
+        """One simulator fill -> the same path as a live userFills frame (runs on the loop)"""
+        self.background.spawn(self.process_user_fills({"fills": [fill]}), name=f"{self.name}-paper-fill")
+    
+    def deliver_market_data(self, market_data: MarketData, closed_bars: List = ()):
+        """Hand a decoded tick to the strategy loop without waiting (called by the reader or the bus)"""
+        if self.paper_venue is not None:
+            self.paper_venue.update_mid(market_data.symbol, market_data.price, market_data.timestamp.timestamp())
+        # Only strategy bars are consumed - finer ones (1s, 5s) would crowd them out of the pending cap
+        self.strategy_slots.offer(market_data.symbol, (market_data, [
+            bar for bar in closed_bars if bar.timeframe == self.strategy_timeframe]))
+    
+    async def strategy_loop(self):
+        """Consume the newest tick per symbol - a slow strategy step conflates ticks instead of stalling ingest"""
+        while self.is_running:
+            symbol, pending = await self.strategy_slots.take()
+            if symbol is None:
+                break
+            await self.on_market_data(*pending)
+    
+    async def on_market_data(self, market_data: MarketData, closed_bars: List = ()):
+        """Per-tick work: batched marking and exit checks, strategy on bar close (runs in the strategy loop)"""
+        symbol = market_data.symbol
+        if symbol not in self.recent_signals:
+            return  # Symbol removed by a config change while the tick was pending
+        try:
+            # The scheduler decides when this symbol's batch runs - every tick with a stop close by
+            position = self.current_positions.get(symbol)
+            flush = self.batch_scheduler.on_tick(
+                symbol, market_data.price,
+                urgent=position is not None and self.stop_is_near(position, market_data.price))
+            if flush:
+                await self.process_data_batch(symbol, market_data.price)
+            
+            # Signal evaluation runs once per closed bar of the strategy's timeframe,
+            # and between bars once per large move (not on every tick near a stop)
+            strategy_bars = [bar for bar in closed_bars if bar.timeframe == self.strategy_timeframe]
+            for bar in strategy_bars:
+                self.regime.update(symbol, bar.close)
+            if strategy_bars:
+                await self.on_bar_close(symbol)
+            elif flush == 'move' and self.data_collection_complete:
+                await self.analyze_and_trade(symbol)
+            
+        except RateLimitExceeded as e:
+            logger.warning("⏳ %s: %s | REST: %s", symbol, e, self.rest.get_metrics())
+        except Exception as e:
+            # Reduce logging spam - per-tick errors only at debug level
+            logger.debug("Market data error for %s: %s", symbol, e)
+    
+    def candle_to_market_data(self, symbol: str, candle: Dict) -> MarketData:
+        """Convert a Hyperliquid candle snapshot entry into a MarketData point (close price)"""
+        price = float(candle['c'])
+        bid = price * 0.9995  # Same tight spread approximation as live ticks
+        ask = price * 1.0005
+        return MarketData(
+            symbol=symbol,
+            price=price,
+            timestamp=datetime.fromtimestamp(candle['T'] / 1000),
+            volume=float(candle.get('v', 1000)),
+            bid=bid,
+            ask=ask,
+            spread=ask - bid
+        )
+    
+    async def fetch_candles(self, symbol: str, interval: str, start: datetime, end: datetime) -> List[Dict]:
+        """Fetch closed candles for [start, end] (raw snapshot entries)"""
+        expected = int((end - start).total_seconds() / CANDLE_INTERVAL_SECONDS.get(interval, 60)) + 1
+        candles = await self.rest.candles_snapshot(
+            symbol,
+            interval,
+            int(start.timestamp() * 1000),
+            int(end.timestamp() * 1000),
+            expected_candles=expected
+        )
+        end_ms = end.timestamp() * 1000
+        # Drop the still-forming candle - its close is not final
+        return [c for c in candles or [] if c['T'] <= end_ms]
+    
+    async def fetch_candle_history(self, symbol: str, start: datetime, end: datetime) -> List[MarketData]:
+        """Fetch closed candles for [start, end] as MarketData points"""
+        candles = await self.fetch_candles(symbol, self.bootstrap_interval, start, end)
+        return [self.candle_to_market_data(symbol, c) for c in candles]
+    
+    async def seed_bars(self, symbol: str, start: Optional[datetime], end: datetime) -> int:
+        """Fill candle-backed bar timeframes (1m/5m) from snapshots; 1s/5s bars warm up live"""
+        seeded = 0
+        for timeframe, seconds in self.bars.timeframes.items():
+            if timeframe not in CANDLE_INTERVAL_SECONDS:
+                continue
+            latest = self.bars.latest(symbol, timeframe)
+            if start is None:
+                # Bootstrap: skip series that are already current (shared bus, restart)
+                if latest and latest.start >= end.timestamp() - 2 * seconds:
+                    continue
+                since = end - timedelta(seconds=self.bars.history_length * seconds)
+            else:
+                since = start
+            candles = await self.fetch_candles(symbol, timeframe, since, end)
+            self.bars.seed(symbol, timeframe, [candle_to_bar(symbol, timeframe, c) for c in candles])
+            seeded += len(candles)
+        return seeded
+    
+    async def seed_price_history(self, symbol: str, end: datetime) -> int:
+        """Prepend days of 1m closes to the tiered history (older than anything it already holds)"""
+        history = self.price_history[symbol]
+        since = end - timedelta(minutes=self.history_seed_candles)
+        earliest = history.earliest_time()
+        if earliest is not None and earliest <= since.timestamp() + 60:
+            return 0  # Already covered (shared bus)
+        candles = await self.fetch_candles(symbol, '1m', since, end)
+        # Bucketed by open time: a candle's close is the last price of its minute
+        history.seed([c['t'] / 1000 for c in candles], [float(c['c']) for c in candles], 60)
+        return len(candles)
+    
+    async def bootstrap_history(self, symbols: Optional[List[str]] = None):
+        """Warm start: fill every symbol's (or just `symbols`') history from candle snapshots in parallel"""
+        symbols = symbols or self.symbols
+        started = time.time()
+        end = datetime.now()
+        
+        async def seed(symbol: str) -> int:
+            history = self.market_data_history[symbol]
+            lookback = timedelta(seconds=history.maxlen * CANDLE_INTERVAL_SECONDS.get(self.bootstrap_interval, 60))
+            # Only fetch what we don't already have (e.g. a fleet bus history other bots already filled)
+            start = max(end - lookback, history[-1].timestamp) if history else end - lookback
+            points = await self.fetch_candle_history(symbol, start, end)
+            if history:
+                points = [md for md in points if md.timestamp > history[-1].timestamp]
+            history.extend(points)
+            if history:
+                self.last_tick_time[symbol] = history[-1].timestamp
+            await self.seed_bars(symbol, None, end)
+            await self.seed_price_history(symbol, end)
+            self.regime.seed(symbol, self.price_history[symbol].closes(
+                BAR_TIMEFRAMES[self.strategy_timeframe], periods=self.regime.window + 1))
+            return len(points)
+        
+        results = await asyncio.gather(*[seed(symbol) for symbol in symbols], return_exceptions=True)
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.warning("⚠️ History bootstrap failed for %s: %s", symbol, result)
+            else:
+                logger.info("📥 %s: seeded %s %s candles (%d points, %d %s bars, %d in tiered history)",
+                           symbol, result, self.bootstrap_interval, len(self.market_data_history[symbol]),
+                           self.bars.bar_count(symbol, self.strategy_timeframe), self.strategy_timeframe,
+                           self.history_span(symbol))
+        
+        # Warm the cross-asset covariance from the same 1m history (the bus seeds its shared one)
+        if self.market_bus is None and not self.covariance.ready():
+            self.covariance.seed({symbol: self.price_history[symbol].closes(60, periods=self.strategy_lookback)
+                                  for symbol in self.symbols}, 60)
+        
+        logger.info("📥 History bootstrap finished in %.2fs", time.time() - started)
+        await self.check_data_collection_status()
+    
+    async def backfill_gap(self, symbol: str, gap_start: datetime, gap_end: datetime):
+        """Fill a hole in the tick history (reconnect, stall) from candle snapshots"""
+        try:
+            points = await self.fetch_candle_history(symbol, gap_start, gap_end)
+            points = [md for md in points if gap_start < md.timestamp < gap_end]
+            if points:
+                history = self.market_data_history[symbol]
+                merged = sorted(list(history) + points, key=lambda md: md.timestamp)
+                history.clear()
+                history.extend(merged)
+                # The strategies read closes from the tiered history - fill the carried-forward stretch there too
+                self.price_history[symbol].fill_gap([md.timestamp.timestamp() for md in points],
+                                                    [md.price for md in points])
+            # Replace the aggregator's flat gap bars with the real candles
+            await self.seed_bars(symbol, gap_start, gap_end)
+            logger.info("📥 %s: backfilled %d candles over %.0fs gap",
+                       symbol, len(points), (gap_end - gap_start).total_seconds())
+        except Exception as e:
+            logger.warning("⚠️ Gap backfill failed for %s: %s", symbol, e)
+        finally:
+            self.backfilling.discard(symbol)
     
     async def calculate_market_metrics(self, symbol: str, price: float) -> Dict:
         """Calculate market metrics from WebSocket data only - No API calls"""
@@ -588,71 +964,66 @@ class HyperliquidAdvancedBot:
             # Minimal logging to reduce spam
             return {'volume': 1000, 'bid': price * 0.9995, 'ask': price * 1.0005, 'spread': price * 0.001}
     
-    async def process_data_batch(self, symbol: str):
-        """Process buffered data in batches for efficiency"""
-        if not self.data_buffer[symbol]:
-            return
+    async def process_data_batch(self, symbol: str, price: float):
+        """Per-batch work at the latest price: mark the position and check its exits"""
+        # History was already appended at ingest (here or on the bus)
+        self.batch_scheduler.on_flush(symbol, price)
         
-        # Move buffered data to main history
-        for market_data in self.data_buffer[symbol]:
-            self.market_data_history[symbol].append(market_data)
-        
-        # Clear buffer after processing
-        buffer_size = len(self.data_buffer[symbol])
-        self.data_buffer[symbol].clear()
+        position = self.current_positions.get(symbol)
+        if position is not None:
+            self.mark_position(position, price)
+            await self.check_position_exit(symbol, position)
         
         # Check data collection status
         if not self.data_collection_complete:
             await self.check_data_collection_status()
         
-        # Analyze market conditions for real-time adaptation
-        await self.analyze_market_conditions(symbol)
-        
-        # Generate trading signals if ready
-        if self.data_collection_complete:
-            await self.analyze_and_trade(symbol)
-        
         # Incremental learning - retrain models periodically
         if self.total_trades > 0 and self.total_trades % self.model_retrain_interval == 0:
             await self.incremental_model_training(symbol)
     
-    async def analyze_market_conditions(self, symbol: str):
-        """Analyze market conditions for real-time adaptation"""
-        if len(self.market_data_history[symbol]) < 20:
-            return
+    async def on_bar_close(self, symbol: str):
+        """A bar of the strategy timeframe closed - evaluate the strategy once"""
+        if not self.data_collection_complete:
+            await self.check_data_collection_status()
         
-        # Calculate recent volatility
-        recent_prices = [md.price for md in list(self.market_data_history[symbol])[-20:]]
-        volatility = np.std(recent_prices) / np.mean(recent_prices) if recent_prices else 0
-        
-        # Update market condition
-        if volatility > self.volatility_threshold:
-            self.market_condition = "volatile"
-        elif volatility < self.volatility_threshold / 2:
-            # Check for trending market
-            price_change = (recent_prices[-1] - recent_prices[0]) / recent_prices[0]
-            if abs(price_change) > 0.02:  # 2% move
-                self.market_condition = "trending"
-            else:
-                self.market_condition = "normal"
+        # Generate trading signals if ready
+        if self.data_collection_complete:
+            await self.analyze_and_trade(symbol)
+    
+    def history_span(self, symbol: str) -> int:
+        """Closed strategy-timeframe periods the tiered history can serve for a symbol"""
+        return self.price_history[symbol].span(BAR_TIMEFRAMES[self.strategy_timeframe])
+    
+    def required_bars(self) -> int:
+        """Closed bars the selected strategy needs before it can trade"""
+        strategy = self.user_config.get('trading_strategy', 'hull_ma')
+        if strategy == 'hull_ma':
+            needed = max(self.wma1_period, self.wma2_period, self.wma3_period, self.hull_period + 2)
+        elif strategy == 'momentum':
+            needed = 28  # 2 x 14-period RSI
         else:
-            self.market_condition = "normal"
+            needed = 20
+        return max(50, needed)  # Never trade on fewer than 50 bars
     
     async def check_data_collection_status(self):
-        """Check if we have collected enough data points (50 per symbol)"""
-        total_collected = sum(len(history) for history in self.market_data_history.values())
+        """Check if every symbol has enough closed bars for the strategy"""
+        bar_counts = {s: self.history_span(s) for s in self.symbols}
+        total_collected = sum(min(count, self.data_points_per_symbol) for count in bar_counts.values())
+        self.bars_collected = total_collected
         
         if total_collected >= self.total_data_points_target:
             self.data_collection_complete = True
             strategy_name = self.user_config.get('trading_strategy', 'hull_ma').replace('_', ' ').title()
-            logger.info(f"🔄 {strategy_name.upper()} STRATEGY READY! Collected {total_collected} data points")
-            logger.info(f"📊 Data breakdown: {', '.join([f'{s}={len(self.market_data_history[s])}' for s in self.symbols])}")
+            logger.info("🔄 %s STRATEGY READY! Collected %s %s bars",
+                       strategy_name.upper(), total_collected, self.strategy_timeframe)
+            logger.info("📊 Data breakdown: %s", ', '.join(f'{s}={count}' for s, count in bar_counts.items()))
             await self.initial_ml_training()
     
     async def initial_ml_training(self):
         """Strategy initialization complete"""
         strategy_name = self.user_config.get('trading_strategy', 'hull_ma').replace('_', ' ').title()
-        logger.info(f"🔄 {strategy_name.upper()} INDICATORS CALCULATED - Ready for trading!")
+        logger.info("🔄 %s INDICATORS CALCULATED - Ready for trading!", strategy_name.upper())
     
     async def incremental_model_training(self, symbol: str):
         """DISABLED - Using simple momentum strategy instead"""
@@ -681,7 +1052,8 @@ class HyperliquidAdvancedBot:
                         targets.append(price_change)
                 
                 if len(features_list) >= 5:  # Reduced minimum from 10 to 5
-                    self.ml_engine.train_model(symbol, features_list, targets)
+                    # sklearn fits take seconds - keep them off the event loop
+                    await asyncio.to_thread(self.ml_engine.train_model, symbol, features_list, targets)
                     return  # Success, exit retry loop
                 
             except Exception as e:
@@ -689,36 +1061,44 @@ class HyperliquidAdvancedBot:
                     await asyncio.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
                 else:
                     # Only log after all retries failed
-                    logger.warning(f"⚠️ Model training failed for {symbol} after {self.max_retries} attempts")
+                    logger.warning("⚠️ Model training failed for %s after %s attempts", symbol, self.max_retries)
     
     async def analyze_and_trade(self, symbol: str):
         """Analyze market data and execute trades"""
-        if len(self.market_data_history[symbol]) < 50:
+        if self.history_span(symbol) < self.data_points_per_symbol:
+            return
+        
+        # Indicators across an unfilled gap are meaningless - wait for the backfill
+        if symbol in self.backfilling:
             return
         
         try:
-            # Get current market data
-            current_data = self.market_data_history[symbol][-1]
-            
             # Generate trading signal
             signal = await self.generate_trading_signal(symbol)
             
+            if signal:
+                self.latest_signals[symbol] = signal
+            if signal and self.journal:
+                self.journal.record_signal(self.name, signal, self.regime.regime(symbol))
+            
             if signal and signal.confidence > 0.6:  # Only trade high-confidence signals
                 await self.execute_trade(signal)
                 
         except Exception as e:
-            logger.error(f"Error in analyze_and_trade for {symbol}: {e}")
+            logger.error("Error in analyze_and_trade for %s: %s", symbol, e)
+    
+    def cached_indicator(self, symbol: str, key: tuple, compute):
+        """Indicator value for the latest closed bar; shared across bots on the same bus"""
+        timeframe = self.strategy_timeframe
+        return self.indicator_cache.get((symbol, timeframe), self.bars.tip(symbol, timeframe), key, compute)
     
     def calculate_wma(self, prices: List[float], period: int) -> float:
         """Calculate Weighted Moving Average"""
         if len(prices) < period:
             return 0.0
         
-        recent_prices = prices[-period:]
-        weights = list(range(1, period + 1))
-        weighted_sum = sum(price * weight for price, weight in zip(recent_prices, weights))
-        weight_sum = sum(weights)
-        return weighted_sum / weight_sum
+        weights = np.arange(1, period + 1)
+        return float(np.dot(np.asarray(prices[-period:], dtype=float), weights) / weights.sum())
     
     def calculate_hull_ma(self, prices: List[float], period: int) -> tuple:
         """Calculate Hull Moving Average components (n1, n2)"""
@@ -749,16 +1129,18 @@ class HyperliquidAdvancedBot:
     async def generate_trading_signal(self, symbol: str) -> Optional[TradingSignal]:
         """Generate trading signal based on user-selected strategy"""
         try:
-            history = list(self.market_data_history[symbol])
-            if len(history) < 50:  # Need at least 50 data points as requested
+            # Strategies only ever see closed bars of their timeframe (read-only NumPy view)
+            prices = self.price_history[symbol].closes(BAR_TIMEFRAMES[self.strategy_timeframe],
+                                                       periods=max(self.strategy_lookback, self.required_bars()))
+            if len(prices) < self.data_points_per_symbol:
                 return None
             
-            current_price = history[-1].price
-            previous_price = history[-2].price if len(history) >= 2 else current_price
-            prices = [md.price for md in history]
+            current_price = float(prices[-1])
+            previous_price = float(prices[-2]) if len(prices) >= 2 else current_price
             
-            # Route to appropriate strategy
+            # Route to appropriate strategy (optionally switched by the symbol's regime)
             strategy = self.user_config.get('trading_strategy', 'hull_ma')
+            strategy = self.regime_strategies.get(self.regime.regime(symbol), strategy)
             
             if strategy == 'hull_ma':
                 return await self.hull_ma_strategy(symbol, prices, current_price, previous_price)
@@ -773,7 +1155,7 @@ class HyperliquidAdvancedBot:
                 return await self.hull_ma_strategy(symbol, prices, current_price, previous_price)
                 
         except Exception as e:
-            logger.error(f"Signal generation error for {symbol}: {e}")
+            logger.error("Signal generation error for %s: %s", symbol, e)
             return None
     
     async def hull_ma_strategy(self, symbol: str, prices: List[float], current_price: float, previous_price: float) -> Optional[TradingSignal]:
@@ -782,12 +1164,16 @@ class HyperliquidAdvancedBot:
             return None
         
         # === WEIGHTED MOVING AVERAGES ===
-        wma1 = self.calculate_wma(prices, self.wma1_period)   # 21-period
-        wma2 = self.calculate_wma(prices, self.wma2_period)   # 50-period  
-        wma3 = self.calculate_wma(prices, self.wma3_period)   # 50-period
+        wma1 = self.cached_indicator(symbol, ('wma', self.wma1_period),
+                                     lambda: self.calculate_wma(prices, self.wma1_period))   # 34-period
+        wma2 = self.cached_indicator(symbol, ('wma', self.wma2_period),
+                                     lambda: self.calculate_wma(prices, self.wma2_period))   # 144-period
+        wma3 = self.cached_indicator(symbol, ('wma', self.wma3_period),
+                                     lambda: self.calculate_wma(prices, self.wma3_period))   # 377-period
         
         # === HULL MOVING AVERAGE MOMENTUM ===
-        n1, n2 = self.calculate_hull_ma(prices, self.hull_period)
+        n1, n2 = self.cached_indicator(symbol, ('hull', self.hull_period),
+                                       lambda: self.calculate_hull_ma(prices, self.hull_period))
         
         # === TREND CONDITIONS ===
         price_rising = current_price > previous_price
@@ -799,30 +1185,30 @@ class HyperliquidAdvancedBot:
         long_condition = price_rising and hull_bullish
         short_condition = price_falling and hull_bearish
             
-            # === POSITION MANAGEMENT ===
-            if symbol in self.current_positions:
-                position = self.current_positions[symbol]
-                
-                # EXIT CONDITIONS with 2% stop loss OR profit target OR trend reversal
-                pnl_dollar = position.unrealized_pnl
-                
-                # Stop loss check (2%)
-                loss_threshold = -0.02 * (position.entry_price * position.size)
-                
-                close_long = (position.side == "long" and 
-                             (price_falling and hull_bearish and pnl_dollar > self.take_profit_pct) or
-                             pnl_dollar <= loss_threshold)
-                
-                close_short = (position.side == "short" and
-                              (price_rising and hull_bullish and pnl_dollar > self.take_profit_pct) or  
-                              pnl_dollar <= loss_threshold)
-                
-                if close_long or close_short:
-                    reason = "2% Stop Loss" if pnl_dollar <= loss_threshold else "Hull MA Reversal + Profit"
-                    await self.close_position(symbol, position, reason)
-                    return None
-                else:
-                    return None  # Already have position, no exit condition met
+        # === POSITION MANAGEMENT ===
+        if symbol in self.current_positions:
+            position = self.current_positions[symbol]
+            
+            # EXIT CONDITIONS with 2% stop loss OR profit target OR trend reversal
+            pnl_dollar = position.unrealized_pnl
+            
+            # Stop loss check (2%)
+            loss_threshold = -0.02 * (position.entry_price * position.size)
+            
+            close_long = (position.side == "long" and 
+                         (price_falling and hull_bearish and pnl_dollar > self.take_profit_pct) or
+                         pnl_dollar <= loss_threshold)
+            
+            close_short = (position.side == "short" and
+                          (price_rising and hull_bullish and pnl_dollar > self.take_profit_pct) or  
+                          pnl_dollar <= loss_threshold)
+            
+            if close_long or close_short:
+                reason = "2% Stop Loss" if pnl_dollar <= loss_threshold else "Hull MA Reversal + Profit"
+                await self.close_position(symbol, position, reason)
+                return None
+            else:
+                return None  # Already have position, no exit condition met
         
         # === NEW ENTRY SIGNALS ===
         if long_condition:
@@ -854,9 +1240,8 @@ class HyperliquidAdvancedBot:
         )
         
         # Log signal with Hull MA details
-        logger.info(f"🔄 {symbol} {direction.upper()}: ${current_price:.2f} "
-                   f"| WMA1: ${wma1:.2f} | Hull: {n1:.6f}/{n2:.6f} "
-                   f"| Confidence: {confidence:.2f}")
+        logger.info("🔄 %s %s: $%.2f | WMA1: $%.2f | Hull: %.6f/%.6f | Confidence: %.2f",
+                   symbol, direction.upper(), current_price, wma1, n1, n2, confidence)
         
         return signal
     
@@ -866,8 +1251,8 @@ class HyperliquidAdvancedBot:
             return None
         
         # Calculate momentum indicators
-        math_models = AdvancedMathematicalModels()
-        momentum_data = math_models.momentum_oscillator(prices)
+        momentum_data = self.cached_indicator(symbol, ('momentum', 14),
+                                              lambda: AdvancedMathematicalModels.momentum_oscillator(prices))
         
         rsi = momentum_data.get('rsi', 50)
         macd_histogram = momentum_data.get('macd_histogram', 0)
@@ -893,8 +1278,8 @@ class HyperliquidAdvancedBot:
             return None
         
         # Calculate Bollinger Bands
-        math_models = AdvancedMathematicalModels()
-        bb_data = math_models.bollinger_bands_probability(prices)
+        bb_data = self.cached_indicator(symbol, ('bollinger', 20),
+                                        lambda: AdvancedMathematicalModels.bollinger_bands_probability(prices))
         
         z_score = bb_data.get('z_score', 0)
         probability_reversal = bb_data.get('probability_reversal', 0.5)
@@ -962,8 +1347,8 @@ class HyperliquidAdvancedBot:
             strategy_used=strategy_name
         )
         
-        logger.info(f"🔄 {symbol} {direction.upper()}: ${current_price:.2f} "
-                   f"| Strategy: {strategy_name} | Confidence: {confidence:.2f}")
+        logger.info("🔄 %s %s: $%.2f | Strategy: %s | Confidence: %.2f",
+                   symbol, direction.upper(), current_price, strategy_name, confidence)
         
         return signal
     
@@ -986,28 +1371,40 @@ class HyperliquidAdvancedBot:
         return round(size / lot_size) * lot_size
 
     async def execute_trade(self, signal: TradingSignal):
-        """Execute trade based on signal"""
+        """Execute trade based on signal (at most one order in flight per symbol)"""
+        if not self.order_states.begin_open(signal.symbol):
+            logger.debug("%s is %s, skipping entry", signal.symbol, self.order_states.phase(signal.symbol))
+            return
+        try:
+            await self.open_position(signal)
+        finally:
+            self.order_states.abort_open(signal.symbol)
+    
+    async def open_position(self, signal: TradingSignal):
+        """Size, place and track an entry order (symbol already claimed by execute_trade)"""
         try:
             # Check if we already have a position for this symbol
             if signal.symbol in self.current_positions:
-                logger.info(f"Already have position in {signal.symbol}, skipping trade")
+                logger.info("Already have position in %s, skipping trade", signal.symbol)
                 return
             
-            # Small account protection - limit total positions
-            if len(self.current_positions) >= self.max_positions:
-                logger.info(f"Max positions ({self.max_positions}) reached, skipping new trade")
+            # Small account protection - limit total positions (other entries in flight count too)
+            other_entries = self.order_states.count(OPENING) - 1
+            if len(self.current_positions) + other_entries >= self.max_positions:
+                logger.info("Max positions (%d) reached, skipping new trade", self.max_positions)
                 return
             
             # Check trade cooldown
             current_time = time.time()
             if current_time - self.last_trade_time.get(signal.symbol, 0) < self.trade_cooldown:
                 remaining_cooldown = self.trade_cooldown - (current_time - self.last_trade_time[signal.symbol])
-                logger.info(f"Trade cooldown active for {signal.symbol}, {remaining_cooldown:.1f}s remaining")
+                logger.info("Trade cooldown active for %s, %.1fs remaining", signal.symbol, remaining_cooldown)
                 return
             
             # Calculate position size (Hull MA Strategy - 15% of equity)
             account_value = await self.get_account_value()
             position_value = account_value * self.position_size_pct  # 15% of account
+            position_value *= self.regime_size_multipliers.get(self.regime.regime(signal.symbol), 1.0)
             raw_position_size = position_value / signal.entry_price
             
             # Apply lot size rounding for each symbol
@@ -1031,43 +1428,41 @@ class HyperliquidAdvancedBot:
             
             # Final check - ensure position is not zero
             if position_size <= 0:
-                logger.warning(f"Position size too small for {signal.symbol}, skipping trade")
+                logger.warning("Position size too small for %s, skipping trade", signal.symbol)
+                return
+            
+            # Simulated liquidation probability / expected shortfall cap the size
+            position_size = self.risk_capped_size(signal, position_size, account_value)
+            if position_size <= 0:
+                logger.warning("Risk engine left no size for %s, skipping trade", signal.symbol)
+                return
+            
+            # Portfolio check: correlated exposure and VaR with this order added
+            direction = 1 if signal.direction == "long" else -1
+            if not self.check_portfolio_risk(signal.symbol, direction * position_size * signal.entry_price, account_value):
                 return
             
             # Place order
             is_buy = signal.direction == "long"
+            submitted = time.perf_counter()
             
             # Add detailed logging before trade
-            logger.info(f"Attempting to execute trade: {signal.symbol} {signal.direction} "
-                       f"Size: {position_size:.6f} Price: {signal.entry_price:.4f}")
+            logger.info("Attempting to execute trade: %s %s Size: %.6f Price: %.4f",
+                       signal.symbol, signal.direction, position_size, signal.entry_price)
             
-            if self.paper_trading_mode:
-                # PAPER TRADING - No real money at risk
-                logger.info(f"📝 PAPER TRADE: {signal.symbol} {signal.direction} "
-                           f"Size: {position_size:.6f} @ ${signal.entry_price:.2f}")
+            if self.native_tpsl_enabled:
+                # Entry + exchange-side SL/TP in one atomic action (live or paper venue)
+                logger.info("Account address: %s", self.wallet.address)
+                logger.info("API Parameters: symbol=%s, is_buy=%s, size=%s, SL=%.4f, TP=%.4f",
+                           signal.symbol, is_buy, position_size, signal.stop_loss, signal.take_profit)
                 
-                # Simulate successful order
-                order_result = {
-                    'status': 'ok', 
-                    'response': {
-                        'type': 'order', 
-                        'data': {
-                            'statuses': [{
-                                'filled': {
-                                    'totalSz': str(position_size), 
-                                    'avgPx': str(signal.entry_price), 
-                                    'oid': f"PAPER_{int(time.time())}"
-                                }
-                            }]
-                        }
-                    }
-                }
+                order_result = await self.submit_entry_with_tpsl(signal, is_buy, position_size)
             else:
-                # REAL TRADING
-                logger.info(f"Account address: {self.wallet.address}")
-                logger.info(f"API Parameters: symbol={signal.symbol}, is_buy={is_buy}, size={position_size}")
+                # Plain market entry (live or paper venue)
+                logger.info("Account address: %s", self.wallet.address)
+                logger.info("API Parameters: symbol=%s, is_buy=%s, size=%s", signal.symbol, is_buy, position_size)
                 
-                order_result = self.exchange.market_open(
+                order_result = await self.rest.market_open(
                     signal.symbol,
                     is_buy,
                     position_size,
@@ -1075,141 +1470,603 @@ class HyperliquidAdvancedBot:
                 )
                 
                 # Log the full API response
-                logger.info(f"API Response: {order_result}")
+                logger.info("API Response: %s", order_result)
             
-            if order_result and order_result.get('status') == 'ok':
-                # Track position
+            order_status = parse_order_status(order_result)
+            if self.journal:
+                self.journal.record_order(self.name, signal.symbol, "open", signal.direction, position_size,
+                                          signal.entry_price, order_status, strategy=signal.strategy_used,
+                                          latency_ms=(time.perf_counter() - submitted) * 1000)
+            
+            if order_status['filled']:
+                # Track position at the ACTUAL fill (userFills will keep it exact from here)
+                filled_size = order_status['total_sz']
+                fill_price = order_status['avg_px']
                 position = Position(
                     symbol=signal.symbol,
                     side=signal.direction,
-                    size=position_size,
-                    entry_price=signal.entry_price,
-                    current_price=signal.entry_price,
+                    size=filled_size,
+                    entry_price=fill_price,
+                    current_price=fill_price,
                     unrealized_pnl=0.0,
-                    timestamp=datetime.now()
+                    timestamp=datetime.now(),
+                    strategy=signal.strategy_used
                 )
                 
                 self.current_positions[signal.symbol] = position
+                self.analytics.on_open(signal.symbol, signal.strategy_used)
+                if self.journal:
+                    self.journal.record_position(self.name, signal.symbol, "open", signal.direction, filled_size,
+                                                 fill_price, strategy=signal.strategy_used)
+                self.order_states.mark_open(signal.symbol)
                 self.total_trades += 1
                 self.last_trade_time[signal.symbol] = time.time()  # Update cooldown timer
+                self.request_snapshot()
                 
-                logger.info(f"Executed {signal.direction} trade for {signal.symbol}: "
-                           f"Size: {position_size:.4f}, Entry: {signal.entry_price:.4f}")
+                slippage = (fill_price - signal.entry_price) / signal.entry_price
+                logger.info("Executed %s trade for %s: Size: %.4f/%.4f, Entry: %.4f (signal %.4f, slippage %+.3f%%)",
+                           signal.direction, signal.symbol, filled_size, position_size, fill_price,
+                           signal.entry_price, slippage * 100)
                 
                 # Set stop loss and take profit orders
-                await self.set_risk_management_orders(signal, position_size)
+                await self.set_risk_management_orders(signal, filled_size)
                 
             else:
-                logger.error(f"Failed to execute trade for {signal.symbol}: {order_result}")
+                # Unfilled parent - the exchange drops its tpsl children too
+                self.protective_orders.pop(signal.symbol, None)
+                logger.error("Failed to execute trade for %s: %s | %s",
+                            signal.symbol, order_status['error'] or 'order not filled', order_result)
                 
         except Exception as e:
-            logger.error(f"Error executing trade for {signal.symbol}: {e}")
+            logger.error("Error executing trade for %s: %s", signal.symbol, e)
+    
+    def signed_exposures(self) -> Dict[str, float]:
+        """Held notional per symbol in USD (negative = short)"""
+        return {symbol: (1 if position.side == "long" else -1) * position.size * position.current_price
+                for symbol, position in self.current_positions.items()}
+    
+    def risk_capped_size(self, signal: TradingSignal, size: float, account_value: float) -> float:
+        """Shrink an entry until simulated liquidation probability and expected shortfall are within limits"""
+        if not self.covariance.ready() or account_value <= 0 or signal.symbol not in self.covariance.index:
+            return size
+        direction = 1 if signal.direction == "long" else -1
+        risk = self.risk_engine.evaluate(
+            account_value, self.signed_exposures(), signal.symbol, direction * size * signal.entry_price,
+            self.covariance.matrix(), self.covariance.symbols,
+            max_liquidation_prob=self.max_liquidation_prob, max_shortfall_pct=self.max_shortfall_pct
+        )
+        logger.info("🎲 %s risk: liquidation %.2f%% | ES $%.0f | size x%.2f (%.1fms)", signal.symbol,
+                   risk['liquidation_prob'] * 100, risk['expected_shortfall'], risk['size_fraction'],
+                   risk['duration_ms'])
+        if risk['size_fraction'] < 1.0:
+            size = self.round_to_lot_size(signal.symbol, size * risk['size_fraction'])
+        return size
+    
+    def check_portfolio_risk(self, symbol: str, notional: float, account_value: float) -> bool:
+        """Pre-order limits on correlated notional and 99% VaR (microseconds; skipped until warmed up)"""
+        if not self.covariance.ready() or account_value <= 0:
+            return True
+        risk = self.covariance.portfolio_check(self.signed_exposures(), symbol, notional, horizon=self.var_horizon)
+        
+        if risk['correlated_notional'] > self.max_correlated_leverage * account_value:
+            logger.info("🧮 %s rejected: correlated notional $%.0f > %.1fx account ($%.0f)", symbol,
+                       risk['correlated_notional'], self.max_correlated_leverage, account_value)
+            return False
+        if risk['marginal_var'] > 0 and risk['var_after'] > self.max_portfolio_var_pct * account_value:
+            logger.info("🧮 %s rejected: 99%% VaR $%.0f -> $%.0f exceeds %.0f%% of account ($%.0f)", symbol,
+                       risk['var_before'], risk['var_after'], self.max_portfolio_var_pct * 100, account_value)
+            return False
+        return True
     
     async def set_risk_management_orders(self, signal: TradingSignal, position_size: float):
-        """Log risk management levels (monitoring handles actual SL/TP)"""
+        """Confirm SL/TP protection (exchange-native trigger orders, monitoring as backstop)"""
         try:
-            # Don't place orders - let position monitoring handle SL/TP
-            logger.info(f"Risk management levels for {signal.symbol}: "
-                       f"SL: {signal.stop_loss:.4f}, TP: {signal.take_profit:.4f}")
-            logger.info(f"Position monitoring will handle automatic SL/TP execution")
+            logger.info("Risk management levels for %s: SL: %.4f, TP: %.4f",
+                       signal.symbol, signal.stop_loss, signal.take_profit)
             
+            orders = self.protective_orders.get(signal.symbol)
+            if orders:
+                # normalTpsl children are sized to the order; shrink them to what actually filled
+                if any(abs(spec['size'] - position_size) > 1e-12 for spec in orders.values()):
+                    await self.amend_protective_orders(signal.symbol, position_size)
+                logger.info("🛡️ Exchange-side SL/TP active for %s (position monitoring remains as backstop)",
+                           signal.symbol)
+            else:
+                logger.info("Position monitoring will handle automatic SL/TP execution")
+            
+        except Exception as e:
+            logger.error("Error setting risk management for %s: %s", signal.symbol, e)
+    
+    def round_price(self, symbol: str, price: float) -> float:
+        """Round to Hyperliquid's tick rules: 5 significant figures, max (6 - szDecimals) decimals"""
+        sz_decimals = self.exchange.info.asset_to_sz_decimals[self.exchange.info.name_to_asset(symbol)]
+        return round(float(f"{price:.5g}"), 6 - sz_decimals)
+    
+    def next_cloid(self) -> str:
+        """Client order id so trigger orders can be amended/cancelled without knowing the oid"""
+        from hyperliquid.utils.types import Cloid
+        self.cloid_counter += 1
+        return Cloid.from_int(self.cloid_counter).to_raw()
+    
+    def protective_order_request(self, symbol: str, spec: Dict, size: Optional[float] = None) -> Dict:
+        """SDK OrderRequest for a stored reduce-only trigger order spec"""
+        from hyperliquid.utils.types import Cloid
+        return {
+            "coin": symbol,
+            "is_buy": spec['is_buy'],
+            "sz": size if size is not None else spec['size'],
+            "limit_px": spec['limit_px'],
+            "order_type": {"trigger": {"triggerPx": spec['trigger_px'], "isMarket": True, "tpsl": spec['kind']}},
+            "reduce_only": True,
+            "cloid": Cloid.from_str(spec['cloid'])
+        }
+    
+    async def submit_entry_with_tpsl(self, signal: TradingSignal, is_buy: bool, size: float) -> Dict:
+        """Send the IOC entry and its SL/TP trigger orders as one normalTpsl-grouped action"""
+        symbol = signal.symbol
+        
+        # The signal's TP assumes notional = price * position_size_pct; derive the $ target from the real size
+        direction = 1 if is_buy else -1
+        signal.take_profit = signal.entry_price + direction * self.take_profit_pct / size
+        
+        # Aggressive IOC limit from our own latest mid - no extra allMids round-trip
+        entry_px = self.round_price(symbol, signal.entry_price * (1 + direction * self.market_slippage))
+        entry = {
+            "coin": symbol,
+            "is_buy": is_buy,
+            "sz": size,
+            "limit_px": entry_px,
+            "order_type": {"limit": {"tif": "Ioc"}},
+            "reduce_only": False
+        }
+        
+        specs = {}
+        for kind, trigger in (("tp", signal.take_profit), ("sl", signal.stop_loss)):
+            trigger_px = self.round_price(symbol, trigger)
+            specs[kind] = {
+                'kind': kind,
+                'cloid': self.next_cloid(),
+                'is_buy': not is_buy,
+                'size': size,
+                'trigger_px': trigger_px,
+                # Worst acceptable price once triggered (closing side crosses the book)
+                'limit_px': self.round_price(symbol, trigger_px * (1 - direction * self.market_slippage))
+            }
+        
+        requests = [entry] + [self.protective_order_request(symbol, spec) for spec in specs.values()]
+        order_result = await self.rest.bulk_orders(requests, grouping="normalTpsl")
+        
+        statuses = []
+        if order_result and order_result.get('status') == 'ok':
+            statuses = order_result.get('response', {}).get('data', {}).get('statuses', [])
+        child_errors = [status['error'] for status in statuses[1:] if isinstance(status, dict) and 'error' in status]
+        if statuses and not child_errors:
+            self.protective_orders[symbol] = specs
+        elif child_errors:
+            logger.warning("⚠️ %s: exchange rejected SL/TP trigger orders (%s) - falling back to "
+                          "position monitoring", symbol, '; '.join(child_errors))
+        return order_result
+    
+    async def cancel_protective_orders(self, symbol: str):
+        """Cancel the remaining SL/TP trigger orders once the position is gone"""
+        from hyperliquid.utils.types import Cloid
+        orders = self.protective_orders.pop(symbol, None)
+        if not orders:
+            return
+        try:
+            cancels = [{"coin": symbol, "cloid": Cloid.from_str(spec['cloid'])} for spec in orders.values()]
+            result = await self.rest.bulk_cancel_by_cloid(cancels)
+            # The triggered leg reports an error (already filled) - that's expected
+            logger.info("🛡️ Cancelled SL/TP orders for %s: %s", symbol, result)
+        except Exception as e:
+            logger.warning("⚠️ Could not cancel SL/TP orders for %s: %s", symbol, e)
+        self.request_snapshot()
+    
+    async def amend_protective_orders(self, symbol: str, size: float):
+        """Resize SL/TP trigger orders to the current position size"""
+        from hyperliquid.utils.types import Cloid
+        orders = self.protective_orders.get(symbol)
+        if not orders:
+            return
+        try:
+            modifies = [{"oid": Cloid.from_str(spec['cloid']),
+                         "order": self.protective_order_request(symbol, spec, size)}
+                        for spec in orders.values()]
+            result = await self.rest.bulk_modify_orders(modifies)
+            for spec in orders.values():
+                spec['size'] = size
+            logger.info("🛡️ Resized SL/TP orders for %s to %s: %s", symbol, size, result)
         except Exception as e:
-            logger.error(f"Error logging risk management for {signal.symbol}: {e}")
+            logger.warning("⚠️ Could not resize SL/TP orders for %s: %s", symbol, e)
+        self.request_snapshot()
     
     async def get_account_value(self) -> float:
         """Get current account value"""
         try:
-            user_state = self.info.user_state(self.wallet.address)
+            user_state = await self.rest.user_state(self.wallet.address)
             if user_state and 'marginSummary' in user_state:
                 account_value = float(user_state.get('marginSummary', {}).get('accountValue', 100.0))
-                logger.info(f"Current account value: ${account_value:.2f}")
+                logger.debug("Current account value: $%.2f", account_value)  # Fetched on every entry
                 return account_value
             else:
                 logger.warning("Could not get account value from API")
                 return 100.0
         except Exception as e:
-            logger.error(f"Error getting account value: {e}")
+            logger.error("Error getting account value: %s", e)
             return 100.0  # Default fallback
     
+    def mark_position(self, position: Position, current_price: float) -> float:
+        """Mark a position to the latest price; returns PnL as a fraction of entry notional"""
+        position.current_price = current_price
+        if position.side == "long":
+            position.unrealized_pnl = (current_price - position.entry_price) * position.size
+        else:
+            position.unrealized_pnl = (position.entry_price - current_price) * position.size
+        self.analytics.mark(position.symbol, position.unrealized_pnl)
+        
+        position_value = position.entry_price * position.size
+        return position.unrealized_pnl / position_value if position_value > 0 else 0  # Avoid division by zero
+    
+    async def check_position_exit(self, symbol: str, position: Position):
+        """Close the position if it hit stop loss / take profit (manual risk management)"""
+        if self.order_states.in_flight(symbol):
+            return
+        
+        position_value = position.entry_price * position.size
+        pnl_pct = position.unrealized_pnl / position_value if position_value > 0 else 0
+        
+        if pnl_pct <= -self.stop_loss_pct or pnl_pct >= self.take_profit_pct:
+            logger.info("🎯 CLOSING %s %s: PnL: %.2f%% (%s)", symbol, position.side, pnl_pct * 100,
+                      'STOP LOSS' if pnl_pct <= -self.stop_loss_pct else 'TAKE PROFIT')
+            await self.close_position(symbol, position, "Risk management")
+    
+    def stop_is_near(self, position: Position, price: float) -> bool:
+        """`price` is within stop_proximity of the stop-loss distance"""
+        move = (price - position.entry_price) / position.entry_price if position.entry_price > 0 else 0
+        pnl_pct = move if position.side == "long" else -move
+        return pnl_pct <= -self.stop_loss_pct * (1 - self.stop_proximity)
+    
     async def monitor_positions(self):
-        """Monitor open positions and update ML models"""
+        """Monitor open positions (backstop for the tick-driven exit checks)"""
         while self.is_running:
             try:
                 for symbol, position in list(self.current_positions.items()):
                     # Update current price
                     if symbol in self.market_data_history and self.market_data_history[symbol]:
                         current_price = self.market_data_history[symbol][-1].price
-                        position.current_price = current_price
-                        
-                        # Calculate PnL
-                        if position.side == "long":
-                            position.unrealized_pnl = (current_price - position.entry_price) * position.size
-                        else:
-                            position.unrealized_pnl = (position.entry_price - current_price) * position.size
-                        
-                        # Check if position should be closed (manual risk management)
-                        position_value = position.entry_price * position.size
-                        if position_value > 0:  # Avoid division by zero
-                            pnl_pct = position.unrealized_pnl / position_value
-                        else:
-                            pnl_pct = 0
+                        pnl_pct = self.mark_position(position, current_price)
                         
-                        if pnl_pct <= -self.stop_loss_pct or pnl_pct >= self.take_profit_pct:
-                            logger.info(f"🎯 CLOSING {symbol} {position.side}: PnL: {pnl_pct:.2%} "
-                                      f"({'STOP LOSS' if pnl_pct <= -self.stop_loss_pct else 'TAKE PROFIT'})")
-                            await self.close_position(symbol, position, "Risk management")
+                        await self.check_position_exit(symbol, position)
                         
                         # Debug: Log position status every 30 seconds
                         if int(time.time()) % 30 == 0:
-                            logger.info(f"📊 {symbol} {position.side}: Entry: ${position.entry_price:.2f}, "
-                                      f"Current: ${current_price:.2f}, PnL: {pnl_pct:.2%}")
+                            logger.info("📊 %s %s: Entry: $%.2f, Current: $%.2f, PnL: %.2f%%",
+                                      symbol, position.side, position.entry_price, current_price, pnl_pct * 100)
                 
                 await asyncio.sleep(1)  # Check every second
                 
             except Exception as e:
-                logger.error(f"Error monitoring positions: {e}")
+                logger.error("Error monitoring positions: %s", e)
                 await asyncio.sleep(5)
     
     async def close_position(self, symbol: str, position: Position, reason: str = "Manual"):
         """Close a position and update performance tracking"""
+        # Tick exits, the monitor loop and strategy exits can race - only one close reaches the exchange
+        if not self.order_states.begin_close(symbol):
+            return
         try:
-            logger.info(f"🔄 CLOSING {symbol} {position.side} position: Size: {position.size}, "
-                       f"PnL: ${position.unrealized_pnl:.2f} | Reason: {reason}")
+            logger.info("🔄 CLOSING %s %s position: Size: %s, PnL: $%.2f | Reason: %s",
+                       symbol, position.side, position.size, position.unrealized_pnl, reason)
             
-            # Close position via exchange
-            close_result = self.exchange.market_close(
+            # Close position via exchange (userFills may resize `position` while we wait)
+            requested_size = position.size
+            submitted = time.perf_counter()
+            close_result = await self.rest.market_close(
                 symbol,
-                position.size
+                requested_size
             )
+            latency_ms = (time.perf_counter() - submitted) * 1000
             
-            logger.info(f"Close API Response: {close_result}")
+            logger.debug("Close API response for %s: %s", symbol, close_result)
             
-            if close_result and close_result.get('status') == 'ok':
-                # Update performance tracking
-                self.total_pnl += position.unrealized_pnl
+            if close_result is None:
+                # SDK found no position for this coin - the exchange is already flat
+                logger.warning("⚠️ %s: no open position on exchange, dropping local position", symbol)
+                self.current_positions.pop(symbol, None)
+                self.analytics.forget(symbol)
+                self.order_states.mark_closed(symbol)
+                self.request_snapshot()
+                await self.cancel_protective_orders(symbol)
+                return
+            
+            close_status = parse_order_status(close_result)
+            if self.journal:
+                self.journal.record_order(self.name, symbol, "close", position.side, requested_size,
+                                          position.current_price, close_status, strategy=position.strategy,
+                                          latency_ms=latency_ms)
+            
+            if close_status['filled']:
+                exit_price = close_status['avg_px']
+                closed_size = close_status['total_sz']
                 
-                if position.unrealized_pnl > 0:
-                    self.profitable_trades += 1
+                if closed_size + 1e-12 < requested_size:
+                    logger.warning("⚠️ %s: partial close %s/%s @ %.4f", symbol, closed_size, requested_size,
+                                  exit_price)
+                    if not self.fill_tracking_enabled:
+                        # No fill stream - the reply is all we know about the remainder
+                        position.size = requested_size - closed_size
+                        await self.amend_protective_orders(symbol, position.size)
+                    # Otherwise userFills sets the remainder and its SL/TP, whether it lands before or after this reply
+                    return
                 
-                logger.info(f"✅ POSITION CLOSED: {symbol} | Total PnL: ${self.total_pnl:.2f}")
+                if not self.fill_tracking_enabled:
+                    # No fill stream - book PnL from the actual exit price
+                    direction = 1 if position.side == "long" else -1
+                    realized_pnl = (exit_price - position.entry_price) * closed_size * direction
+                    self.total_pnl += realized_pnl
+                    if realized_pnl > 0:
+                        self.profitable_trades += 1
+                    logger.info("✅ POSITION CLOSED: %s | PnL: $%.2f | Total PnL: $%.2f",
+                               symbol, realized_pnl, self.total_pnl)
+                    self.analytics.on_close(symbol, realized_pnl, strategy=position.strategy)
+                    if self.journal:
+                        self.journal.record_position(self.name, symbol, "close", position.side, closed_size,
+                                                     position.entry_price, exit_price=exit_price, pnl=realized_pnl,
+                                                     strategy=position.strategy, reason=reason)
                 
-                # Remove from current positions
-                del self.current_positions[symbol]
+                # Remove from current positions (fill stream may already have done so)
+                self.current_positions.pop(symbol, None)
+                self.order_states.mark_closed(symbol)
+                self.request_snapshot()
+                await self.cancel_protective_orders(symbol)
                 
-                logger.info(f"Closed {position.side} position in {symbol}: "
-                           f"PnL: {position.unrealized_pnl:.4f} ({reason})")
+                logger.info("Closed %s position in %s @ %.4f (%s)", position.side, symbol, exit_price, reason)
                 
                 # Update ML model with actual performance
-                if symbol in self.ml_engine.models:
+                if hasattr(self, 'ml_engine') and symbol in self.ml_engine.models:
                     predicted_change = 0.0  # Would need to store this from signal generation
-                    actual_change = (position.current_price - position.entry_price) / position.entry_price
+                    actual_change = (exit_price - position.entry_price) / position.entry_price
                     self.ml_engine.update_performance(symbol, predicted_change, actual_change)
                 
             else:
-                logger.error(f"Failed to close position for {symbol}: {close_result}")
+                logger.error("Failed to close position for %s: %s", symbol, close_status['error'] or close_result)
                 
         except Exception as e:
-            logger.error(f"Error closing position for {symbol}: {e}")
+            logger.error("Error closing position for %s: %s", symbol, e)
+        finally:
+            self.order_states.abort_close(symbol)
+    
+    def collect_state_sections(self) -> Dict[str, tuple]:
+        """Cheap on-loop capture of state as {section: (fingerprint, data)}"""
+        sections = {}
+        
+        positions = [asdict(position) for position in self.current_positions.values()]
+        sections['positions'] = (
+            tuple((p['symbol'], p['side'], p['size'], p['entry_price']) for p in positions),
+            positions
+        )
+        
+        counters = {
+            'total_trades': self.total_trades,
+            'profitable_trades': self.profitable_trades,
+            'total_pnl': self.total_pnl,
+            'total_fees': self.total_fees,
+            'last_trade_time': dict(self.last_trade_time)
+        }
+        sections['counters'] = (
+            (self.total_trades, self.profitable_trades, self.total_pnl, self.total_fees,
+             tuple(self.last_trade_time.items())),
+            counters
+        )
+        
+        sections['protective_orders'] = (
+            tuple((symbol, spec['cloid'], spec['size'])
+                  for symbol, orders in self.protective_orders.items() for spec in orders.values()),
+            {symbol: {kind: dict(spec) for kind, spec in orders.items()}
+             for symbol, orders in self.protective_orders.items()}
+        )
+        
+        if self.latest_signals:
+            sections['signals'] = (
+                tuple((symbol, id(signal)) for symbol, signal in self.latest_signals.items()),
+                {symbol: asdict(signal) for symbol, signal in self.latest_signals.items()}
+            )
+        
+        return sections
+    
+    async def save_state_snapshot(self):
+        """Write changed state sections to disk (serialization runs off the event loop)"""
+        try:
+            await self.state_store.save(self.collect_state_sections())
+        except Exception as e:
+            logger.error("State snapshot failed: %s", e)
+    
+    def request_snapshot(self):
+        """Ask the snapshot loop to persist now (after fills, closes, ...)"""
+        if self.snapshot_requested is not None:
+            self.snapshot_requested.set()
+    
+    async def snapshot_loop(self):
+        """Periodic incremental snapshots, plus immediate ones on request"""
+        while self.is_running:
+            try:
+                await asyncio.wait_for(self.snapshot_requested.wait(), timeout=self.snapshot_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.snapshot_requested.clear()
+            await self.save_state_snapshot()
+    
+    def restore_state(self):
+        """
+        Restore the last snapshot (positions, cooldowns, counters, signals).
+        Price history is not snapshotted - bootstrap_history() warm-starts it from candles.
+        """
+        started = time.perf_counter()
+        sections = self.state_store.load()
+        if not sections:
+            logger.info("💾 No state snapshot found - starting fresh")
+            return
+        
+        for data in sections.get('positions', []):
+            if data['symbol'] in self.symbols:
+                position = self.current_positions[data['symbol']] = Position(**data)
+                if isinstance(position.timestamp, datetime):
+                    self.analytics.on_open(position.symbol, position.strategy, opened_at=position.timestamp.timestamp())
+        
+        counters = sections.get('counters')
+        if counters:
+            self.total_trades = counters['total_trades']
+            self.profitable_trades = counters['profitable_trades']
+            self.total_pnl = counters['total_pnl']
+            self.total_fees = counters.get('total_fees', 0.0)
+            for symbol, last_trade in counters['last_trade_time'].items():
+                if symbol in self.last_trade_time:
+                    self.last_trade_time[symbol] = last_trade
+        
+        for symbol, data in sections.get('signals', {}).items():
+            if symbol in self.symbols:
+                self.latest_signals[symbol] = TradingSignal(**data)
+        
+        self.protective_orders.update(sections.get('protective_orders', {}))
+        
+        logger.info("💾 State restored in %.1fms: %d positions, %d trades",
+                   (time.perf_counter() - started) * 1000, len(self.current_positions), self.total_trades)
+    
+    async def reconcile_positions(self):
+        """Make current_positions match what the exchange actually holds"""
+        try:
+            user_state = await self.rest.user_state(self.wallet.address)
+        except Exception as e:
+            logger.error("Position reconciliation failed, keeping restored state: %s", e)
+            return
+        
+        exchange_positions = {}
+        for asset_position in (user_state or {}).get('assetPositions', []):
+            item = asset_position.get('position', {})
+            size = float(item.get('szi', 0))
+            if size != 0:
+                exchange_positions[item.get('coin')] = item
+        
+        # Positions we remember but the exchange no longer holds
+        for symbol in list(self.current_positions):
+            if symbol not in exchange_positions:
+                logger.warning("🔁 %s: restored position no longer open on exchange - dropping", symbol)
+                position = self.current_positions.pop(symbol)
+                self.analytics.forget(symbol)
+                if self.journal:
+                    self.journal.record_position(self.name, symbol, "drop", position.side, position.size,
+                                                 position.entry_price, strategy=position.strategy,
+                                                 reason="not open on exchange")
+                self.order_states.sync(symbol, 0)
+        
+        # Leftover SL/TP trigger orders for positions that are gone
+        for symbol in list(self.protective_orders):
+            if symbol not in exchange_positions:
+                await self.cancel_protective_orders(symbol)
+        
+        for symbol, item in exchange_positions.items():
+            size = float(item['szi'])
+            entry_price = float(item.get('entryPx') or 0)
+            side = "long" if size > 0 else "short"
+            self.fill_tracker.set_position(symbol, size, entry_price)
+            self.order_states.sync(symbol, size)
+            
+            if symbol not in self.symbols:
+                logger.warning("🔁 Exchange holds %s %s %s, which this bot does not trade", side, abs(size), symbol)
+                continue
+            
+            position = self.current_positions.get(symbol)
+            if position is None:
+                logger.warning("🔁 %s: adopting untracked %s position %s @ %.4f", symbol, side, abs(size), entry_price)
+                self.current_positions[symbol] = Position(
+                    symbol=symbol,
+                    side=side,
+                    size=abs(size),
+                    entry_price=entry_price,
+                    current_price=entry_price,
+                    unrealized_pnl=float(item.get('unrealizedPnl', 0)),
+                    timestamp=datetime.now()
+                )
+                self.analytics.on_open(symbol)
+                if self.journal:
+                    self.journal.record_position(self.name, symbol, "adopt", side, abs(size), entry_price,
+                                                 reason="untracked on exchange")
+            elif position.side != side or position.size != abs(size) or position.entry_price != entry_price:
+                logger.warning("🔁 %s: correcting restored position to exchange state %s %s @ %.4f",
+                              symbol, side, abs(size), entry_price)
+                position.side = side
+                position.size = abs(size)
+                position.entry_price = entry_price
+        
+        self.request_snapshot()
+    
+    def stream_state(self) -> Dict[str, Dict]:
+        """Dashboard view of this bot - small, flat and rounded so deltas stay compact"""
+        analytics = self.analytics
+        return {
+            'prices': {symbol: round(history[-1].price, 6)
+                       for symbol, history in self.market_data_history.items() if history},
+            'positions': {symbol: {
+                'side': position.side,
+                'size': position.size,
+                'entry': round(position.entry_price, 6),
+                'mark': round(position.current_price, 6),
+                'upnl': round(position.unrealized_pnl, 2),
+                'strategy': position.strategy,
+            } for symbol, position in self.current_positions.items()},
+            'signals': {symbol: {
+                'direction': signal.direction,
+                'confidence': round(signal.confidence, 3),
+                'entry': round(signal.entry_price, 6),
+                'sl': round(signal.stop_loss, 6),
+                'tp': round(signal.take_profit, 6),
+                'strategy': signal.strategy_used,
+            } for symbol, signal in self.latest_signals.items()},
+            'pnl': {
+                'total': round(self.total_pnl, 2),
+                'fees': round(self.total_fees, 2),
+                'trades': self.total_trades,
+                'wins': self.profitable_trades,
+                'equity': round(analytics.equity, 2),
+                'unrealized': round(analytics.unrealized_total, 2),
+                'drawdown': round(analytics.drawdown(), 2),
+                'max_drawdown': round(analytics.max_drawdown, 2),
+                'sharpe': round(analytics.sharpe(), 2),
+            },
+            'status': {
+                'running': self.is_running,
+                'ready': self.data_collection_complete,
+                'regime': {symbol: self.regime.regime(symbol) for symbol in self.symbols},
+            },
+        }
+    
+    def memory_census(self) -> Dict[str, Dict]:
+        """Counts and approximate bytes of the long-lived structures (for allocation snapshots)"""
+        census = {
+            'market_data_history': {
+                'points': sum(len(history) for history in self.market_data_history.values()),
+                'bytes': sum(estimate_container_size(history) for history in self.market_data_history.values()),
+            },
+            'trading_signals': {
+                'signals': len(self.trading_signals),
+                'bytes': estimate_container_size(self.trading_signals),
+            },
+            'price_history': {
+                'bytes': sum(history.get_metrics()['memory_bytes'] for history in self.price_history.values()),
+            },
+            'indicator_cache': {
+                'entries': self.indicator_cache.get_metrics()['entries'],
+            },
+        }
+        if hasattr(self, 'ml_engine'):
+            census['ml_models'] = {
+                'symbols': len(self.ml_engine.models),
+                'bytes': estimate_size(self.ml_engine.models, depth=6),
+            }
+        return census
+    
+    def regime_summary(self) -> str:
+        return ', '.join(f"{symbol}={self.regime.regime(symbol).title()}" for symbol in self.symbols)
     
     async def print_performance_summary(self):
         """Print optimized performance summary"""
@@ -1225,21 +2082,115 @@ class HyperliquidAdvancedBot:
                 show_detailed = time_since_detailed > 300  # 5 minutes
                 
                 win_rate = (self.profitable_trades / self.total_trades * 100) if self.total_trades > 0 else 0
-                total_collected = sum(len(history) for history in self.market_data_history.values())
                 
                 if show_detailed or self.total_trades == 0:
-                    logger.info("=== PERFORMANCE SUMMARY ===")
-                    logger.info(f"Trades: {self.total_trades} | Win Rate: {win_rate:.1f}% | PnL: ${self.total_pnl:.2f}")
-                    logger.info(f"Positions: {len(self.current_positions)} | Market: {self.market_condition.title()}")
-                    logger.info(f"Data: {total_collected}/{self.total_data_points_target} {'COMPLETE' if self.data_collection_complete else 'COLLECTING'}")
+                    logger.info("=== PERFORMANCE SUMMARY%s ===", f" [{self.name}]" if self.market_bus else "")
+                    logger.info("Trades: %d | Win Rate: %.1f%% | PnL: $%.2f | Fees: $%.2f",
+                               self.total_trades, win_rate, self.total_pnl, self.total_fees)
+                    logger.info("Positions: %d | Market: %s", len(self.current_positions), self.regime_summary())
+                    
+                    perf = self.analytics.get_metrics()
+                    logger.info("Equity: $%.2f | Drawdown: $%.2f (max $%.2f, %.1f%%) | Sharpe %.2f | Sortino %.2f | "
+                               "Avg hold %.0fm | Exposure %.0f%%",
+                               perf['equity'], perf['drawdown'], perf['max_drawdown'], perf['max_drawdown_pct'] * 100,
+                               perf['sharpe'], perf['sortino'], perf['avg_holding_s'] / 60, perf['exposure'] * 100)
+                    for group in ('by_strategy', 'by_symbol'):
+                        if perf[group]:
+                            logger.info("PnL %s: %s", group.replace('_', ' '), ' | '.join(
+                                f"{name} ${stats['pnl']:.2f} ({stats['trades']} trades, {stats['win_rate'] * 100:.0f}% win)"
+                                for name, stats in perf[group].items()))
+                    logger.info("Data: %d/%d %s bars %s", self.bars_collected, self.total_data_points_target,
+                               self.strategy_timeframe, 'COMPLETE' if self.data_collection_complete else 'COLLECTING')
+                    history_bytes = sum(self.price_history[s].get_metrics()['memory_bytes'] for s in self.symbols)
+                    logger.info("History: %s | %.1f MB tiered",
+                               ', '.join(f"{s}={self.history_span(s)}" for s in self.symbols), history_bytes / 1e6)
+                    
+                    if self.ws_feed:
+                        ws_metrics = self.ws_feed.get_metrics()
+                        logger.info("WS: %d/%d live | %d delivered, %d dupes | Stalls: %d | Reconnects: %d",
+                                   ws_metrics['live_connections'], ws_metrics['connections'],
+                                   ws_metrics['frames_delivered'], ws_metrics['duplicates_dropped'],
+                                   ws_metrics['stalls_detected'], ws_metrics['reconnects'])
+                    
+                    order_metrics = self.order_states.get_metrics()
+                    if order_metrics['in_flight'] or order_metrics['rejected_opens'] or order_metrics['rejected_closes']:
+                        logger.info("Orders: in flight %s | Rejected duplicates: %d opens, %d closes",
+                                   order_metrics['in_flight'], order_metrics['rejected_opens'],
+                                   order_metrics['rejected_closes'])
+                    
+                    cov_metrics = self.covariance.get_metrics()
+                    mc_metrics = self.risk_engine.get_metrics()
+                    logger.info("Risk: %d-symbol covariance, %d samples%s | Update %.0fus, check %.0fus | "
+                               "Monte Carlo: %d runs, last %.1fms, max %.1fms",
+                               cov_metrics['symbols'], cov_metrics['samples'],
+                               '' if cov_metrics['ready'] else ' (warming up)',
+                               cov_metrics['last_update_us'], cov_metrics['last_check_us'],
+                               mc_metrics['evaluations'], mc_metrics['last_duration_ms'],
+                               mc_metrics['max_duration_ms'])
+                    
+                    slot_metrics = self.strategy_slots.get_metrics()
+                    logger.info("Ingest: %d ticks -> %d evaluated | %d conflated, %d dropped | Max wait: %.0fms",
+                               slot_metrics['offered'], slot_metrics['delivered'], slot_metrics['conflated'],
+                               slot_metrics['dropped'], slot_metrics['max_wait_ms'])
+                    
+                    loop_metrics = self.watchdog.get_metrics()
+                    logger.info("Loop: lag p50/p99/max %.0f/%.0f/%.0fms | Stalls: %d%s",
+                               loop_metrics['lag_p50_ms'], loop_metrics['lag_p99_ms'], loop_metrics['max_lag_ms'],
+                               loop_metrics['stalls'],
+                               f" | Top: {loop_metrics['top_culprits'][0][0]}" if loop_metrics['top_culprits'] else '')
+                    
+                    batch_metrics = self.batch_scheduler.get_metrics()
+                    logger.info("Batching: sizes %s | Queue delay p50/p99: %.0f/%.0fms | %d flushes "
+                               "(%d near stop, %d on moves)",
+                               batch_metrics['batch_sizes'], batch_metrics['queue_delay_p50_ms'],
+                               batch_metrics['queue_delay_p99_ms'], batch_metrics['flushes'],
+                               batch_metrics['urgent_flushes'], batch_metrics['move_flushes'])
+                    
+                    if self.snapshot_enabled:
+                        snap_metrics = self.state_store.get_metrics()
+                        logger.info("Snapshots: %d saves, %d sections written | Last: %sms, %ss ago",
+                                   snap_metrics['saves'], snap_metrics['sections_written'],
+                                   snap_metrics['last_save_ms'], snap_metrics['last_save_age'])
+                    
+                    if self.journal:
+                        journal_metrics = self.journal.get_metrics()
+                        logger.info("Journal: %d rows in %d batches | Backlog: %d | Last/max batch: %.1f/%.1fms%s",
+                                   journal_metrics['written'], journal_metrics['batches'], journal_metrics['backlog'],
+                                   journal_metrics['last_batch_ms'], journal_metrics['max_batch_ms'],
+                                   f" | {journal_metrics['errors']} failed" if journal_metrics['errors'] else '')
+                    
+                    if self.state_stream:
+                        stream_metrics = self.state_stream.get_metrics()
+                        logger.info("Stream: %d clients | %d frames, %.1f KB sent | Frame %.2fms (max %.2fms)",
+                                   stream_metrics['clients'], stream_metrics['frames'],
+                                   stream_metrics['bytes_sent'] / 1024, stream_metrics['last_frame_ms'],
+                                   stream_metrics['max_frame_ms'])
+                    
+                    if self.paper_venue is not None:
+                        paper_metrics = self.paper_venue.get_metrics()
+                        logger.info("Paper: equity $%.2f | %d fills (%d partial, %d unfilled, %d triggered) | "
+                                   "Fees $%.2f | Funding $%.2f",
+                                   paper_metrics['account_value'], paper_metrics['fills'],
+                                   paper_metrics['partial_fills'], paper_metrics['unfilled'],
+                                   paper_metrics['triggered'], paper_metrics['fees_paid'],
+                                   paper_metrics['funding_paid'])
+                    
+                    if self.rest:
+                        rest_metrics = self.rest.get_metrics()
+                        logger.info("REST: %d sent, %d coalesced, %d x 429 | Limiter queue: %d (peak %d) | "
+                                   "Pool: %.0f%% (peak %.0f%%)",
+                                   rest_metrics['requests_sent'], rest_metrics['requests_coalesced'],
+                                   rest_metrics['rate_limited_responses'], rest_metrics['limiter_queue_depth'],
+                                   rest_metrics['limiter_max_queue_depth'], rest_metrics['pool_saturation'] * 100,
+                                   rest_metrics['pool_peak_saturation'] * 100)
                     
                     # Show positions only if they exist
                     if self.current_positions:
                         for symbol, position in self.current_positions.items():
                             pnl_pct = (position.unrealized_pnl / (position.entry_price * position.size)) * 100
                             emoji = "🟢" if pnl_pct > 0 else "🔴" if pnl_pct < -1 else "🟡"
-                            logger.info(f"  {emoji} {symbol}: {position.side.upper()} @ {position.entry_price:.4f} "
-                                       f"({pnl_pct:+.1f}%)")
+                            logger.info("  %s %s: %s @ %.4f (%+.1f%%)",
+                                       emoji, symbol, position.side.upper(), position.entry_price, pnl_pct)
                     
                     logger.info("=" * 30)
                     self.last_detailed_summary = current_time
@@ -1247,8 +2198,9 @@ class HyperliquidAdvancedBot:
                 else:
                     # Brief update
                     if self.total_trades > 0 or len(self.current_positions) > 0:
-                        logger.info(f"💹 Trades: {self.total_trades} | Positions: {len(self.current_positions)} | "
-                                   f"PnL: ${self.total_pnl:.2f} | {self.market_condition.title()}")
+                        logger.info("💹 Trades: %d | Positions: %d | PnL: $%.2f | %s",
+                                   self.total_trades, len(self.current_positions), self.total_pnl,
+                                   self.regime_summary())
                     await asyncio.sleep(120)  # Brief updates every 2 minutes
                 
             except Exception as e:
@@ -1377,6 +2329,12 @@ class HyperliquidAdvancedBot:
         }
         self.user_config['trading_strategy'] = strategy_map[strategy_choice]
         
+        self.user_config['timeframe'] = self.get_user_input(
+            "Select Bar Timeframe (strategy evaluates once per closed bar)",
+            options=list(BAR_TIMEFRAMES),
+            default="1m"
+        )
+        
         # 5. Position Sizing
         print("\n💰 STEP 5: POSITION SIZING")
         self.user_config['position_size_pct'] = self.get_user_input(
@@ -1397,13 +2355,44 @@ class HyperliquidAdvancedBot:
         # Show final configuration
         self.show_configuration_summary()
     
-    def apply_user_config(self):
+    def configure_from_dict(self, config: Dict, info=None, rest_client=None, meta=None, spot_meta=None,
+                            exchange=None):
+        """Headless configuration (fleet mode, harnesses) - same settings as configure_bot, no prompts"""
+        self.user_config.update(config)
+        self.apply_user_config(info=info, rest_client=rest_client, meta=meta, spot_meta=spot_meta, exchange=exchange)
+        logger.info("🤖 [%s] %s | %s | %s | SL %.1f%% | TP $%.0f | Size %.0f%% | Max positions %d",
+                   self.name, self.wallet.address, ', '.join(self.symbols), self.user_config['trading_strategy'],
+                   self.stop_loss_pct * 100, self.take_profit_pct, self.position_size_pct * 100, self.max_positions)
+    
+    def apply_user_config(self, info=None, rest_client=None, meta=None, spot_meta=None, exchange=None):
         """Apply user configuration to bot settings"""
-        # Set up Hyperliquid connection
+        # Set up Hyperliquid connection (fleet mode shares Info, exchange metadata and the REST budget;
+        # harnesses and paper venues pass their own Info/Exchange stand-ins)
+        STARTUP.mark("configure")
+        from eth_account import Account
+        from hyperliquid.exchange import Exchange
+        from hyperliquid.info import Info
+        from hyperliquid.utils import constants
+        STARTUP.mark("sdk import")
+        
         self.private_key = self.user_config['private_key']
         self.wallet = Account.from_key(self.private_key)
-        self.info = Info(constants.MAINNET_API_URL, skip_ws=True)
-        self.exchange = Exchange(self.wallet, constants.MAINNET_API_URL, account_address=self.wallet.address)
+        self.info = info or Info(constants.MAINNET_API_URL, skip_ws=True)
+        self.paper_trading_mode = self.user_config.get('paper_trading', self.paper_trading_mode)
+        self.paper_balance = self.user_config.get('paper_balance', self.paper_balance)
+        if self.paper_trading_mode and exchange is None:
+            # Market data stays live; orders and account state live in the simulator
+            self.paper_venue = exchange = SimulatedExchange(balance=self.paper_balance, latency=self.paper_latency,
+                                                            info=self.info)
+        self.exchange = exchange or Exchange(self.wallet, constants.MAINNET_API_URL, meta=meta,
+                                             account_address=self.wallet.address, spot_meta=spot_meta)
+        if rest_client is not None:
+            self.rest = rest_client.for_exchange(self.exchange)
+        else:
+            self.rest = HyperliquidRestClient(self.info, self.exchange,
+                                              max_retries=self.max_retries, retry_delay=self.retry_delay)
+        if self.paper_venue is not None:
+            self.rest.info = PaperInfo(self.rest.info, self.paper_venue)
         
         # Update bot parameters
         self.symbols = self.user_config['symbols']
@@ -1411,16 +2400,23 @@ class HyperliquidAdvancedBot:
         self.take_profit_pct = self.user_config['take_profit_target']
         self.position_size_pct = self.user_config['position_size_pct']
         self.max_positions = self.user_config['max_positions']
+        self.strategy_timeframe = self.user_config.get('timeframe', '1m')
+        self.volatility_threshold = self.user_config.get('volatility_threshold', self.volatility_threshold)
+        self.trend_threshold = self.user_config.get('trend_threshold', self.trend_threshold)
+        self.regime_strategies = self.user_config.get('regime_strategies', self.regime_strategies)
         
         # Update data structures for selected symbols
         self.market_data_history = {symbol: deque(maxlen=200) for symbol in self.symbols}
-        self.data_buffer = {symbol: [] for symbol in self.symbols}
-        self.last_batch_process = {symbol: time.time() for symbol in self.symbols}
         self.recent_signals = {symbol: [] for symbol in self.symbols}
         self.last_trade_time = {symbol: 0 for symbol in self.symbols}
-        
-        # Update data points target (50 per symbol as requested)
-        self.data_points_per_symbol = 50
+        self.last_tick_time = {symbol: None for symbol in self.symbols}
+        self.bars = BarAggregator(history_length=max(self.bar_history_length, self.wma3_period + 2))
+        self.price_history = {symbol: TieredPriceHistory() for symbol in self.symbols}
+        self.regime = RegimeClassifier(volatility_threshold=self.volatility_threshold,
+                                       trend_threshold=self.trend_threshold)
+        
+        # Update data points target (closed bars per symbol for the selected strategy)
+        self.data_points_per_symbol = self.required_bars()
         self.total_data_points_target = len(self.symbols) * self.data_points_per_symbol
         
         self.config_complete = True
@@ -1430,14 +2426,15 @@ class HyperliquidAdvancedBot:
         print("\n" + "="*60)
         print("✅ BOT CONFIGURATION COMPLETE")
         print("="*60)
-        print(f"🔐 Wallet: {self.wallet.address}")
+        print(f"🔐 Wallet: {self.wallet.address}{' (PAPER - simulated exchange)' if self.paper_venue else ''}")
         print(f"📈 Symbols: {', '.join(self.symbols)}")
         print(f"🛡️ Stop Loss: {self.stop_loss_pct*100:.1f}%")
         print(f"🎯 Take Profit: ${self.take_profit_pct:.0f}")
         print(f"📊 Strategy: {self.user_config['trading_strategy'].replace('_', ' ').title()}")
         print(f"💰 Position Size: {self.position_size_pct*100:.0f}% of account")
         print(f"🔄 Max Positions: {self.max_positions}")
-        print(f"📊 Data Collection: {self.total_data_points_target} points ({self.data_points_per_symbol} per symbol)")
+        print(f"🕯️ Bars: {self.strategy_timeframe} (signals evaluated on bar close)")
+        print(f"📊 Data Collection: {self.total_data_points_target} bars ({self.data_points_per_symbol} per symbol)")
         print("="*60)
         
         confirm = input("\n🚀 Start trading with these settings? (yes/no): ").strip().lower()
@@ -1447,52 +2444,357 @@ class HyperliquidAdvancedBot:
         
         print("\n🚀 STARTING TRADING BOT...")
 
+    def runtime_settings(self) -> Dict:
+        """Current values of everything reconfigure() can change"""
+        return {
+            'symbols': list(self.symbols),
+            'stop_loss_pct': self.stop_loss_pct,
+            'take_profit_target': self.take_profit_pct,
+            'trading_strategy': self.user_config.get('trading_strategy', 'hull_ma'),
+            'timeframe': self.strategy_timeframe,
+            'position_size_pct': self.position_size_pct,
+            'max_positions': self.max_positions,
+            'regime_strategies': dict(self.regime_strategies),
+            'volatility_threshold': self.regime.volatility_threshold,
+            'trend_threshold': self.regime.trend_threshold,
+        }
+    
+    def reconfigure(self, changes: Dict, apply: bool = True) -> List[str]:
+        """
+        Apply runtime settings to the running bot; returns the names that changed.
+        
+        Everything is validated before anything is touched (ValueError = nothing
+        applied), then applied without yielding to the loop, so no tick or order
+        sees half the old and half the new settings. Kept symbols keep their
+        history, bars and indicator state; added ones are allocated and
+        backfilled, removed ones freed. apply=False only validates.
+        """
+        current = self.runtime_settings()
+        config = validate_runtime_config({**current, **changes})
+        changed = [key for key in RUNTIME_KEYS if config[key] != current[key]]
+        added = [symbol for symbol in config['symbols'] if symbol not in self.symbols]
+        removed = [symbol for symbol in self.symbols if symbol not in config['symbols']]
+        busy = [symbol for symbol in removed
+                if symbol in self.current_positions or self.order_states.phase(symbol) in IN_FLIGHT]
+        if busy:
+            raise ValueError(f"{', '.join(busy)}: open position or order in flight - close it before removing")
+        if not apply or not changed:
+            return changed
+        
+        for symbol in removed:
+            self.remove_symbol(symbol)
+        for symbol in added:
+            self.add_symbol(symbol)
+        self.symbols = config['symbols']
+        self.user_config.update(config)
+        self.stop_loss_pct = config['stop_loss_pct']
+        self.take_profit_pct = config['take_profit_target']
+        self.position_size_pct = config['position_size_pct']
+        grown = range(self.max_positions + 2, config['max_positions'] + 2)
+        self.max_positions = config['max_positions']
+        self.strategy_timeframe = config['timeframe']  # Every timeframe's bars are built already
+        self.regime_strategies = config['regime_strategies']
+        self.volatility_threshold = self.regime.volatility_threshold = config['volatility_threshold']
+        self.trend_threshold = self.regime.trend_threshold = config['trend_threshold']
+        self.data_points_per_symbol = self.required_bars()
+        self.total_data_points_target = len(self.symbols) * self.data_points_per_symbol
+        
+        # Monte Carlo shocks for the larger books are drawn here, not in the next order path
+        for dimension in grown:
+            self.risk_engine.shocks(dimension)
+        if added and self.is_running and self.bootstrap_enabled:
+            self.background.spawn(self.bootstrap_history(added), name=f"{self.name}-bootstrap")
+        logger.info("⚙️ [%s] Reconfigured: %s", self.name, ', '.join(f"{key}={config[key]}" for key in changed))
+        return changed
+    
+    def add_symbol(self, symbol: str):
+        """Allocate per-symbol state (shared history comes from the bus in fleet mode)"""
+        if self.market_bus is not None:
+            self.market_bus.subscribe(self, symbol)
+        else:
+            self.market_data_history[symbol] = deque(maxlen=200)
+            self.price_history[symbol] = TieredPriceHistory()
+            self.last_tick_time[symbol] = None
+        self.recent_signals[symbol] = []
+        self.last_trade_time.setdefault(symbol, 0)
+    
+    def remove_symbol(self, symbol: str):
+        """Free per-symbol state (caller made sure nothing is open)"""
+        if self.market_bus is not None:
+            self.market_bus.unsubscribe(self, symbol)
+        else:
+            self.market_data_history.pop(symbol, None)
+            self.price_history.pop(symbol, None)
+            self.last_tick_time.pop(symbol, None)
+            self.bars.forget(symbol)
+            self.covariance.forget(symbol)
+        for state in (self.recent_signals, self.latest_signals, self.last_trade_time):
+            state.pop(symbol, None)
+        self.strategy_slots.discard(symbol)
+        self.batch_scheduler.forget(symbol)
+        self.regime.forget(symbol)
+    
+    def apply_runtime_config_file(self, path: str) -> str:
+        changed = self.reconfigure(load_runtime_config(path))
+        return f"applied: {', '.join(changed)}" if changed else "unchanged"
+    
+    async def start_session(self):
+        """Connect, restore and warm up - everything between configuration and live trading"""
+        if self.journal_enabled and self.journal is None:
+            self.journal = TradeJournal(self.journal_path)
+            self.journal.start()
+        
+        if self.paper_venue is not None:
+            # Simulated fills (entries, closes, triggered SL/TP) arrive like userFills frames
+            loop = asyncio.get_running_loop()
+            self.paper_venue.on_fill = lambda fill: loop.call_soon_threadsafe(self.deliver_paper_fill, fill)
+            logger.info("📝 PAPER TRADING on the local matching simulator ($%s, %.0fms latency)",
+                       format(self.paper_balance, ',.0f'), self.paper_latency * 1000)
+        
+        # Verify account connection
+        await self.verify_account_connection()
+        
+        # Restore last snapshot, then trust the exchange over our memory
+        if self.snapshot_enabled:
+            self.restore_state()
+            await self.reconcile_positions()
+        
+        # Seed indicator history so trading can start in seconds, not minutes
+        if self.bootstrap_enabled:
+            await self.bootstrap_history()
+        
+        # Draw the Monte Carlo shocks now rather than in the first order path
+        for dimension in range(1, self.max_positions + 2):
+            self.risk_engine.shocks(dimension)
+        
+        self.is_running = True
+        self.snapshot_requested = asyncio.Event()
+        logger.info("🚀 Bot configured for %s trading", ', '.join(self.symbols))
+        logger.info("📊 Strategy: %s | SL: %.1f%% | TP: $%.0f",
+                   self.user_config['trading_strategy'].title(), self.stop_loss_pct * 100, self.take_profit_pct)
+        logger.info("🔄 Starting data collection and trading...")
+        STARTUP.mark("session")
+    
+    def background_tasks(self) -> List[asyncio.Task]:
+        """Per-bot loops that run alongside the market data feed"""
+        tasks = [
+            asyncio.create_task(self.strategy_loop(), name=f"{self.name}-strategy"),
+            asyncio.create_task(self.monitor_positions(), name=f"{self.name}-monitor"),
+            asyncio.create_task(self.print_performance_summary(), name=f"{self.name}-summary")
+        ]
+        if self.snapshot_enabled:
+            tasks.append(asyncio.create_task(self.snapshot_loop(), name=f"{self.name}-snapshot"))
+        return tasks
+    
+    async def shutdown(self):
+        """Stop loops, persist final state and release the REST pool"""
+        self.is_running = False
+        self.strategy_slots.close()
+        self.watchdog.stop()
+        
+        # Cleanup and save final state
+        try:
+            if hasattr(self, 'ml_engine'):
+                self.ml_engine.save_models()
+                logger.info("ML models saved successfully")
+        except Exception as e:
+            logger.warning("Could not save models: %s", e)
+        
+        # Final state snapshot so the next start resumes where we left off
+        if self.snapshot_enabled and self.config_complete:
+            await self.save_state_snapshot()
+        
+        if self.rest:
+            self.rest.close()
+        
+        # Flush the journal (the fleet closes its shared one after every bot is down)
+        if self.journal and self.market_bus is None:
+            self.journal.close()
+        
+        # Final summary
+        if self.total_trades > 0:
+            win_rate = (self.profitable_trades / self.total_trades * 100)
+            logger.info("Final Stats: %d trades, %.1f%% win rate, $%.2f PnL", self.total_trades, win_rate, self.total_pnl)
+        
+        logger.info("Bot shutdown complete")
+    
     async def run(self):
         """Main bot execution loop with user configuration"""
         try:
             # Get user configuration first
             self.configure_bot()
+            if os.path.exists(self.runtime_config_path):
+                self.config_watcher = ConfigWatcher(self.runtime_config_path, self.apply_runtime_config_file)
+                logger.info("⚙️ %s: %s", self.runtime_config_path, self.config_watcher.reload())
             
-            # Verify account connection
-            self.verify_account_connection()
+            await self.start_session()
             
-            self.is_running = True
-            logger.info(f"🚀 Bot configured for {', '.join(self.symbols)} trading")
-            logger.info(f"📊 Strategy: {self.user_config['trading_strategy'].title()} | SL: {self.stop_loss_pct*100:.1f}% | TP: ${self.take_profit_pct:.0f}")
-            logger.info("🔄 Starting data collection and trading...")
+            self.profiling = ProfilingControl(self.memory_census, out_dir=self.profile_dir, port=self.control_port,
+                                              commands=ConfigControl([self], self.config_watcher).commands())
+            await self.profiling.start()
             
             # Start concurrent tasks
-            tasks = [
-                asyncio.create_task(self.connect_websocket(), name="websocket"),
-                asyncio.create_task(self.monitor_positions(), name="monitor"),
-                asyncio.create_task(self.print_performance_summary(), name="summary")
-            ]
+            tasks = [asyncio.create_task(self.connect_websocket(), name="websocket"),
+                     asyncio.create_task(self.watchdog.run(), name="loop-watchdog")]
+            tasks.extend(self.background_tasks())
+            
+            if self.stream_port:
+                self.state_stream = StateStream(self.stream_state, port=self.stream_port, max_fps=self.stream_fps)
+                await self.state_stream.start()
+                tasks.append(asyncio.create_task(self.state_stream.run(), name="state-stream"))
+            if self.config_watcher:
+                tasks.append(asyncio.create_task(self.config_watcher.run(), name="config-watcher"))
             
             await asyncio.gather(*tasks, return_exceptions=True)
             
         except KeyboardInterrupt:
             logger.info("⏹️ Bot stopped by user")
         except Exception as e:
-            logger.error(f"❌ Critical bot error: {e}")
+            logger.error("❌ Critical bot error: %s", e)
         finally:
-            self.is_running = False
-            
-            # Cleanup and save final state
-            try:
-                if hasattr(self, 'ml_engine'):
-                    self.ml_engine.save_models()
-                    logger.info("ML models saved successfully")
-            except Exception as e:
-                logger.warning(f"Could not save models: {e}")
-            
-            # Final summary
-            if self.total_trades > 0:
-                win_rate = (self.profitable_trades / self.total_trades * 100)
-                logger.info(f"Final Stats: {self.total_trades} trades, {win_rate:.1f}% win rate, ${self.total_pnl:.2f} PnL")
-            
-            logger.info("Bot shutdown complete")
+            if self.profiling:
+                self.profiling.close()
+            if self.state_stream:
+                self.state_stream.close()
+            if self.config_watcher:
+                self.config_watcher.stop()
+            await self.shutdown()
+
+def reload_fleet_config(path: str, bots: List[HyperliquidAdvancedBot]) -> str:
+    """Apply a re-read fleet config to the running bots (all validated before any is changed)"""
+    fleet = load_fleet_config(path)
+    by_name = {bot.name: bot for bot in bots}
+    plans, skipped = [], []
+    for instance in fleet['instances']:
+        bot = by_name.get(instance['name'])
+        if bot is None:
+            skipped.append(instance['name'])
+            continue
+        changes = {key: value for key, value in instance['config'].items() if key in RUNTIME_KEYS}
+        bot.reconfigure(changes, apply=False)
+        plans.append((bot, changes))
+    results = []
+    for bot, changes in plans:
+        changed = bot.reconfigure(changes)
+        if changed:
+            results.append(f"{bot.name}: {', '.join(changed)}")
+    if skipped:
+        logger.warning("⚙️ New bots need a restart: %s", ', '.join(skipped))
+    return f"applied: {'; '.join(results)}" if results else "unchanged"
+
+async def run_fleet(config_path: str):
+    """Headless mode: many bots (accounts x strategies) sharing one market-data bus"""
+    from hyperliquid.info import Info
+    from hyperliquid.utils import constants
+    
+    fleet = load_fleet_config(config_path)
+    
+    # One Info, one copy of exchange metadata and one IP-wide REST budget for every account
+    info = Info(constants.MAINNET_API_URL, skip_ws=True)
+    meta, spot_meta = info.meta(), info.spot_meta()
+    shared_rest = HyperliquidRestClient(info)
+    
+    bots = []
+    bus = None
+    profiling = None
+    journal = None
+    stream = None
+    watcher = None
+    try:
+        for instance in fleet['instances']:
+            bot = HyperliquidAdvancedBot()
+            bot.name = instance['name']
+            bot.state_store = StateSnapshotStore(os.path.join(fleet['state_dir'], bot.name))
+            bot.configure_from_dict(instance['config'], info=info, rest_client=shared_rest,
+                                    meta=meta, spot_meta=spot_meta)
+            bots.append(bot)
+        
+        bus = MarketDataBus(bots[0].ws_url, connections=fleet['ws_connections'],
+                            stall_timeout=fleet['ws_stall_timeout'],
+                            bar_history_length=max(bot.bars.history_length for bot in bots))
+        # One loop, one watchdog - every bot reports the same lag
+        watchdog = LoopWatchdog()
+        # One journal - rows carry the bot name
+        journal = TradeJournal(fleet['journal_path'])
+        journal.start()
+        for bot in bots:
+            bus.attach(bot)
+            bot.watchdog = watchdog
+            bot.journal = journal
+        
+        # Sequential on purpose: bots share history, so later bootstraps only fetch the delta
+        for bot in bots:
+            await bot.start_session()
+        bus.covariance.seed({symbol: history.closes(60, periods=bots[0].strategy_lookback)
+                             for symbol, history in bus.price_history.items()}, 60)
+        
+        # Edits to the fleet file reconfigure the running bots (same validation as at startup)
+        watcher = ConfigWatcher(config_path, lambda path: reload_fleet_config(path, bots))
+        profiling = ProfilingControl(lambda: {f"{bot.name}.{name}": stats for bot in bots
+                                              for name, stats in bot.memory_census().items()},
+                                     out_dir=fleet['profile_dir'], port=fleet['control_port'],
+                                     commands=ConfigControl(bots, watcher).commands())
+        await profiling.start()
+        
+        bus.is_running = True
+        logger.info("🚌 Fleet running: %s bots on one market-data feed", len(bots))
+        tasks = [asyncio.create_task(bus.run(), name="bus"),
+                 asyncio.create_task(bus.report_loop(), name="bus-report"),
+                 asyncio.create_task(watchdog.run(), name="loop-watchdog"),
+                 asyncio.create_task(watcher.run(), name="config-watcher")]
+        for bot in bots:
+            tasks.extend(bot.background_tasks())
+        
+        if fleet['stream_port']:
+            # One stream for the whole fleet - per-bot sections keyed by bot name
+            stream = StateStream(lambda: {bot.name: bot.stream_state() for bot in bots},
+                                 port=fleet['stream_port'], max_fps=fleet['stream_fps'])
+            await stream.start()
+            tasks.append(asyncio.create_task(stream.run(), name="state-stream"))
+        
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+    except KeyboardInterrupt:
+        logger.info("⏹️ Fleet stopped by user")
+    except Exception as e:
+        logger.error("❌ Critical fleet error: %s", e)
+    finally:
+        if bus:
+            bus.is_running = False
+        if profiling:
+            profiling.close()
+        if stream:
+            stream.close()
+        if watcher:
+            watcher.stop()
+        for bot in bots:
+            await bot.shutdown()
+        if journal:
+            journal.close()
+        shared_rest.close()
 
 # Main execution
 if __name__ == "__main__":
-    bot = HyperliquidAdvancedBot()
-    asyncio.run(bot.run()) 
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Hyperliquid trading bot")
+    parser.add_argument("--config", help="Headless fleet config (JSON); omit for interactive setup")
+    args = parser.parse_args()
+    
+    configure_logging('hyperliquid_advanced_bot.log', json_log_file=JSON_LOG_FILE)
+    
+    # Set console to handle UTF-8 on Windows
+    if sys.platform == 'win32':
+        try:
+            import locale
+            locale.setlocale(locale.LC_ALL, 'en_US.UTF-8')
+        except:
+            pass
+    
+    # Overlap the SDK import with argument parsing / the setup prompts
+    threading.Thread(target=preload_sdk, name="sdk-preload", daemon=True).start()
+    
+    if args.config:
+        asyncio.run(run_fleet(args.config))
+    else:
+        bot = HyperliquidAdvancedBot()
+        asyncio.run(bot.run())
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LatestValueSlots:
+    """
+    Per-key latest-value mailbox between a fast producer and a slow consumer.
+
+    The producer (socket reader) never waits: offering a value for a key that
+    is still pending replaces it (conflation), optionally merging the two via
+    `merge`. The consumer takes keys in the order they first became pending,
+    so one busy symbol cannot starve the others, and always sees the newest
+    value. Offers made after close() are dropped.
+    """
+
+    def __init__(self, merge: Optional[Callable[[Any, Any], Any]] = None):
+        self.merge = merge
+        self._slots: Dict[Hashable, Tuple[Any, float]] = {}  # key -> (value, first pending time)
+        self._ready = asyncio.Event()
+        self.closed = False
+
+        # Metrics
+        self.offered = 0
+        self.conflated = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def offer(self, key: Hashable, value: Any):
+        """Publish the latest value for a key (never blocks)"""
+        if self.closed:
+            self.dropped += 1
+            return
+        self.offered += 1
+        pending = self._slots.get(key)
+        if pending is not None:
+            self.conflated += 1
+            if self.merge is not None:
+                value = self.merge(pending[0], value)
+            self._slots[key] = (value, pending[1])
+        else:
+            self._slots[key] = (value, time.monotonic())
+        self._ready.set()
+
+    async def take(self) -> Tuple[Optional[Hashable], Any]:
+        """Oldest pending key and its newest value; (None, None) once closed"""
+        while not self._slots:
+            if self.closed:
+                return None, None
+            self._ready.clear()
+            await self._ready.wait()
+        key = next(iter(self._slots))
+        value, since = self._slots.pop(key)
+        self.last_wait = time.monotonic() - since
+        self.max_wait = max(self.max_wait, self.last_wait)
+        self.delivered += 1
+        return key, value
+
+    def discard(self, key: Hashable):
+        """Drop a pending value (key no longer wanted)"""
+        if self._slots.pop(key, None) is not None:
+            self.dropped += 1
+
+    def close(self):
+        """Stop accepting values and wake the consumer; pending values count as dropped"""
+        self.closed = True
+        self.dropped += len(self._slots)
+        self._slots.clear()
+        self._ready.set()
+
+    def pending(self) -> int:
+        return len(self._slots)
+
+    def get_metrics(self) -> Dict:
+        return {
+            'offered': self.offered,
+            'conflated': self.conflated,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'pending': len(self._slots),
+            'last_wait_ms': self.last_wait * 1000,
+            'max_wait_ms': self.max_wait * 1000,
+        }
@@ -0,0 +1,165 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrackedPosition:
+    coin: str
+    size: float = 0.0           # Signed: >0 long, <0 short
+    entry_price: float = 0.0    # Size-weighted average entry of the open lifecycle
+    realized_pnl: float = 0.0   # closedPnl booked by the exchange in this lifecycle
+    fees: float = 0.0           # Fees paid in this lifecycle
+
+
+@dataclass
+class FillUpdate:
+    coin: str
+    size: float
+    entry_price: float
+    fill_price: float
+    fill_size: float
+    fee: float
+    closed: Optional[TrackedPosition] = None  # Set when a lifecycle went flat (or flipped)
+
+
+def parse_order_status(order_result: Dict) -> Dict:
+    """
+    Pull the first order status out of an /exchange order response.
+    Returns {'filled': bool, 'resting': bool, 'error': str|None, 'oid', 'avg_px', 'total_sz'}.
+    """
+    parsed = {'filled': False, 'resting': False, 'error': None, 'oid': None, 'avg_px': None, 'total_sz': None}
+    if not order_result or order_result.get('status') != 'ok':
+        parsed['error'] = str(order_result)
+        return parsed
+
+    response = order_result.get('response', {})
+    statuses = response.get('data', {}).get('statuses', []) if isinstance(response, dict) else []
+    if not statuses:
+        parsed['error'] = 'no order status in response'
+        return parsed
+
+    status = statuses[0]
+    if 'filled' in status:
+        filled = status['filled']
+        parsed.update(filled=True, oid=filled.get('oid'),
+                      avg_px=float(filled['avgPx']), total_sz=float(filled['totalSz']))
+    elif 'resting' in status:
+        parsed.update(resting=True, oid=status['resting'].get('oid'))
+    else:
+        parsed['error'] = status.get('error', str(status))
+    return parsed
+
+
+class FillTracker:
+    """
+    Position book driven by the userFills / orderUpdates websocket streams.
+
+    Fills are applied incrementally (partial fills just move size and VWAP
+    entry), de-duplicated by trade id, and self-heal against the exchange's
+    `startPosition` if we ever miss one.
+    """
+
+    def __init__(self, max_seen_fills: int = 10000):
+        self.positions: Dict[str, TrackedPosition] = {}
+        self.open_orders: Dict[int, Dict] = {}
+        self.max_seen_fills = max_seen_fills
+        self._seen_tids: OrderedDict = OrderedDict()
+
+        # Metrics
+        self.fills_applied = 0
+        self.duplicate_fills = 0
+        self.resyncs = 0
+        self.total_fees = 0.0
+
+    def set_position(self, coin: str, size: float, entry_price: float):
+        """Seed/overwrite from exchange state (startup reconciliation)"""
+        self.positions[coin] = TrackedPosition(coin=coin, size=size, entry_price=entry_price)
+
+    def mark_seen(self, fills: List[Dict]):
+        """Record historical fills (subscription snapshot) without applying them"""
+        for fill in fills:
+            self._remember(fill.get('tid'))
+
+    def _remember(self, tid) -> bool:
+        """False if this trade id was already seen"""
+        if tid is None:
+            return True
+        if tid in self._seen_tids:
+            return False
+        self._seen_tids[tid] = True
+        if len(self._seen_tids) > self.max_seen_fills:
+            self._seen_tids.popitem(last=False)
+        return True
+
+    def apply_fill(self, fill: Dict) -> Optional[FillUpdate]:
+        """Apply one WsFill; returns the resulting position update or None for duplicates"""
+        if not self._remember(fill.get('tid')):
+            self.duplicate_fills += 1
+            return None
+
+        coin = fill['coin']
+        price = float(fill['px'])
+        size = float(fill['sz'])
+        fee = float(fill.get('fee', 0))
+        signed_size = size if fill['side'] == 'B' else -size
+
+        position = self.positions.setdefault(coin, TrackedPosition(coin=coin))
+
+        # Self-heal if we missed a fill: the exchange tells us where it started from
+        start_position = fill.get('startPosition')
+        if start_position is not None and abs(float(start_position) - position.size) > 1e-12:
+            self.resyncs += 1
+            logger.warning("Fill tracker resync for %s: had %s, exchange says %s", coin, position.size, start_position)
+            position.size = float(start_position)
+
+        position.fees += fee
+        position.realized_pnl += float(fill.get('closedPnl', 0))
+        self.total_fees += fee
+        self.fills_applied += 1
+
+        old_size = position.size
+        new_size = old_size + signed_size
+        closed = None
+
+        if old_size == 0 or (old_size > 0) == (signed_size > 0):
+            # Opening or adding - VWAP the entry
+            total = abs(old_size) + size
+            position.entry_price = (position.entry_price * abs(old_size) + price * size) / total
+        elif abs(new_size) < 1e-12 or (new_size > 0) != (old_size > 0):
+            # Went flat or flipped - the old lifecycle is finished
+            closed = TrackedPosition(coin=coin, size=old_size, entry_price=position.entry_price,
+                                     realized_pnl=position.realized_pnl, fees=position.fees)
+            position.realized_pnl = 0.0
+            position.fees = 0.0
+            position.entry_price = price if abs(new_size) >= 1e-12 else 0.0
+        # Partial reduce keeps the entry price
+
+        position.size = 0.0 if abs(new_size) < 1e-12 else new_size
+        return FillUpdate(coin=coin, size=position.size, entry_price=position.entry_price,
+                          fill_price=price, fill_size=size, fee=fee, closed=closed)
+
+    def apply_order_update(self, update: Dict):
+        """Track resting orders (including trigger orders) by oid"""
+        order = update.get('order', {})
+        oid = order.get('oid')
+        if oid is None:
+            return
+        if update.get('status') == 'open':
+            self.open_orders[oid] = order
+        else:
+            self.open_orders.pop(oid, None)
+            if update.get('status') not in ('filled', 'canceled', 'triggered'):
+                logger.warning("Order %s %s -> %s", oid, order.get('coin'), update.get('status'))
+
+    def get_metrics(self) -> Dict:
+        return {
+            'fills_applied': self.fills_applied,
+            'duplicate_fills': self.duplicate_fills,
+            'resyncs': self.resyncs,
+            'total_fees': round(self.total_fees, 4),
+            'open_orders': len(self.open_orders),
+        }
@@ -0,0 +1,458 @@
+"""
+Offline tick-to-trade harness: the real bot against local exchange stand-ins.
+
+A websocket server (own thread and event loop) streams synthetic allMids
+frames - and l2Book frames to anyone who subscribes - at a configurable
+rate for N symbols. Info/Exchange stand-ins answer the REST side in-process
+with configurable latency. The harness holds a position per symbol and
+periodically shocks one symbol's price through its stop; the time from the
+shock frame leaving the server to market_close reaching the exchange is one
+tick-to-order sample (ws decode, conflation, exit check, order state,
+limiter and worker pool included).
+
+    python latency_harness.py --symbols 20 --rates 10,100,500,2000 --stage-seconds 10 --soak 120
+
+Prints a JSON report: per rate stage the achieved frames/s, tick-to-order
+percentiles and loop lag (the highest stage that keeps up is the sustained
+rate), then memory growth over the soak run. No network access needed.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HARNESS_PRIVATE_KEY = "0x" + "11" * 32  # Throwaway key - the stand-ins never check signatures
+HARNESS_SYMBOLS = ["BTC", "ETH", "SOL", "AVAX", "DOGE", "LINK", "ADA", "DOT", "UNI", "MATIC"]
+HARNESS_PRICES = {"BTC": 60000.0, "ETH": 3000.0, "SOL": 150.0}
+
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    return {f"p{p}": round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 3) for p in points}
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class SyntheticMarket:
+    """Geometric random walk per symbol; volatility is per sqrt(second), so any frame rate looks alike"""
+
+    def __init__(self, symbols: List[str], volatility: float = 0.0002, seed: Optional[int] = None):
+        self.symbols = list(symbols)
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self.prices = np.array([HARNESS_PRICES.get(symbol, 10.0 + 90.0 * self.rng.random())
+                                for symbol in self.symbols])
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def step(self, dt: float) -> Dict[str, str]:
+        self.prices *= np.exp(self.volatility * math.sqrt(dt) * self.rng.standard_normal(len(self.prices)))
+        return {symbol: f"{price:.6g}" for symbol, price in zip(self.symbols, self.prices)}
+
+    def mid(self, symbol: str) -> float:
+        return float(self.prices[self.index[symbol]])
+
+    def shift(self, symbol: str, pct: float):
+        self.prices[self.index[symbol]] *= 1 + pct
+
+    def book(self, symbol: str, levels: int = 10, spread_bps: float = 1.0) -> List[List[Dict]]:
+        mid = self.mid(symbol)
+        tick = mid * spread_bps / 1e4
+        bids = [{"px": f"{mid - tick * (i + 0.5):.6g}", "sz": f"{1.0 + i:.4g}", "n": 1} for i in range(levels)]
+        asks = [{"px": f"{mid + tick * (i + 0.5):.6g}", "sz": f"{1.0 + i:.4g}", "n": 1} for i in range(levels)]
+        return [bids, asks]
+
+
+class MidsServer:
+    """
+    Local stand-in for the Hyperliquid websocket: allMids for every client,
+    l2Book for coins a client subscribed to. Runs its own event loop in a
+    thread so frame generation does not share the bot's loop.
+    """
+
+    def __init__(self, market: SyntheticMarket, rate: float = 10.0):
+        self.market = market
+        self.rate = rate                    # Frames per second (changeable while running)
+        self.port: Optional[int] = None
+        self.is_running = False
+        self._clients: Dict[object, set] = {}  # websocket -> subscribed l2Book coins
+        self._shocks = deque()              # (symbol, pct) requested by the harness
+        self.shock_sent: Dict[str, float] = {}  # symbol -> perf_counter when the shocked frame left
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+        # Metrics
+        self.frames_sent = 0
+        self.late_frames = 0                # Frames sent behind schedule (server or client can't keep up)
+
+    def start(self) -> int:
+        self.is_running = True
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._serve()), name="mids-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self.port
+
+    def stop(self):
+        self.is_running = False
+        if self._thread:
+            self._thread.join(5)
+
+    def shock(self, symbol: str, pct: float):
+        """Move `symbol` by `pct` in the next frame (thread-safe)"""
+        self._shocks.append((symbol, pct))
+
+    async def _serve(self):
+        import websockets
+        async with websockets.serve(self._handler, "127.0.0.1", 0, max_queue=None) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._broadcast()
+
+    async def _handler(self, websocket):
+        books = self._clients[websocket] = set()
+        try:
+            async for message in websocket:
+                subscription = json.loads(message).get("subscription", {})
+                if subscription.get("type") == "l2Book":
+                    books.add(subscription.get("coin"))
+        except Exception:
+            pass
+        finally:
+            self._clients.pop(websocket, None)
+
+    async def _broadcast(self):
+        next_frame = time.perf_counter()
+        while self.is_running:
+            interval = 1.0 / self.rate
+            shocked = []
+            while self._shocks:
+                symbol, pct = self._shocks.popleft()
+                self.market.shift(symbol, pct)
+                shocked.append(symbol)
+            frame = json.dumps({"channel": "allMids", "data": {"mids": self.market.step(interval)}})
+            sent_at = time.perf_counter()
+            for symbol in shocked:
+                self.shock_sent[symbol] = sent_at
+            for websocket, books in list(self._clients.items()):
+                try:
+                    await websocket.send(frame)
+                    for coin in books:
+                        await websocket.send(json.dumps({"channel": "l2Book", "data": {
+                            "coin": coin, "time": int(time.time() * 1000), "levels": self.market.book(coin)}}))
+                except Exception:
+                    self._clients.pop(websocket, None)
+            self.frames_sent += 1
+
+            next_frame += interval
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.late_frames += 1
+                if delay < -1.0:
+                    next_frame = time.perf_counter()  # Don't try to catch up on a backlog of seconds
+                await asyncio.sleep(0)
+
+
+class LocalInfo:
+    """Info stand-in: account state from the LocalExchange, mids from the synthetic market"""
+
+    def __init__(self, market: SyntheticMarket, latency: float = 0.02, account_value: float = 10000.0):
+        self.market = market
+        self.latency = latency
+        self.account_value = account_value
+        self.exchange: Optional["LocalExchange"] = None
+        self.asset_to_sz_decimals = {i: 4 for i in range(len(market.symbols))}
+
+    def name_to_asset(self, name: str) -> int:
+        return self.market.index[name]
+
+    def user_state(self, address: str) -> Dict:
+        time.sleep(self.latency)
+        positions = self.exchange.positions if self.exchange else {}
+        return {
+            "marginSummary": {"accountValue": str(self.account_value)},
+            "assetPositions": [{"position": {"coin": coin, "szi": str(size), "entryPx": str(entry),
+                                             "unrealizedPnl": "0"}}
+                               for coin, (size, entry) in positions.items() if size],
+        }
+
+    def all_mids(self) -> Dict[str, str]:
+        time.sleep(self.latency)
+        return {symbol: f"{self.market.mid(symbol):.6g}" for symbol in self.market.symbols}
+
+    def open_orders(self, address: str) -> List:
+        time.sleep(self.latency)
+        return []
+
+    def candles_snapshot(self, name: str, interval: str, start_time: int, end_time: int) -> List:
+        time.sleep(self.latency)
+        return []
+
+
+class LocalExchange:
+    """
+    Exchange stand-in: every order fills in full at the synthetic mid after
+    `latency`. Records when each close arrives - the end of a tick-to-order
+    sample - before sleeping, so the sample excludes the simulated round trip.
+    """
+
+    def __init__(self, info: LocalInfo, server: MidsServer, latency: float = 0.02):
+        self.info = info
+        self.server = server
+        self.latency = latency
+        self.positions: Dict[str, tuple] = {}  # coin -> (signed size, entry price)
+        info.exchange = self
+
+        # Metrics
+        self.orders = 0
+        self.tick_to_order_ms: List[float] = []
+        self.unprompted_closes = 0          # Closes without a shock (random-walk stops)
+
+    @staticmethod
+    def _filled(size: float, price: float) -> Dict:
+        return {"status": "ok", "response": {"type": "order", "data": {"statuses": [
+            {"filled": {"totalSz": str(size), "avgPx": str(price), "oid": int(time.time() * 1e6)}}]}}}
+
+    def market_open(self, name: str, is_buy: bool, sz: float, px=None, slippage: float = 0.05, cloid=None,
+                    builder=None) -> Dict:
+        time.sleep(self.latency)
+        self.orders += 1
+        price = self.info.market.mid(name)
+        self.positions[name] = ((sz if is_buy else -sz), price)
+        return self._filled(sz, price)
+
+    def market_close(self, coin: str, sz=None, px=None, slippage: float = 0.05, cloid=None, builder=None):
+        arrived = time.perf_counter()
+        shocked = self.server.shock_sent.pop(coin, None)
+        if shocked is not None:
+            self.tick_to_order_ms.append((arrived - shocked) * 1000)
+        else:
+            self.unprompted_closes += 1
+        time.sleep(self.latency)
+        self.orders += 1
+        size, _ = self.positions.pop(coin, (0.0, 0.0))
+        if not size:
+            return None
+        return self._filled(abs(size), self.info.market.mid(coin))
+
+    def bulk_orders(self, order_requests: List[Dict], builder=None, grouping: str = "na") -> Dict:
+        time.sleep(self.latency)
+        self.orders += len(order_requests)
+        entry = order_requests[0]
+        price = self.info.market.mid(entry["coin"])
+        self.positions[entry["coin"]] = ((entry["sz"] if entry["is_buy"] else -entry["sz"]), price)
+        statuses = [self._filled(entry["sz"], price)["response"]["data"]["statuses"][0]]
+        statuses += ["waitingForTrigger"] * (len(order_requests) - 1)
+        return {"status": "ok", "response": {"type": "order", "data": {"statuses": statuses}}}
+
+    def _ok(self, count: int) -> Dict:
+        time.sleep(self.latency)
+        return {"status": "ok", "response": {"type": "default", "data": {"statuses": ["success"] * count}}}
+
+    def cancel(self, name: str, oid: int) -> Dict:
+        return self._ok(1)
+
+    def bulk_cancel_by_cloid(self, cancel_requests: List) -> Dict:
+        return self._ok(len(cancel_requests))
+
+    def bulk_modify_orders_new(self, modify_requests: List) -> Dict:
+        return self._ok(len(modify_requests))
+
+
+class LatencyHarness:
+    """Wires a HyperliquidAdvancedBot to the stand-ins and runs rate stages plus a soak"""
+
+    def __init__(self, symbols: int = 10, order_latency: float = 0.02, shock_interval: float = 1.0,
+                 weight_per_minute: Optional[int] = None, seed: Optional[int] = None):
+        names = HARNESS_SYMBOLS[:symbols] + [f"SYN{i}" for i in range(max(0, symbols - len(HARNESS_SYMBOLS)))]
+        self.market = SyntheticMarket(names, seed=seed)
+        self.server = MidsServer(self.market)
+        self.info = LocalInfo(self.market, latency=order_latency)
+        self.exchange = LocalExchange(self.info, self.server, latency=order_latency)
+        self.shock_interval = shock_interval
+        self.weight_per_minute = weight_per_minute  # None = no REST budget (measure the pipeline only)
+        self.bot = None
+
+    def build_bot(self):
+        from bot_hyperliquid import HyperliquidAdvancedBot
+        from rest_client import HyperliquidRestClient
+
+        bot = HyperliquidAdvancedBot()
+        bot.bootstrap_enabled = False
+        bot.snapshot_enabled = False
+        bot.journal_enabled = False
+        bot.fill_tracking_enabled = False   # The stand-in has no userFills stream
+        bot.native_tpsl_enabled = False
+        bot.ws_url = f"ws://127.0.0.1:{self.server.port}"
+        rest = HyperliquidRestClient(self.info, weight_per_minute=self.weight_per_minute or 10 ** 9)
+        bot.configure_from_dict({
+            'private_key': HARNESS_PRIVATE_KEY,
+            'symbols': list(self.market.symbols),
+            'stop_loss_pct': 0.02,
+            'take_profit_target': 20,
+            'position_size_pct': 1.0,
+            'max_positions': len(self.market.symbols),
+            'trading_strategy': 'hull_ma',
+            'timeframe': '1m',
+        }, info=self.info, rest_client=rest, exchange=self.exchange)
+        return bot
+
+    def arm(self, symbol: str):
+        """Hold a long at the current mid on both sides (exchange and bot)"""
+        from bot_hyperliquid import Position
+        price = self.market.mid(symbol)
+        size = 1000.0 / price
+        self.exchange.positions[symbol] = (size, price)
+        self.bot.current_positions[symbol] = Position(symbol=symbol, side="long", size=size, entry_price=price,
+                                                      current_price=price, unrealized_pnl=0.0,
+                                                      timestamp=datetime.now())
+        self.bot.order_states.sync(symbol, size)
+
+    async def shock_loop(self):
+        """Shock one held symbol through its stop per interval; re-arm the ones that closed"""
+        turn = 0
+        shock_pct = -self.bot.stop_loss_pct * 1.5
+        while self.bot.is_running:
+            await asyncio.sleep(self.shock_interval)
+            for symbol in self.market.symbols:
+                if symbol not in self.bot.current_positions and not self.bot.order_states.in_flight(symbol):
+                    self.arm(symbol)
+            symbol = self.market.symbols[turn % len(self.market.symbols)]
+            turn += 1
+            if symbol in self.bot.current_positions and symbol not in self.server.shock_sent:
+                self.server.shock(symbol, shock_pct)
+
+    def counters(self) -> Dict:
+        feed = self.bot.ws_feed
+        return {
+            'time': time.perf_counter(),
+            'sent': self.server.frames_sent,
+            'late': self.server.late_frames,
+            'received': feed.frames_delivered if feed else 0,
+            'samples': len(self.exchange.tick_to_order_ms),
+            'lags': sum(self.bot.watchdog.histogram),
+            'conflated': self.bot.strategy_slots.get_metrics()['conflated'],
+        }
+
+    def stage_report(self, rate: float, before: Dict, after: Dict) -> Dict:
+        elapsed = after['time'] - before['time']
+        lags = list(self.bot.watchdog.recent_lags_ms)[-(after['lags'] - before['lags']):] if after['lags'] > before['lags'] else []
+        sent_fps = (after['sent'] - before['sent']) / elapsed
+        received_fps = (after['received'] - before['received']) / elapsed
+        lag = percentiles(lags)
+        return {
+            'target_fps': rate,
+            'sent_fps': round(sent_fps, 1),
+            'received_fps': round(received_fps, 1),
+            'late_frames': after['late'] - before['late'],
+            'conflated_ticks': after['conflated'] - before['conflated'],
+            'tick_to_order_ms': percentiles(self.exchange.tick_to_order_ms[before['samples']:after['samples']]),
+            'orders': after['samples'] - before['samples'],
+            'loop_lag_ms': lag,
+            'kept_up': (sent_fps >= 0.95 * rate and received_fps >= 0.95 * sent_fps
+                        and (lag['p99'] or 0.0) < 100.0),
+        }
+
+    async def run(self, rates: List[float], stage_seconds: float, soak_seconds: float, soak_rate: float) -> Dict:
+        self.server.start()
+        self.bot = self.build_bot()
+        await self.bot.start_session()
+        for symbol in self.market.symbols:
+            self.arm(symbol)
+
+        tasks = [asyncio.create_task(self.bot.connect_websocket(), name="websocket"),
+                 asyncio.create_task(self.bot.watchdog.run(), name="loop-watchdog"),
+                 asyncio.create_task(self.bot.strategy_loop(), name="strategy"),
+                 asyncio.create_task(self.shock_loop(), name="shocks")]
+        report = {'symbols': len(self.market.symbols), 'order_latency_ms': self.exchange.latency * 1000,
+                  'stages': [], 'soak': None}
+        try:
+            await asyncio.sleep(1.0)  # Connect and subscribe
+            for rate in rates:
+                self.server.rate = rate
+                await asyncio.sleep(min(2.0, stage_seconds / 4))  # Settle at the new rate
+                before = self.counters()
+                await asyncio.sleep(stage_seconds)
+                stage = self.stage_report(rate, before, self.counters())
+                report['stages'].append(stage)
+                logger.info("Stage %s", stage)
+            sustained = [stage['target_fps'] for stage in report['stages'] if stage['kept_up']]
+            report['sustained_fps'] = max(sustained) if sustained else None
+
+            if soak_seconds > 0:
+                self.server.rate = soak_rate
+                samples = []
+                before = self.counters()
+                for _ in range(10):
+                    await asyncio.sleep(soak_seconds / 10)
+                    samples.append({'rss_mb': round(rss_bytes() / 1e6, 1),
+                                    'census_bytes': sum(stats.get('bytes', 0) for stats in
+                                                        self.bot.memory_census().values())})
+                report['soak'] = {
+                    'seconds': soak_seconds,
+                    'stage': self.stage_report(soak_rate, before, self.counters()),
+                    'rss_mb': [sample['rss_mb'] for sample in samples],
+                    'rss_growth_mb': round(samples[-1]['rss_mb'] - samples[0]['rss_mb'], 1),
+                    'census_growth_bytes': samples[-1]['census_bytes'] - samples[0]['census_bytes'],
+                }
+            report['unprompted_closes'] = self.exchange.unprompted_closes
+            report['rest'] = self.bot.rest.get_metrics()
+        finally:
+            self.bot.is_running = False
+            self.bot.strategy_slots.close()
+            self.bot.watchdog.stop()
+            self.server.stop()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.bot.rest.close()
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline tick-to-trade latency and throughput harness")
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--rates", default="10,50,200,1000", help="Frame rates (frames/s) to step through")
+    parser.add_argument("--stage-seconds", type=float, default=10.0)
+    parser.add_argument("--soak", type=float, default=60.0, help="Soak duration in seconds (0 = skip)")
+    parser.add_argument("--soak-rate", type=float, default=50.0)
+    parser.add_argument("--order-latency", type=float, default=0.02, help="Stand-in REST latency (s)")
+    parser.add_argument("--shock-interval", type=float, default=1.0, help="Seconds between stop-through shocks")
+    parser.add_argument("--weight-per-minute", type=int, default=None,
+                        help="Apply a REST weight budget (default: unlimited, pipeline only)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    harness = LatencyHarness(symbols=args.symbols, order_latency=args.order_latency,
+                             shock_interval=args.shock_interval, weight_per_minute=args.weight_per_minute,
+                             seed=args.seed)
+    report = asyncio.run(harness.run([float(rate) for rate in args.rates.split(',')], args.stage_seconds,
+                                     args.soak, args.soak_rate))
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
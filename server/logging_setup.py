@@ -0,0 +1,129 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that hands the raw record to the writer thread.
+
+    The stdlib version formats the message on the calling thread; we defer
+    %-formatting (and any exception rendering) to the background writer so
+    the trading loop only pays for building the record and a queue put.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per call-site rate limiting for repetitive lines.
+
+    Each (file, line) may emit `burst` records per `interval` seconds; the
+    rest are dropped and counted, and the next record that gets through
+    reports how many were suppressed. ERROR and above are never limited.
+    """
+
+    def __init__(self, burst: int = 5, interval: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict[tuple, list] = {}  # site -> [window_start, count, suppressed]
+        self.total_suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        window = self._windows.get(site)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self._windows[site] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+
+        window[2] += 1
+        self.total_suppressed += 1
+        return False
+
+
+class SuppressedCountFormatter(logging.Formatter):
+    """Standard text format, plus a note when similar lines were rate limited"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text += f" [{suppressed} similar suppressed]"
+        return text
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Compact structured sink: one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            't': round(record.created, 6),
+            'lvl': record.levelname,
+            'src': f"{record.module}:{record.lineno}",
+            'msg': record.getMessage(),
+        }
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+
+def configure_logging(log_file: str = 'hyperliquid_advanced_bot.log', json_log_file: Optional[str] = None,
+                      level: int = logging.INFO, burst: int = 5,
+                      interval: float = 10.0) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to a background writer thread.
+
+    File/console (and optional JSON lines) handlers only ever run on the
+    writer thread, so disk or terminal stalls cannot block the event loop.
+    """
+    text_formatter = SuppressedCountFormatter(LOG_FORMAT)
+    handlers = [
+        logging.FileHandler(log_file, encoding='utf-8'),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(text_formatter)
+    if json_log_file:
+        json_handler = logging.FileHandler(json_log_file, encoding='utf-8')
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(burst=burst, interval=interval))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued on interpreter exit
+    atexit.register(listener.stop)
+    return listener
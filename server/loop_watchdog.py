@@ -0,0 +1,120 @@
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is open-ended
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LoopWatchdog:
+    """
+    Measures event-loop lag and names the code that blocks it.
+
+    A heartbeat coroutine sleeps `interval` and records how late it woke up
+    (lag) into a histogram. A separate thread checks the heartbeat: once it
+    is `threshold` seconds overdue, the loop is stalled in synchronous code,
+    so the thread grabs the loop thread's current stack - the culprit is
+    still on it - logs it and counts it. The heartbeat is one timer on the
+    loop; the thread only reads a float unless a stall is in progress.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, stack_depth: int = 12):
+        self.interval = interval
+        self.threshold = threshold          # Overdue by this much = stall (stacks are captured)
+        self.stack_depth = stack_depth
+        self.source_dir = os.path.dirname(os.path.abspath(__file__))
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+        self._beat = time.monotonic()
+        self._stall_captured = False
+
+        # Metrics
+        self.histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.recent_lags_ms = deque(maxlen=1024)
+        self.max_lag_ms = 0.0
+        self.stalls = 0
+        self.culprits = Counter()           # Innermost bot frame -> stalls
+        self.last_stall: Optional[Dict] = None
+
+    async def run(self):
+        """Heartbeat (runs on the monitored loop); starts the watchdog thread"""
+        self._loop_thread_id = threading.get_ident()
+        self.is_running = True
+        self._beat = time.monotonic()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        try:
+            while self.is_running:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self._record(max(now - expected, 0.0) * 1000)
+                self._beat = now
+                self._stall_captured = False
+        finally:
+            self.is_running = False
+
+    def stop(self):
+        self.is_running = False
+
+    def _record(self, lag_ms: float):
+        self.histogram[bisect.bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+        self.recent_lags_ms.append(lag_ms)
+        if lag_ms > self.max_lag_ms:
+            self.max_lag_ms = lag_ms
+
+    def _watch(self):
+        while self.is_running:
+            time.sleep(self.interval / 2)
+            overdue = time.monotonic() - self._beat - self.interval
+            if overdue >= self.threshold and not self._stall_captured:
+                self._stall_captured = True  # One capture per stall
+                self._capture(overdue)
+
+    def _capture(self, overdue: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)[-self.stack_depth:]
+        culprit = self._culprit(stack)
+        self.stalls += 1
+        self.culprits[culprit] += 1
+        self.last_stall = {'time': time.time(), 'overdue_ms': round(overdue * 1000), 'culprit': culprit}
+        logger.warning("🐢 Event loop blocked %.0fms+ in %s\n%s", overdue * 1000, culprit,
+                       ''.join(traceback.format_list(stack)).rstrip())
+
+    def _culprit(self, stack: List[traceback.FrameSummary]) -> str:
+        """Innermost frame in our own code (the call that blocks is below it), else the innermost frame"""
+        for entry in reversed(stack):
+            if os.path.dirname(os.path.abspath(entry.filename)) == self.source_dir:
+                return f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+        entry = stack[-1]
+        return f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+
+    def lag_percentile(self, pct: float) -> float:
+        if not self.recent_lags_ms:
+            return 0.0
+        ordered = sorted(self.recent_lags_ms)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def get_metrics(self) -> Dict:
+        labels = [f"<={bound}ms" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            'lag_histogram': {label: count for label, count in zip(labels, self.histogram) if count},
+            'lag_p50_ms': self.lag_percentile(50),
+            'lag_p99_ms': self.lag_percentile(99),
+            'max_lag_ms': self.max_lag_ms,
+            'stalls': self.stalls,
+            'top_culprits': self.culprits.most_common(5),
+            'last_stall': self.last_stall,
+        }
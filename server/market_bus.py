@@ -0,0 +1,366 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from background import BackgroundTasks
+from bar_aggregator import BAR_TIMEFRAMES, BarAggregator
+from portfolio_risk import EWCovariance
+from regime import RANGING, TRENDING, VOLATILE
+from startup import STARTUP
+from tiered_history import TieredPriceHistory
+from ws_feed import RedundantWebsocketFeed
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('hull_ma', 'momentum', 'mean_reversion', 'breakout')
+
+# Hyperliquid allows user-specific websocket subscriptions for at most 10 distinct users per IP
+MAX_WS_USERS_PER_IP = 10
+
+
+class IndicatorCache:
+    """
+    Memoizes indicator values per (series, indicator, params) for the current
+    tip of a price series (e.g. one symbol's closed 1m bars).
+
+    Bots that share a series (and this cache) compute each indicator once per
+    update however many of them ask for it; a new bar invalidates the series.
+    """
+
+    def __init__(self):
+        self._tips: Dict[Any, tuple] = {}               # series -> tip the cached values belong to
+        self._values: Dict[Any, Dict[tuple, Any]] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, series, tip: tuple, key: tuple, compute: Callable[[], Any]) -> Any:
+        if self._tips.get(series) != tip:
+            self._tips[series] = tip
+            self._values[series] = {}
+        values = self._values[series]
+        if key in values:
+            self.hits += 1
+            return values[key]
+        self.misses += 1
+        value = compute()
+        values[key] = value
+        return value
+
+    def get_metrics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': sum(len(values) for values in self._values.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class MarketDataBus:
+    """
+    One market-data ingest shared by many bots (accounts x strategies) in one process.
+
+    A single (optionally redundant) websocket feed carries allMids plus every
+    account's userFills. Each allMids frame is decoded once, turned into one
+    MarketData per subscribed symbol, appended once to a shared history, folded
+    once into shared OHLCV bars and tiered price history, and fanned out to the
+    bots trading that symbol. Bots also share gap-backfill state and an IndicatorCache, so identical
+    indicators are computed once.
+
+    orderUpdates frames carry no user field, so they are only subscribed when
+    the fleet runs a single account; positions come from userFills either way.
+    """
+
+    def __init__(self, ws_url: str, connections: int = 1, stall_timeout: float = 15.0,
+                 retry_delay: float = 1.0, max_retries: int = 3, history_length: int = 200,
+                 bar_history_length: int = 500):
+        self.ws_url = ws_url
+        self.connections = connections
+        self.stall_timeout = stall_timeout
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.history_length = history_length
+
+        # Shared market state
+        self.history: Dict[str, deque] = {}
+        self.last_tick_time: Dict[str, Optional[datetime]] = {}
+        self.backfilling = set()
+        self.bars = BarAggregator(history_length=bar_history_length)
+        self.price_history: Dict[str, TieredPriceHistory] = {}
+        self.covariance = EWCovariance()   # One cross-asset matrix over every subscribed symbol
+        self.indicator_cache = IndicatorCache()
+
+        self.bots: List = []
+        self._subscribers: Dict[str, List] = {}   # symbol -> bots trading it
+        self._accounts: Dict[str, List] = {}      # lowercased address -> bots on that account
+        self.feed: Optional[RedundantWebsocketFeed] = None
+        self.is_running = False
+        self.background = BackgroundTasks()
+
+        # Metrics
+        self.frames_dispatched = 0
+        self.ticks_decoded = 0
+        self.ticks_delivered = 0
+
+    def attach(self, bot):
+        """Register a configured bot and point it at the shared market state"""
+        bot.market_bus = self
+        bot.market_data_history = {}
+        bot.price_history = {}
+        for symbol in bot.symbols:
+            self.subscribe(bot, symbol)
+        bot.last_tick_time = self.last_tick_time
+        bot.backfilling = self.backfilling
+        bot.bars = self.bars
+        bot.covariance = self.covariance
+        bot.indicator_cache = self.indicator_cache
+
+        if bot.fill_tracking_enabled and bot.wallet and bot.paper_venue is None:
+            self._accounts.setdefault(bot.wallet.address.lower(), []).append(bot)
+        self.bots.append(bot)
+
+    def subscribe(self, bot, symbol: str):
+        """Route `symbol` to `bot`; shared history is created by the first bot that trades it"""
+        self.last_tick_time.setdefault(symbol, None)
+        bot.market_data_history[symbol] = self.history.setdefault(symbol, deque(maxlen=self.history_length))
+        bot.price_history[symbol] = self.price_history.setdefault(symbol, TieredPriceHistory())
+        subscribers = self._subscribers.setdefault(symbol, [])
+        if bot not in subscribers:
+            subscribers.append(bot)
+
+    def unsubscribe(self, bot, symbol: str):
+        """Stop routing `symbol` to `bot`; shared state is freed once no bot trades it"""
+        subscribers = self._subscribers.get(symbol, [])
+        if bot in subscribers:
+            subscribers.remove(bot)
+        bot.market_data_history.pop(symbol, None)
+        bot.price_history.pop(symbol, None)
+        if not subscribers:
+            self._subscribers.pop(symbol, None)
+            self.history.pop(symbol, None)
+            self.price_history.pop(symbol, None)
+            self.last_tick_time.pop(symbol, None)
+            self.bars.forget(symbol)
+            self.covariance.forget(symbol)
+
+    def subscriptions(self) -> List[Dict]:
+        subscriptions = [{"method": "subscribe", "subscription": {"type": "allMids"}}]
+        if len(self._accounts) > MAX_WS_USERS_PER_IP:
+            logger.warning("⚠️ %d accounts exceed Hyperliquid's limit of %d websocket users per IP - "
+                           "some fill streams will be refused", len(self._accounts), MAX_WS_USERS_PER_IP)
+        channels = ("userFills", "orderUpdates") if len(self._accounts) == 1 else ("userFills",)
+        for bots in self._accounts.values():
+            for channel in channels:
+                subscriptions.append({
+                    "method": "subscribe",
+                    "subscription": {"type": channel, "user": bots[0].wallet.address}
+                })
+        return subscriptions
+
+    async def run(self):
+        """Run the shared feed until the bus (or every bot) stops"""
+        self.feed = RedundantWebsocketFeed(
+            self.ws_url,
+            self.subscriptions(),
+            self.dispatch,
+            connections=self.connections,
+            stall_timeout=self.stall_timeout,
+            retry_delay=self.retry_delay,
+            max_retries=self.max_retries
+        )
+        await self.feed.run(lambda: self.is_running and any(bot.is_running for bot in self.bots))
+
+    async def dispatch(self, data: Dict):
+        """Route one decoded frame to the bots it concerns"""
+        self.frames_dispatched += 1
+        channel = data.get("channel")
+        if channel == "allMids":
+            if not STARTUP.finished:
+                STARTUP.finish("first tick")
+            await self.publish_mids(data.get("data", {}).get("mids", {}))
+        elif channel == "userFills":
+            payload = data.get("data", {})
+            for bot in self._accounts.get(str(payload.get("user", "")).lower(), []):
+                # Several strategies can share an account - each only sees its own coins
+                fills = [fill for fill in payload.get("fills", []) if fill.get("coin") in bot.symbols]
+                if fills:
+                    await bot.process_user_fills(dict(payload, fills=fills))
+        elif channel == "orderUpdates":
+            for bots in self._accounts.values():
+                for bot in bots:
+                    for update in data.get("data", []):
+                        if update.get("order", {}).get("coin") in bot.symbols:
+                            bot.fill_tracker.apply_order_update(update)
+
+    async def publish_mids(self, mids: Dict):
+        """Decode each subscribed mid once and fan it out"""
+        timestamp = datetime.now()
+        for symbol, subscribers in list(self._subscribers.items()):  # Bots may reconfigure symbols mid-frame
+            price_str = mids.get(symbol)
+            if price_str is None:
+                continue
+            try:
+                price = float(price_str)
+                # Any subscriber builds the same point - history and estimators are shared
+                market_data = await subscribers[0].build_market_data(symbol, price, timestamp)
+                if symbol not in self._subscribers:
+                    continue  # Dropped while the point was built
+                closed_bars = self.bars.update(symbol, price, timestamp.timestamp(), market_data.volume)
+            except Exception as e:
+                logger.debug("Market data error for %s: %s", symbol, e)
+                continue
+            self.ticks_decoded += 1
+
+            # Reconnect / stall gap - one backfill for everyone
+            last_tick = self.last_tick_time.get(symbol)
+            if (last_tick and symbol not in self.backfilling and
+                    (timestamp - last_tick).total_seconds() > subscribers[0].history_gap_threshold):
+                self.backfilling.add(symbol)
+                self.background.spawn(subscribers[0].backfill_gap(symbol, last_tick, timestamp),
+                                      name=f"bus-backfill-{symbol}")
+            self.last_tick_time[symbol] = timestamp
+            self.history[symbol].append(market_data)
+            self.price_history[symbol].append(timestamp.timestamp(), price)
+            self.covariance.observe(symbol, price, timestamp.timestamp())
+
+            # Never waits on a strategy - each bot conflates into its own latest-value slot
+            for bot in subscribers:
+                if bot.is_running:
+                    bot.deliver_market_data(market_data, closed_bars)
+                    self.ticks_delivered += 1
+
+    async def report_loop(self, interval: float = 300):
+        """Periodic fleet-level feed / fan-out metrics"""
+        while self.is_running:
+            await asyncio.sleep(interval)
+            metrics = self.get_metrics()
+            logger.info("🚌 BUS: %d bots, %d accounts | %d frames, %d ticks -> %d deliveries | "
+                        "Indicator cache hit rate: %.0f%%",
+                        metrics['bots'], metrics['accounts'], metrics['frames_dispatched'],
+                        metrics['ticks_decoded'], metrics['ticks_delivered'],
+                        metrics['indicator_cache']['hit_rate'] * 100)
+            if metrics['feed']:
+                logger.info("🚌 WS: %d/%d live | %d delivered, %d dupes | Stalls: %d | Reconnects: %d",
+                            metrics['feed']['live_connections'], metrics['feed']['connections'],
+                            metrics['feed']['frames_delivered'], metrics['feed']['duplicates_dropped'],
+                            metrics['feed']['stalls_detected'], metrics['feed']['reconnects'])
+
+    def get_metrics(self) -> Dict:
+        return {
+            'bots': len(self.bots),
+            'accounts': len(self._accounts),
+            'symbols': len(self._subscribers),
+            'frames_dispatched': self.frames_dispatched,
+            'ticks_decoded': self.ticks_decoded,
+            'ticks_delivered': self.ticks_delivered,
+            'indicator_cache': self.indicator_cache.get_metrics(),
+            'history_bytes': sum(h.get_metrics()['memory_bytes'] for h in self.price_history.values()),
+            'covariance': self.covariance.get_metrics(),
+            'feed': self.feed.get_metrics() if self.feed else None,
+        }
+
+
+def load_fleet_config(path: str) -> Dict:
+    """
+    Read and validate a headless fleet config (JSON).
+
+    {
+      "ws_connections": 2,
+      "state_dir": "bot_state",
+      "control_port": 8765,
+      "journal_path": "trade_journal.db",
+      "stream_port": 8766,
+      "defaults": {"stop_loss_pct": 0.02, "take_profit_target": 20,
+                   "position_size_pct": 1.0, "max_positions": 2},
+      "accounts": [
+        {"name": "main", "private_key_env": "HL_MAIN_KEY",
+         "bots": [{"strategy": "hull_ma", "timeframe": "5m", "symbols": ["BTC", "ETH"]},
+                  {"strategy": "breakout", "symbols": ["SOL"], "max_positions": 1,
+                   "regime_strategies": {"ranging": "mean_reversion"}}]}
+      ]
+    }
+
+    Settings use the bot's user_config units (fractions, USD). Private keys are
+    only ever read from the named environment variables. "paper_trading": true
+    on an account or bot routes its orders to the local matching simulator
+    (optional "paper_balance", USD) while market data stays live. Returns the
+    feed settings plus one {'name', 'account', 'config'} entry per bot instance.
+    The running fleet re-reads this file when it changes: existing bots pick up
+    edited runtime settings (runtime_config.RUNTIME_KEYS) without a restart.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    accounts = raw.get('accounts')
+    if not accounts:
+        raise ValueError(f"{path}: no accounts configured")
+
+    defaults = {
+        'stop_loss_pct': 0.02,
+        'take_profit_target': 20,
+        'trading_strategy': 'hull_ma',
+        'timeframe': '1m',
+        'position_size_pct': 1.0,
+        'max_positions': 2
+    }
+    defaults.update(raw.get('defaults', {}))
+
+    instances = []
+    names = set()
+    for account in accounts:
+        account_name = account.get('name')
+        key_env = account.get('private_key_env')
+        if not account_name or not key_env:
+            raise ValueError(f"{path}: every account needs 'name' and 'private_key_env'")
+        private_key = os.environ.get(key_env, '').strip()
+        if not (private_key.startswith('0x') and len(private_key) == 66):
+            raise ValueError(f"{path}: account '{account_name}': ${key_env} is not a 0x-prefixed private key")
+
+        account_symbols = set()
+        for bot in account.get('bots') or [{}]:
+            config = dict(defaults)
+            config.update({k: v for k, v in account.items() if k not in ('name', 'private_key_env', 'bots')})
+            config.update(bot)
+            config['trading_strategy'] = config.pop('strategy', config['trading_strategy'])
+            config['symbols'] = [str(symbol).upper() for symbol in config.get('symbols', [])]
+            config['private_key'] = private_key
+            config.pop('name', None)
+
+            name = bot.get('name') or f"{account_name}-{config['trading_strategy']}"
+            if name in names:
+                raise ValueError(f"{path}: duplicate bot name '{name}'")
+            if config['trading_strategy'] not in STRATEGIES:
+                raise ValueError(f"{path}: bot '{name}': unknown strategy '{config['trading_strategy']}'")
+            if config.get('timeframe', '1m') not in BAR_TIMEFRAMES:
+                raise ValueError(f"{path}: bot '{name}': timeframe must be one of {', '.join(BAR_TIMEFRAMES)}")
+            for regime, strategy in config.get('regime_strategies', {}).items():
+                if regime not in (VOLATILE, TRENDING, RANGING) or strategy not in STRATEGIES:
+                    raise ValueError(f"{path}: bot '{name}': invalid regime_strategies entry '{regime}': '{strategy}'")
+            if not config['symbols']:
+                raise ValueError(f"{path}: bot '{name}': no symbols")
+            # One net position per coin per account - two strategies can't share a coin
+            overlap = account_symbols.intersection(config['symbols'])
+            if overlap:
+                raise ValueError(f"{path}: bot '{name}': {', '.join(sorted(overlap))} already traded "
+                                 f"by another bot on account '{account_name}'")
+            account_symbols.update(config['symbols'])
+            names.add(name)
+            instances.append({'name': name, 'account': account_name, 'config': config})
+
+    return {
+        'ws_connections': int(raw.get('ws_connections', 1)),
+        'ws_stall_timeout': float(raw.get('ws_stall_timeout', 15)),
+        'state_dir': raw.get('state_dir', 'bot_state'),
+        'control_port': int(raw.get('control_port', 0)),
+        'profile_dir': raw.get('profile_dir', 'profiles'),
+        'journal_path': raw.get('journal_path', 'trade_journal.db'),
+        'stream_port': int(raw.get('stream_port', 0)),
+        'stream_fps': float(raw.get('stream_fps', 10)),
+        'instances': instances,
+    }
@@ -0,0 +1,100 @@
+import time
+from typing import Dict
+
+# Per-symbol order lifecycle
+IDLE = "idle"
+OPENING = "opening"
+OPEN = "open"
+CLOSING = "closing"
+CLOSED = "closed"
+
+IN_FLIGHT = (OPENING, CLOSING)
+
+
+class OrderStateMachine:
+    """
+    One order lifecycle per symbol: idle -> opening -> open -> closing -> closed.
+
+    Every REST order goes through begin_open()/begin_close() first. Both
+    are O(1), synchronous checks-and-sets, so two coroutines racing on the
+    same symbol (tick exit vs. monitor loop vs. strategy exit) cannot both
+    get through: the second intent is rejected locally and counted instead
+    of reaching the exchange. The fill stream and reconciliation feed sync(),
+    which moves settled symbols but never overrides an in-flight order - the
+    coroutine that owns it finishes with mark_*() or abort_*().
+    """
+
+    def __init__(self):
+        self._phases: Dict[str, str] = {}
+        self._since: Dict[str, float] = {}
+
+        # Metrics
+        self.transitions = 0
+        self.rejected = {'open': 0, 'close': 0}
+
+    def phase(self, symbol: str) -> str:
+        return self._phases.get(symbol, IDLE)
+
+    def in_flight(self, symbol: str) -> bool:
+        return self._phases.get(symbol, IDLE) in IN_FLIGHT
+
+    def count(self, *phases: str) -> int:
+        return sum(1 for phase in self._phases.values() if phase in phases)
+
+    def _move(self, symbol: str, phase: str):
+        if self._phases.get(symbol, IDLE) != phase:
+            self._phases[symbol] = phase
+            self._since[symbol] = time.time()
+            self.transitions += 1
+
+    def begin_open(self, symbol: str) -> bool:
+        """Claim the symbol for an entry order; False if anything is open or in flight"""
+        if self.phase(symbol) not in (IDLE, CLOSED):
+            self.rejected['open'] += 1
+            return False
+        self._move(symbol, OPENING)
+        return True
+
+    def mark_open(self, symbol: str):
+        self._move(symbol, OPEN)
+
+    def abort_open(self, symbol: str):
+        """Entry finished without a position (no-op if it was marked open)"""
+        if self.phase(symbol) == OPENING:
+            self._move(symbol, IDLE)
+
+    def begin_close(self, symbol: str) -> bool:
+        """Claim the symbol for a close order; False while an order for it is in flight"""
+        if self.in_flight(symbol):
+            self.rejected['close'] += 1
+            return False
+        self._move(symbol, CLOSING)
+        return True
+
+    def mark_closed(self, symbol: str):
+        self._move(symbol, CLOSED)
+
+    def abort_close(self, symbol: str):
+        """Close finished with the position (partly) still open (no-op if it was marked closed)"""
+        if self.phase(symbol) == CLOSING:
+            self._move(symbol, OPEN)
+
+    def sync(self, symbol: str, size: float):
+        """Exchange truth (fills, reconciliation) for symbols without an order in flight"""
+        if self.in_flight(symbol):
+            return
+        if size != 0:
+            self._move(symbol, OPEN)
+        elif self.phase(symbol) == OPEN:
+            self._move(symbol, CLOSED)
+
+    def get_metrics(self) -> Dict:
+        now = time.time()
+        return {
+            'phases': dict(self._phases),
+            'in_flight': {symbol: round(now - self._since[symbol], 1)
+                          for symbol, phase in self._phases.items() if phase in IN_FLIGHT},
+            'transitions': self.transitions,
+            'rejected_opens': self.rejected['open'],
+            'rejected_closes': self.rejected['close'],
+        }
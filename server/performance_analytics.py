@@ -0,0 +1,244 @@
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class Attribution:
+    """Closed-trade totals for one strategy or symbol"""
+
+    __slots__ = ('trades', 'wins', 'pnl', 'fees', 'holding_seconds')
+
+    def __init__(self):
+        self.trades = 0
+        self.wins = 0
+        self.pnl = 0.0
+        self.fees = 0.0
+        self.holding_seconds = 0.0
+
+    def add(self, pnl: float, fees: float, holding_seconds: float):
+        self.trades += 1
+        self.wins += pnl > 0
+        self.pnl += pnl
+        self.fees += fees
+        self.holding_seconds += holding_seconds
+
+    def as_dict(self) -> Dict:
+        return {
+            'trades': self.trades,
+            'win_rate': self.wins / self.trades if self.trades else 0.0,
+            'pnl': self.pnl,
+            'fees': self.fees,
+            'avg_holding_s': self.holding_seconds / self.trades if self.trades else 0.0,
+        }
+
+
+class PerformanceAnalytics:
+    """
+    Running performance statistics, updated as fills and marks arrive.
+
+    Equity = starting equity + realized net PnL + open unrealized PnL. Every
+    update adjusts running sums (peak, drawdown, exposure, per-strategy and
+    per-symbol totals), and equity is sampled once per `return_interval` into
+    a fixed ring: the sampled returns feed a rolling window of sum / sum of
+    squares / downside sum of squares, so Sharpe and Sortino are O(1) to
+    read. Nothing here grows with run time.
+    """
+
+    def __init__(self, starting_equity: float = 0.0, return_interval: float = 60.0, window: int = 1440,
+                 curve_length: int = 10080):
+        self.starting_equity = starting_equity
+        self.return_interval = return_interval  # Seconds per equity sample / return
+        self.window = window                    # Returns in the rolling Sharpe/Sortino (1440 x 1m = 1 day)
+        self.periods_per_year = SECONDS_PER_YEAR / return_interval
+
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.unrealized = {}                    # symbol -> unrealized PnL
+        self.unrealized_total = 0.0
+        self.open_positions = {}                # symbol -> (opened_at, strategy)
+
+        # Drawdown
+        self.peak_equity = starting_equity
+        self.max_drawdown = 0.0                 # USD
+        self.max_drawdown_pct = 0.0
+
+        # Exposure - time with at least one position open
+        self.started_at = time.time()
+        self.exposed_seconds = 0.0
+        self._last_update = self.started_at
+
+        # Rolling returns
+        self.returns = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._downside_sq = 0.0
+        self._sample_equity: Optional[float] = None
+        self._next_sample = self.started_at + return_interval
+
+        # Equity curve ring (one point per return_interval)
+        self.curve_time = np.zeros(curve_length)
+        self.curve_equity = np.zeros(curve_length)
+        self._curve_next = 0
+        self._curve_count = 0
+
+        self.closed = Attribution()
+        self.by_strategy: Dict[str, Attribution] = {}
+        self.by_symbol: Dict[str, Attribution] = {}
+
+    @property
+    def equity(self) -> float:
+        return self.starting_equity + self.realized_pnl + self.unrealized_total
+
+    def set_starting_equity(self, equity: float):
+        """Account value when the session starts (before any trade)"""
+        self.peak_equity += equity - self.starting_equity
+        self.starting_equity = equity
+
+    # === UPDATES ===
+
+    def on_open(self, symbol: str, strategy: Optional[str] = None, now: Optional[float] = None,
+                opened_at: Optional[float] = None):
+        """Position opened (repeat calls keep the first open time and fill in the strategy)"""
+        now = self._update(now)
+        known_at, known = self.open_positions.get(symbol, (opened_at or now, None))
+        self.open_positions[symbol] = (known_at, strategy or known)
+
+    def on_close(self, symbol: str, pnl: float, fees: float = 0.0, strategy: Optional[str] = None,
+                 now: Optional[float] = None):
+        """A position lifecycle finished with net `pnl` (fees already deducted)"""
+        now = self._update(now)
+        opened_at, known = self.open_positions.pop(symbol, (now, None))
+        self.unrealized_total -= self.unrealized.pop(symbol, 0.0)
+        self.realized_pnl += pnl
+        self.fees += fees
+        holding = now - opened_at
+        strategy = strategy or known or "unknown"
+        self.closed.add(pnl, fees, holding)
+        self.by_strategy.setdefault(strategy, Attribution()).add(pnl, fees, holding)
+        self.by_symbol.setdefault(symbol, Attribution()).add(pnl, fees, holding)
+        self._update_drawdown()
+
+    def forget(self, symbol: str, now: Optional[float] = None):
+        """Position vanished without a fill we saw (reconciliation) - no PnL to book"""
+        self._update(now)
+        self.open_positions.pop(symbol, None)
+        self.unrealized_total -= self.unrealized.pop(symbol, 0.0)
+        self._update_drawdown()
+
+    def mark(self, symbol: str, unrealized_pnl: float, now: Optional[float] = None):
+        self._update(now)
+        self.unrealized_total += unrealized_pnl - self.unrealized.get(symbol, 0.0)
+        self.unrealized[symbol] = unrealized_pnl
+        self._update_drawdown()
+
+    def _update(self, now: Optional[float]) -> float:
+        """Accrue exposure time and take any due equity samples"""
+        now = time.time() if now is None else now
+        if self.open_positions:
+            self.exposed_seconds += max(0.0, now - self._last_update)
+        self._last_update = now
+        if now >= self._next_sample:
+            self._sample(now)
+        return now
+
+    def _update_drawdown(self):
+        equity = self.equity
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+            return
+        drawdown = self.peak_equity - equity
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+            if self.peak_equity > 0:
+                self.max_drawdown_pct = drawdown / self.peak_equity
+
+    def _sample(self, now: float):
+        equity = self.equity
+        # Intervals nobody marked in were flat (nothing open to move the equity)
+        missed = min(int((now - self._next_sample) // self.return_interval), self.window)
+        if self._sample_equity and self._sample_equity > 0:
+            for _ in range(missed):
+                self._add_return(0.0)
+            self._add_return(equity / self._sample_equity - 1)
+        self._sample_equity = equity
+        self._next_sample += (int((now - self._next_sample) // self.return_interval) + 1) * self.return_interval
+
+        self.curve_time[self._curve_next] = now
+        self.curve_equity[self._curve_next] = equity
+        self._curve_next = (self._curve_next + 1) % len(self.curve_time)
+        self._curve_count = min(self._curve_count + 1, len(self.curve_time))
+
+    def _add_return(self, value: float):
+        self.returns.append(value)
+        self._sum += value
+        self._sum_sq += value * value
+        self._downside_sq += min(value, 0.0) ** 2
+        if len(self.returns) > self.window:
+            old = self.returns.popleft()
+            self._sum -= old
+            self._sum_sq -= old * old
+            self._downside_sq -= min(old, 0.0) ** 2
+
+    # === QUERIES (O(1)) ===
+
+    def sharpe(self) -> float:
+        n = len(self.returns)
+        if n < 2:
+            return 0.0
+        mean = self._sum / n
+        variance = max(self._sum_sq / n - mean * mean, 0.0)
+        return mean / math.sqrt(variance) * math.sqrt(self.periods_per_year) if variance > 1e-18 else 0.0
+
+    def sortino(self) -> float:
+        n = len(self.returns)
+        if n < 2:
+            return 0.0
+        downside = math.sqrt(max(self._downside_sq, 0.0) / n)
+        return (self._sum / n) / downside * math.sqrt(self.periods_per_year) if downside > 1e-9 else 0.0
+
+    def drawdown(self) -> float:
+        return self.peak_equity - self.equity
+
+    def exposure(self) -> float:
+        elapsed = self._last_update - self.started_at
+        return self.exposed_seconds / elapsed if elapsed > 0 else 0.0
+
+    def export(self) -> Dict[str, np.ndarray]:
+        """Equity curve and drawdown as chronological float arrays (copies)"""
+        if self._curve_count == len(self.curve_time):
+            order = np.roll(np.arange(self._curve_count), -self._curve_next)  # Oldest first
+        else:
+            order = np.arange(self._curve_count)
+        equity = self.curve_equity[order]
+        return {
+            'time': self.curve_time[order],
+            'equity': equity,
+            'drawdown': np.maximum.accumulate(equity) - equity if len(equity) else equity,
+            'returns': np.fromiter(self.returns, dtype=float, count=len(self.returns)),
+        }
+
+    def get_metrics(self) -> Dict:
+        closed = self.closed.as_dict()
+        return {
+            'equity': self.equity,
+            'realized_pnl': self.realized_pnl,
+            'unrealized_pnl': self.unrealized_total,
+            'fees': self.fees,
+            'trades': closed['trades'],
+            'win_rate': closed['win_rate'],
+            'drawdown': self.drawdown(),
+            'max_drawdown': self.max_drawdown,
+            'max_drawdown_pct': self.max_drawdown_pct,
+            'sharpe': self.sharpe(),
+            'sortino': self.sortino(),
+            'return_samples': len(self.returns),
+            'avg_holding_s': closed['avg_holding_s'],
+            'exposure': self.exposure(),
+            'by_strategy': {name: stats.as_dict() for name, stats in self.by_strategy.items()},
+            'by_symbol': {name: stats.as_dict() for name, stats in self.by_symbol.items()},
+        }
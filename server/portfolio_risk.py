@@ -0,0 +1,205 @@
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# One-sided normal quantiles for parametric VaR
+Z_SCORES = {0.95: 1.6449, 0.99: 2.3263, 0.999: 3.0902}
+
+
+class EWCovariance:
+    """
+    Exponentially weighted covariance of log returns across many symbols.
+
+    observe() is O(1) per tick (it only records the latest price). Every
+    `sample_interval` seconds the returns since the previous sample form one
+    vector r and the matrix takes a rank-1 update C = lam*C + (1-lam)*r*r'/dt
+    - O(n^2), never a full recompute. C is kept per second of horizon, so
+    seeding from 1m candles and live 5s sampling share one scale. Symbols are
+    added on first tick (or seed) and the matrix grows in place; forget()
+    frees a symbol's slot. Read-only checks never allocate one.
+    """
+
+    def __init__(self, sample_interval: float = 5.0, halflife: float = 3600.0, min_samples: int = 30,
+                 capacity: int = 16):
+        self.sample_interval = sample_interval
+        self.halflife = halflife            # Seconds for an observation's weight to halve
+        self.min_samples = min_samples      # Below this the matrix is not trusted for limits
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.cov = np.zeros((capacity, capacity))
+        self._latest = np.full(capacity, np.nan)    # Latest price per symbol
+        self._sampled = np.full(capacity, np.nan)   # Price at the previous sample
+        self._last_sample: Optional[float] = None
+        self._weight = 0.0                           # Total EW weight so far (bias correction while warming up)
+        self.samples = 0
+
+        # Metrics
+        self.last_update_us = 0.0
+        self.last_check_us = 0.0
+
+    def _slot(self, symbol: str) -> int:
+        slot = self.index.get(symbol)
+        if slot is not None:
+            return slot
+        slot = len(self.symbols)
+        if slot == len(self._latest):
+            size = 2 * slot
+            cov = np.zeros((size, size))
+            cov[:slot, :slot] = self.cov
+            self.cov = cov
+            self._latest = np.concatenate((self._latest, np.full(slot, np.nan)))
+            self._sampled = np.concatenate((self._sampled, np.full(slot, np.nan)))
+        self.index[symbol] = slot
+        self.symbols.append(symbol)
+        return slot
+
+    def forget(self, symbol: str):
+        """Drop a symbol's slot; later slots move down one"""
+        slot = self.index.pop(symbol, None)
+        if slot is None:
+            return
+        n = len(self.symbols)
+        keep = [i for i in range(n) if i != slot]
+        self.cov[:n - 1, :n - 1] = self.cov[np.ix_(keep, keep)]
+        self.cov[n - 1, :n] = 0.0
+        self.cov[:n, n - 1] = 0.0
+        for prices in (self._latest, self._sampled):
+            prices[slot:n - 1] = prices[slot + 1:n]
+            prices[n - 1] = np.nan
+        del self.symbols[slot]
+        for moved in self.symbols[slot:]:
+            self.index[moved] -= 1
+
+    def observe(self, symbol: str, price: float, timestamp: float):
+        """Record a tick; takes a covariance sample once per sample_interval"""
+        slot = self._slot(symbol)  # May grow (rebind) the arrays
+        self._latest[slot] = price
+        if self._last_sample is None:
+            self._last_sample = timestamp
+            self._sampled[:] = self._latest
+        elif timestamp - self._last_sample >= self.sample_interval:
+            self._sample(timestamp)
+
+    def _sample(self, timestamp: float):
+        started = time.perf_counter()
+        n = len(self.symbols)
+        dt = timestamp - self._last_sample
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = np.log(self._latest[:n] / self._sampled[:n])
+        returns[~np.isfinite(returns)] = 0.0  # Symbols without two prices yet
+        decay = 0.5 ** (dt / self.halflife)
+        cov = self.cov[:n, :n]
+        cov *= decay
+        cov += (1 - decay) / dt * np.outer(returns, returns)
+        self._weight = decay * self._weight + (1 - decay)
+        self._sampled[:n] = self._latest[:n]
+        self._last_sample = timestamp
+        self.samples += 1
+        self.last_update_us = (time.perf_counter() - started) * 1e6
+
+    def seed(self, closes: Dict[str, np.ndarray], interval: float):
+        """Initialize from aligned recent closes (e.g. 1m history) sampled every `interval` seconds"""
+        series = {symbol: np.asarray(values, dtype=float) for symbol, values in closes.items() if len(values) > 2}
+        if not series:
+            return
+        length = min(len(values) for values in series.values())
+        slots = [self._slot(symbol) for symbol in series]
+        returns = np.diff(np.log(np.vstack([values[-length:] for values in series.values()])), axis=1)
+        weights = 0.5 ** ((returns.shape[1] - 1 - np.arange(returns.shape[1])) * interval / self.halflife)
+        cov = (returns * weights) @ returns.T / weights.sum() / interval
+        self._weight = 1 - 0.5 ** (returns.shape[1] * interval / self.halflife)
+        self.cov[np.ix_(slots, slots)] = cov * self._weight
+        self.samples = max(self.samples, returns.shape[1])
+
+    def ready(self) -> bool:
+        return self.samples >= self.min_samples
+
+    def matrix(self) -> np.ndarray:
+        """Covariance per second of horizon (n x n, bias-corrected)"""
+        n = len(self.symbols)
+        return self.cov[:n, :n] / self._weight if self._weight > 0 else self.cov[:n, :n].copy()
+
+    def volatility(self, symbol: str, horizon: float = 1.0) -> float:
+        slot = self.index.get(symbol)
+        if slot is None or self._weight <= 0:
+            return 0.0
+        return math.sqrt(max(self.cov[slot, slot] / self._weight, 0.0) * horizon)
+
+    def correlation(self) -> np.ndarray:
+        cov = self.matrix()
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        corr[~np.isfinite(corr)] = 0.0
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def exposure_vector(self, exposures: Dict[str, float]) -> np.ndarray:
+        weights = np.zeros(len(self.symbols))
+        for symbol, notional in exposures.items():
+            slot = self.index.get(symbol)
+            if slot is not None:
+                weights[slot] += notional
+        return weights
+
+    def portfolio_check(self, exposures: Dict[str, float], symbol: str, notional: float,
+                        horizon: float = 3600.0, confidence: float = 0.99) -> Dict:
+        """
+        Risk of the book before/after adding `notional` (signed USD) of `symbol`.
+
+        Returns parametric VaR over `horizon` seconds before and after, the
+        marginal VaR of the order, and the correlated notional: the order plus
+        every held position weighted by its correlation with the order's
+        symbol, in the order's direction. A symbol with no slot yet is
+        assumed uncorrelated at the largest tracked variance (no slot is
+        allocated for it).
+        """
+        started = time.perf_counter()
+        n = len(self.symbols)
+        cov = self.matrix()
+        before = self.exposure_vector(exposures)
+        slot = self.index.get(symbol)
+        if slot is None:
+            slot = n
+            default = float(np.max(np.diag(cov))) if n else 0.0
+            cov = np.pad(cov, ((0, 1), (0, 1)))
+            cov[slot, slot] = default
+            before = np.append(before, 0.0)
+            n += 1
+        after = before.copy()
+        after[slot] += notional
+
+        z = Z_SCORES.get(confidence, 2.3263)
+        var_before = z * math.sqrt(max(before @ cov @ before, 0.0) * horizon)
+        var_after = z * math.sqrt(max(after @ cov @ after, 0.0) * horizon)
+
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        if std[slot] > 0:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                corr_row = np.nan_to_num(cov[slot] / (std * std[slot]))
+            corr_row[slot] = 1.0
+        else:
+            corr_row = np.zeros(n)
+            corr_row[slot] = 1.0
+        direction = 1.0 if notional >= 0 else -1.0
+        correlated = direction * float(corr_row @ after)
+
+        self.last_check_us = (time.perf_counter() - started) * 1e6
+        return {
+            'var_before': var_before,
+            'var_after': var_after,
+            'marginal_var': var_after - var_before,
+            'correlated_notional': correlated,
+            'symbols': n,
+        }
+
+    def get_metrics(self) -> Dict:
+        return {
+            'symbols': len(self.symbols),
+            'samples': self.samples,
+            'ready': self.ready(),
+            'last_update_us': self.last_update_us,
+            'last_check_us': self.last_check_us,
+        }
@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from background import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(obj, depth: int = 3, _seen=None) -> int:
+    """Approximate deep size in bytes (containers, dataclasses and __dict__ objects, bounded depth)"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, depth - 1, _seen) + estimate_size(v, depth - 1, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)) or type(obj).__name__ == 'deque':
+        size += sum(estimate_size(item, depth - 1, _seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += estimate_size(vars(obj), depth - 1, _seen)
+    return size
+
+
+def estimate_container_size(container, sample: int = 20) -> int:
+    """Deep size of a large container extrapolated from a sample of its items"""
+    items = list(container)
+    if not items:
+        return sys.getsizeof(container)
+    step = max(1, len(items) // sample)
+    sampled = items[::step]
+    per_item = sum(estimate_size(item) for item in sampled) / len(sampled)
+    return int(sys.getsizeof(container) + per_item * len(items))
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for one thread (the event loop).
+
+    A background thread reads the target thread's current frame every
+    `interval` seconds via sys._current_frames() and counts whole stacks;
+    the result is written as collapsed stacks ("a;b;c count" lines) ready
+    for flamegraph.pl / speedscope. Nothing runs while no profile is active.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrics
+        self.profiles = 0
+        self.last_samples = 0
+        self.last_path: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float, path: str) -> bool:
+        if self.running:
+            return False
+        self._thread = threading.Thread(target=self._run, args=(duration, path), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, duration: float, path: str):
+        stacks = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self.profiles += 1
+        self.last_samples = sum(stacks.values())
+        self.last_path = path
+        logger.info("🔬 CPU profile written: %s (%d samples, %d distinct stacks)", path, self.last_samples, len(stacks))
+
+
+class AllocationTracker:
+    """
+    On-demand tracemalloc snapshots diffed against the previous one, plus a
+    census of the bot's own long-lived structures. Tracing only runs between
+    the first snapshot and stop() - it costs nothing otherwise.
+    """
+
+    def __init__(self, census: Callable[[], Dict[str, Dict]], frames: int = 10, top: int = 25):
+        self.census = census
+        self.frames = frames
+        self.top = top
+        self._snapshot = None
+        self._census: Dict[str, Dict] = {}
+        self.snapshots = 0
+
+    def snapshot(self, path: str, census: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Write a report of growth since the previous snapshot; returns a one-line
+        summary. Pass a `census` taken on the event loop to run this on a
+        worker thread - the bot's structures are not safe to walk off-loop.
+        """
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if census is None:
+            census = self.census()
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [f"# Allocation snapshot {time.strftime('%Y-%m-%d %H:%M:%S')}",
+                 f"# Traced: {current / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB)", "", "## Bot structures"]
+        for name, stats in census.items():
+            previous = self._census.get(name, {})
+            growth = {key: value - previous.get(key, 0) for key, value in stats.items()
+                      if isinstance(value, (int, float))}
+            lines.append(f"{name}: {stats}" + (f" | growth {growth}" if previous else ""))
+
+        lines += ["", "## Top allocation growth by line" if self._snapshot else "## Top allocations by line (baseline)"]
+        if self._snapshot is not None:
+            stats = snapshot.compare_to(self._snapshot, 'lineno')[:self.top]
+        else:
+            stats = snapshot.statistics('lineno')[:self.top]
+        lines += [str(stat) for stat in stats]
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        self._snapshot = snapshot
+        self._census = census
+        self.snapshots += 1
+        summary = f"{path}: traced {current / 1e6:.1f} MB" + (" (tracing started - baseline)" if started_tracing else "")
+        logger.info("🔬 Allocation snapshot %s", summary)
+        return summary
+
+    def stop(self) -> str:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._snapshot = None
+        return "tracemalloc stopped"
+
+
+class ProfilingControl:
+    """
+    Runtime profiling switches for the running process - no restart needed.
+
+    Local TCP endpoint (127.0.0.1 only, one command per line):
+        profile [seconds]   sample the event loop, write collapsed stacks
+        alloc               allocation snapshot (diff vs. the previous one)
+        alloc stop          stop tracemalloc
+        status
+    plus any `commands` (name -> handler(args) -> reply) other components add.
+    Signals: SIGUSR1 = profile for `default_seconds`, SIGUSR2 = alloc.
+    """
+
+    def __init__(self, census: Callable[[], Dict[str, Dict]], out_dir: str = "profiles", port: int = 0,
+                 default_seconds: float = 30.0, commands: Optional[Dict[str, Callable[[List[str]], str]]] = None):
+        self.commands = commands or {}
+        self.out_dir = out_dir
+        self.port = port
+        self.default_seconds = default_seconds
+        self.profiler = SamplingProfiler(threading.get_ident())
+        self.allocations = AllocationTracker(census)
+        self.server = None
+        self.background = BackgroundTasks()
+        self._alloc_lock = asyncio.Lock()
+
+    def _path(self, kind: str, extension: str) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        return os.path.join(self.out_dir, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+    def command(self, line: str) -> str:
+        parts = line.strip().split()
+        if not parts:
+            return "commands: " + " | ".join(["profile [seconds]", "alloc", "alloc stop", "status", *self.commands])
+        if parts[0] in self.commands:
+            return self.commands[parts[0]](parts[1:])
+        if parts[0] == "profile":
+            seconds = float(parts[1]) if len(parts) > 1 else self.default_seconds
+            path = self._path("cpu", "folded")
+            if not self.profiler.start(seconds, path):
+                return "profile already running"
+            return f"profiling {seconds:.0f}s -> {path}"
+        if parts[0] == "status":
+            return (f"profiling: {'running' if self.profiler.running else 'idle'} "
+                    f"({self.profiler.profiles} done, last {self.profiler.last_path}) | "
+                    f"tracemalloc: {'on' if tracemalloc.is_tracing() else 'off'} "
+                    f"({self.allocations.snapshots} snapshots)")
+        return f"unknown command: {parts[0]}"
+
+    async def execute(self, line: str) -> str:
+        """command(), plus the allocation commands, whose tracemalloc work runs on a worker thread"""
+        parts = line.strip().split()
+        if parts[:1] != ["alloc"]:
+            return self.command(line)
+        if parts[1:2] == ["stop"]:
+            async with self._alloc_lock:
+                return self.allocations.stop()
+        if self._alloc_lock.locked():
+            return "allocation snapshot already running"
+        async with self._alloc_lock:
+            # The census walks live bot structures, so it is taken here on the loop; snapshot,
+            # diff and report (the slow part) run in the executor
+            census = self.allocations.census()
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.allocations.snapshot, self._path("alloc", "txt"), census)
+
+    def install_signal_handlers(self, loop: asyncio.AbstractEventLoop):
+        """SIGUSR1/SIGUSR2 (POSIX only)"""
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        try:
+            loop.add_signal_handler(signal.SIGUSR1, lambda: logger.info("🔬 %s", self.command("profile")))
+            loop.add_signal_handler(signal.SIGUSR2,
+                                    lambda: self.background.spawn(self.execute("alloc"), name="alloc-snapshot"))
+        except (NotImplementedError, RuntimeError) as e:
+            logger.debug("Profiling signal handlers unavailable: %s", e)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self.execute(line.decode('utf-8', 'replace'))
+                except Exception as e:
+                    reply = f"error: {e}"
+                writer.write((reply + "\n").encode('utf-8'))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client went away / shutting down
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Bind the control endpoint (port 0 = signals only) and hook the signals"""
+        self.profiler.thread_id = threading.get_ident()  # The event loop's thread
+        self.install_signal_handlers(asyncio.get_running_loop())
+        if self.port:
+            self.server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+            logger.info("🔬 Profiling control on 127.0.0.1:%s (profile [s] | alloc | status)", self.port)
+
+    def close(self):
+        if self.server:
+            self.server.close()
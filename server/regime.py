@@ -0,0 +1,124 @@
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+VOLATILE = "volatile"
+TRENDING = "trending"
+RANGING = "ranging"
+
+
+@dataclass
+class RegimeState:
+    regime: str = RANGING
+    volatility: float = 0.0     # Return std scaled to the window (typical move over the window)
+    trend: float = 0.0          # Net move over the window in units of `volatility` (signed)
+    updates: int = 0
+    candidate: Optional[str] = None
+    confirmations: int = 0
+    returns: deque = field(default_factory=deque, repr=False)
+    last_price: Optional[float] = None
+    sum: float = 0.0
+    sum_sq: float = 0.0
+
+
+class RegimeClassifier:
+    """
+    Per-symbol market regime (volatile / trending / ranging) from rolling returns.
+
+    Each update folds one log return into running sums over the last `window`
+    returns, so classification is O(1) per price regardless of window size or
+    symbol count. Thresholds have hysteresis: a regime is entered above its
+    threshold but only left below `hysteresis` x threshold, and a new regime
+    must be seen on `confirm` consecutive updates before it takes over.
+    """
+
+    def __init__(self, window: int = 30, volatility_threshold: float = 0.02, trend_threshold: float = 2.0,
+                 hysteresis: float = 0.75, confirm: int = 3):
+        self.window = window
+        self.volatility_threshold = volatility_threshold  # Window volatility above this -> volatile
+        self.trend_threshold = trend_threshold            # |trend| above this -> trending
+        self.hysteresis = hysteresis
+        self.confirm = confirm
+        self._states: Dict[str, RegimeState] = {}
+
+        # Metrics
+        self.changes = 0
+
+    def state(self, symbol: str) -> RegimeState:
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = RegimeState()
+        return state
+
+    def regime(self, symbol: str) -> str:
+        state = self._states.get(symbol)
+        return state.regime if state is not None else RANGING
+
+    def forget(self, symbol: str):
+        self._states.pop(symbol, None)
+
+    def seed(self, symbol: str, prices: Iterable[float]):
+        """Warm up from recent closes (e.g. after a history bootstrap)"""
+        for price in prices:
+            self.update(symbol, price)
+
+    def update(self, symbol: str, price: float) -> str:
+        state = self.state(symbol)
+        if state.last_price is None or price <= 0 or state.last_price <= 0:
+            state.last_price = price
+            return state.regime
+
+        ret = math.log(price / state.last_price)
+        state.last_price = price
+        state.returns.append(ret)
+        state.sum += ret
+        state.sum_sq += ret * ret
+        if len(state.returns) > self.window:
+            old = state.returns.popleft()
+            state.sum -= old
+            state.sum_sq -= old * old
+        state.updates += 1
+        if state.updates % 1000 == 0:
+            # Re-anchor the running sums against float drift
+            state.sum = math.fsum(state.returns)
+            state.sum_sq = math.fsum(r * r for r in state.returns)
+
+        n = len(state.returns)
+        if n < self.window:
+            return state.regime
+        variance = max(state.sum_sq / n - (state.sum / n) ** 2, 0.0)
+        state.volatility = math.sqrt(variance * n)
+        state.trend = state.sum / state.volatility if state.volatility > 0 else 0.0
+
+        self._classify(state)
+        return state.regime
+
+    def _classify(self, state: RegimeState):
+        volatile_at = self.volatility_threshold * (self.hysteresis if state.regime == VOLATILE else 1.0)
+        trending_at = self.trend_threshold * (self.hysteresis if state.regime == TRENDING else 1.0)
+        if state.volatility > volatile_at:
+            observed = VOLATILE
+        elif abs(state.trend) > trending_at:
+            observed = TRENDING
+        else:
+            observed = RANGING
+
+        if observed == state.regime:
+            state.candidate, state.confirmations = None, 0
+            return
+        if observed != state.candidate:
+            state.candidate, state.confirmations = observed, 0
+        state.confirmations += 1
+        if state.confirmations >= self.confirm:
+            state.regime = observed
+            state.candidate, state.confirmations = None, 0
+            self.changes += 1
+
+    def get_metrics(self) -> Dict:
+        return {
+            'regimes': {symbol: state.regime for symbol, state in self._states.items()},
+            'volatility': {symbol: round(state.volatility, 5) for symbol, state in self._states.items()},
+            'trend': {symbol: round(state.trend, 2) for symbol, state in self._states.items()},
+            'changes': self.changes,
+        }
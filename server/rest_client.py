@@ -0,0 +1,281 @@
+import asyncio
+import copy
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Hyperliquid REST budget: 1200 weight per minute per IP
+# https://hyperliquid.gitbook.io/hyperliquid-docs/for-developers/api/rate-limits-and-user-limits
+HYPERLIQUID_WEIGHT_PER_MINUTE = 1200
+
+# Info request weights (everything not listed here costs 20)
+INFO_WEIGHTS = {
+    'l2Book': 2,
+    'allMids': 2,
+    'clearinghouseState': 2,
+    'orderStatus': 2,
+    'spotClearinghouseState': 2,
+    'exchangeStatus': 2,
+    'userRole': 60,
+}
+DEFAULT_INFO_WEIGHT = 20
+CANDLES_PER_EXTRA_WEIGHT = 60
+
+
+def exchange_action_weight(batch_length: int = 1) -> int:
+    """Weight of a signed /exchange action (1 + floor(batch_length / 40))"""
+    return 1 + batch_length // 40
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the exchange keeps answering 429 after all retries"""
+
+
+class TokenBucket:
+    """
+    Async token bucket metering Hyperliquid request weight.
+    Waiters are served FIFO so a burst of reads cannot starve an order.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.waiters = 0
+        self.max_waiters = 0
+        self.total_wait_time = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_per_second)
+        self.last_refill = now
+
+    async def acquire(self, weight: float):
+        """Wait until `weight` tokens are available, then consume them"""
+        weight = min(weight, self.capacity)
+        self.waiters += 1
+        self.max_waiters = max(self.max_waiters, self.waiters)
+        started = time.monotonic()
+        try:
+            async with self._lock:
+                self._refill()
+                while self.tokens < weight:
+                    await asyncio.sleep((weight - self.tokens) / self.refill_per_second)
+                    self._refill()
+                self.tokens -= weight
+        finally:
+            self.waiters -= 1
+            self.total_wait_time += time.monotonic() - started
+
+    def drain(self):
+        """Empty the bucket after the exchange told us we're over budget"""
+        self._refill()
+        self.tokens = 0.0
+
+
+class WorkerPool:
+    """Worker threads for blocking SDK calls, with saturation counters shared by every client using them"""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hl-rest")
+        self.active = 0
+        self.peak_active = 0
+
+
+class HyperliquidRestClient:
+    """
+    Single REST layer for all Info/Exchange calls.
+
+    - Token-bucket budgeting against Hyperliquid's weight limits
+    - One shared keep-alive HTTP session (no repeated TLS handshakes)
+    - Identical concurrent reads coalesced into one in-flight request
+    - SDK calls run on a bounded worker pool so they never block the event loop
+    """
+
+    def __init__(self, info, exchange=None, max_workers: int = 4,
+                 weight_per_minute: int = HYPERLIQUID_WEIGHT_PER_MINUTE,
+                 budget_fraction: float = 0.9, max_retries: int = 3, retry_delay: float = 1.0):
+        self.info = info
+        self.exchange = exchange
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        # Keep headroom below the hard limit for anything else sharing our IP
+        budget = weight_per_minute * budget_fraction
+        self.limiter = TokenBucket(capacity=budget, refill_per_second=budget / 60.0)
+
+        self.pool = WorkerPool(max_workers)
+        self._owns_pool = True  # Clients from for_exchange() borrow it
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+
+        # Metrics
+        self.requests_sent = 0
+        self.requests_coalesced = 0
+        self.rate_limited_responses = 0
+        self.weight_consumed = 0
+
+        self._share_http_session()
+
+    def _share_http_session(self):
+        """Point Info, Exchange and Exchange.info at one pooled keep-alive session"""
+        session = getattr(self.info, 'session', None)
+        if session is None:
+            return
+        try:
+            from requests.adapters import HTTPAdapter
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        except ImportError:
+            pass
+
+        if self.exchange is not None:
+            self.exchange.session = session
+            if getattr(self.exchange, 'info', None) is not None:
+                self.exchange.info.session = session
+
+    def for_exchange(self, exchange) -> 'HyperliquidRestClient':
+        """Client for another account sharing this one's IP budget, worker pool and HTTP session"""
+        client = copy.copy(self)
+        client.exchange = exchange
+        client._owns_pool = False
+        client.requests_sent = 0
+        client.requests_coalesced = 0
+        client.rate_limited_responses = 0
+        client.weight_consumed = 0
+        session = getattr(self.info, 'session', None)
+        if session is not None:
+            exchange.session = session
+            if getattr(exchange, 'info', None) is not None:
+                exchange.info.session = session
+        return client
+
+    # === CORE REQUEST PATH ===
+
+    async def _run(self, fn: Callable, *args, weight: float, **kwargs) -> Any:
+        """Budget, execute on the worker pool, and retry on 429"""
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(weight)
+            self.requests_sent += 1
+            self.weight_consumed += weight
+            self.pool.active += 1
+            self.pool.peak_active = max(self.pool.peak_active, self.pool.active)
+            try:
+                return await loop.run_in_executor(self.pool.executor, lambda: fn(*args, **kwargs))
+            except Exception as e:
+                if getattr(e, 'status_code', None) != 429:
+                    raise
+                self.rate_limited_responses += 1
+                self.limiter.drain()
+                if attempt >= self.max_retries:
+                    raise RateLimitExceeded(f"{getattr(fn, '__name__', 'request')} rate limited "
+                                            f"after {self.max_retries} retries") from e
+                wait_time = self.retry_delay * (2 ** attempt)
+                logger.warning("⏳ Hyperliquid 429 on %s, retrying in %.1fs",
+                               getattr(fn, '__name__', 'request'), wait_time)
+                await asyncio.sleep(wait_time)
+            finally:
+                self.pool.active -= 1
+
+    async def _coalesced(self, key: Tuple, fn: Callable, *args, weight: float, **kwargs) -> Any:
+        """Share one in-flight request between identical concurrent reads"""
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.requests_coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._run(fn, *args, weight=weight, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a read nobody else joined doesn't warn on GC
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    # === INFO (READS) ===
+
+    async def user_state(self, address: str) -> Any:
+        return await self._coalesced(('clearinghouseState', address), self.info.user_state, address,
+                                     weight=INFO_WEIGHTS['clearinghouseState'])
+
+    async def all_mids(self) -> Any:
+        return await self._coalesced(('allMids',), self.info.all_mids, weight=INFO_WEIGHTS['allMids'])
+
+    async def open_orders(self, address: str) -> Any:
+        return await self._coalesced(('openOrders', address), self.info.open_orders, address,
+                                     weight=DEFAULT_INFO_WEIGHT)
+
+    async def candles_snapshot(self, name: str, interval: str, start_time: int, end_time: int,
+                               expected_candles: int = 0) -> Any:
+        weight = DEFAULT_INFO_WEIGHT + expected_candles // CANDLES_PER_EXTRA_WEIGHT
+        return await self._coalesced(('candleSnapshot', name, interval, start_time, end_time),
+                                     self.info.candles_snapshot, name, interval, start_time, end_time,
+                                     weight=weight)
+
+    # === EXCHANGE (WRITES - never coalesced) ===
+
+    async def market_open(self, name: str, is_buy: bool, sz: float, px: Optional[float] = None, **kwargs) -> Any:
+        # SDK fetches allMids for the slippage price when px is None
+        weight = exchange_action_weight() + (INFO_WEIGHTS['allMids'] if px is None else 0)
+        return await self._run(self.exchange.market_open, name, is_buy, sz, px, weight=weight, **kwargs)
+
+    async def market_close(self, coin: str, sz: Optional[float] = None, px: Optional[float] = None, **kwargs) -> Any:
+        # SDK looks up clearinghouseState (and allMids when px is None) before sending
+        weight = exchange_action_weight() + INFO_WEIGHTS['clearinghouseState']
+        weight += INFO_WEIGHTS['allMids'] if px is None else 0
+        return await self._run(self.exchange.market_close, coin, sz, px, weight=weight, **kwargs)
+
+    async def bulk_orders(self, order_requests, **kwargs) -> Any:
+        return await self._run(self.exchange.bulk_orders, order_requests,
+                               weight=exchange_action_weight(len(order_requests)), **kwargs)
+
+    async def cancel(self, name: str, oid: int) -> Any:
+        return await self._run(self.exchange.cancel, name, oid, weight=exchange_action_weight())
+
+    async def bulk_cancel_by_cloid(self, cancel_requests) -> Any:
+        return await self._run(self.exchange.bulk_cancel_by_cloid, cancel_requests,
+                               weight=exchange_action_weight(len(cancel_requests)))
+
+    async def bulk_modify_orders(self, modify_requests) -> Any:
+        return await self._run(self.exchange.bulk_modify_orders_new, modify_requests,
+                               weight=exchange_action_weight(len(modify_requests)))
+
+    # === METRICS ===
+
+    def get_metrics(self) -> Dict:
+        """Limiter queue depth, pool saturation and request counters"""
+        return {
+            'requests_sent': self.requests_sent,
+            'requests_coalesced': self.requests_coalesced,
+            'rate_limited_responses': self.rate_limited_responses,
+            'weight_consumed': self.weight_consumed,
+            'limiter_tokens': round(self.limiter.tokens, 1),
+            'limiter_queue_depth': self.limiter.waiters,
+            'limiter_max_queue_depth': self.limiter.max_waiters,
+            'limiter_wait_seconds': round(self.limiter.total_wait_time, 3),
+            'pool_active': self.pool.active,
+            'pool_size': self.pool.max_workers,
+            'pool_saturation': self.pool.active / self.pool.max_workers,
+            'pool_peak_saturation': self.pool.peak_active / self.pool.max_workers,
+            'in_flight_reads': len(self._in_flight),
+        }
+
+    def close(self):
+        """Stop the worker pool - a no-op for clients that share another client's pool"""
+        if self._owns_pool:
+            self.pool.executor.shutdown(wait=False)
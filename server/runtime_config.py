@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bar_aggregator import BAR_TIMEFRAMES
+from market_bus import STRATEGIES
+from regime import RANGING, TRENDING, VOLATILE
+
+logger = logging.getLogger(__name__)
+
+# Settings a running bot can change without losing warm state (user_config names and units)
+RUNTIME_KEYS = ('symbols', 'stop_loss_pct', 'take_profit_target', 'trading_strategy', 'timeframe',
+                'position_size_pct', 'max_positions', 'regime_strategies', 'volatility_threshold', 'trend_threshold')
+# Wallet and venue are fixed for the life of the process
+RESTART_KEYS = ('private_key', 'private_key_env', 'paper_trading', 'paper_balance')
+
+
+def _number(key: str, value: Any) -> float:
+    """Float from a JSON number (or numeric string); ValueError for anything else"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{key}: expected a number, got {value!r}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{key}: expected a number, got {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"{key}: {value!r} is not finite")
+    return number
+
+
+def validate_runtime_config(config: Dict) -> Dict:
+    """Normalized copy of the runtime settings in `config`; ValueError names the first bad one"""
+    restart = [key for key in config if key in RESTART_KEYS]
+    if restart:
+        raise ValueError(f"{', '.join(restart)} can only change with a restart")
+    unknown = [key for key in config if key not in RUNTIME_KEYS]
+    if unknown:
+        raise ValueError(f"unknown setting(s): {', '.join(unknown)}")
+
+    # Values come from hand-edited JSON - anything of the wrong type is a ValueError, never a TypeError
+    settings = dict(config)
+    if 'symbols' in settings:
+        symbols = settings['symbols']
+        if isinstance(symbols, str):
+            symbols = symbols.split(',')
+        if not isinstance(symbols, list) or not all(isinstance(symbol, str) for symbol in symbols):
+            raise ValueError(f"symbols: expected a list of names or a comma-separated string, got {symbols!r}")
+        symbols = [symbol.strip().upper() for symbol in symbols if symbol.strip()]
+        if not symbols:
+            raise ValueError("symbols: at least one symbol is required")
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("symbols: duplicates")
+        settings['symbols'] = symbols
+    for key, low, high in (('stop_loss_pct', 0.0, 1.0), ('position_size_pct', 0.0, 20.0),
+                           ('take_profit_target', 0.0, float('inf')), ('volatility_threshold', 0.0, float('inf')),
+                           ('trend_threshold', 0.0, float('inf'))):
+        if key in settings:
+            value = _number(key, settings[key])
+            if not low < value < high:
+                raise ValueError(f"{key}: {value} is out of range")
+            settings[key] = value
+    if 'max_positions' in settings:
+        value = _number('max_positions', settings['max_positions'])
+        if value != int(value) or value < 1:
+            raise ValueError(f"max_positions: must be a whole number of at least 1, got {settings['max_positions']!r}")
+        settings['max_positions'] = int(value)
+    for key, allowed in (('trading_strategy', STRATEGIES), ('timeframe', tuple(BAR_TIMEFRAMES))):
+        if key in settings and (not isinstance(settings[key], str) or settings[key] not in allowed):
+            raise ValueError(f"{key}: must be one of {', '.join(allowed)}")
+    if 'regime_strategies' in settings:
+        if not isinstance(settings['regime_strategies'], dict):
+            raise ValueError("regime_strategies: expected an object of regime -> strategy")
+        for regime, strategy in settings['regime_strategies'].items():
+            if (regime not in (VOLATILE, TRENDING, RANGING) or not isinstance(strategy, str)
+                    or strategy not in STRATEGIES):
+                raise ValueError(f"regime_strategies: invalid entry '{regime}': '{strategy}'")
+    return settings
+
+
+def load_runtime_config(path: str) -> Dict:
+    """Read and validate a single-bot runtime config (JSON object of RUNTIME_KEYS)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    try:
+        return validate_runtime_config(raw)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+
+
+def parse_setting(text: str) -> Any:
+    """Value typed on the control endpoint: JSON if it parses, else the raw string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class ConfigWatcher:
+    """
+    Re-applies a config file when it changes on disk.
+
+    Polls the modification time every `interval` seconds and calls
+    apply(path) on a change. A file that fails to parse or validate is
+    logged and ignored - the bot keeps running on its current settings.
+    """
+
+    def __init__(self, path: str, apply: Callable[[str], str], interval: float = 2.0):
+        self.path = path
+        self.apply = apply
+        self.interval = interval
+        self.is_running = False
+        self._mtime = self._stat()
+
+        # Metrics
+        self.reloads = 0
+        self.rejected = 0
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> str:
+        try:
+            result = self.apply(self.path)
+        except (OSError, ValueError) as e:
+            self.rejected += 1
+            logger.error("⚙️ Config %s rejected, keeping current settings: %s", self.path, e)
+            return f"error: {e}"
+        self.reloads += 1
+        return result
+
+    async def run(self):
+        self.is_running = True
+        while self.is_running:
+            await asyncio.sleep(self.interval)
+            mtime = self._stat()
+            if mtime is not None and mtime != self._mtime:
+                self._mtime = mtime
+                try:
+                    self.reload()
+                except Exception as e:
+                    # Whatever the edit was, the watcher outlives it
+                    self.rejected += 1
+                    logger.exception("⚙️ Config %s could not be applied, keeping current settings: %s", self.path, e)
+
+    def stop(self):
+        self.is_running = False
+
+    def get_metrics(self) -> Dict:
+        return {'path': self.path, 'reloads': self.reloads, 'rejected': self.rejected}
+
+
+class ConfigControl:
+    """
+    config / set / reload commands for the control endpoint:
+        config [bot]                 current runtime settings (JSON)
+        set [bot] <key> <value>      e.g. `set stop_loss_pct 0.015`, `set symbols BTC,ETH,SOL`
+        reload                       re-read the watched config file
+    The bot name is only needed when the process runs more than one bot.
+    """
+
+    def __init__(self, bots: List, watcher: Optional[ConfigWatcher] = None):
+        self.bots = {bot.name: bot for bot in bots}
+        self.watcher = watcher
+
+    def commands(self) -> Dict[str, Callable[[List[str]], str]]:
+        return {'config': self.show, 'set': self.set, 'reload': self.reload}
+
+    def _target(self, args: List[str]) -> Tuple[Any, List[str]]:
+        if args and args[0] in self.bots:
+            return self.bots[args[0]], args[1:]
+        if len(self.bots) == 1:
+            return next(iter(self.bots.values())), args
+        raise ValueError(f"name a bot first: {', '.join(self.bots)}")
+
+    def show(self, args: List[str]) -> str:
+        bot, _ = self._target(args)
+        return json.dumps(bot.runtime_settings())
+
+    def set(self, args: List[str]) -> str:
+        bot, args = self._target(args)
+        if len(args) < 2:
+            return "usage: set [bot] <key> <value>"
+        key, value = args[0], parse_setting(' '.join(args[1:]))
+        if key == 'symbols':
+            # One net position per coin per account - same rule as the fleet config
+            symbols = set(validate_runtime_config({'symbols': value})['symbols'])
+            for other in self.bots.values():
+                overlap = symbols.intersection(other.symbols)
+                if other is not bot and other.wallet.address == bot.wallet.address and overlap:
+                    raise ValueError(f"{', '.join(sorted(overlap))} already traded by {other.name} on this account")
+        changed = bot.reconfigure({key: value})
+        return f"applied: {', '.join(changed)}" if changed else "unchanged"
+
+    def reload(self, args: List[str]) -> str:
+        if self.watcher is None:
+            return "no config file is being watched"
+        return self.watcher.reload()
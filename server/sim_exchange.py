@@ -0,0 +1,469 @@
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+TAKER_FEE = 0.00045            # Hyperliquid base-tier taker fee
+FUNDING_INTERVAL = 3600.0      # Hyperliquid pays funding hourly
+DEFAULT_FUNDING_RATE = 0.0000125  # Per interval (0.01% / 8h)
+
+
+@dataclass(slots=True)
+class SimPosition:
+    size: float = 0.0           # Signed: >0 long, <0 short
+    entry_price: float = 0.0
+
+
+@dataclass(slots=True)
+class SimOrder:
+    oid: int
+    coin: str
+    is_buy: bool
+    size: float
+    limit_px: float
+    reduce_only: bool = False
+    cloid: Optional[str] = None
+    trigger_px: Optional[float] = None
+    tpsl: Optional[str] = None  # 'tp' / 'sl' for trigger orders
+    arrival: float = 0.0
+
+
+def _cloid_key(cloid) -> Optional[str]:
+    if cloid is None:
+        return None
+    return cloid.to_raw() if hasattr(cloid, 'to_raw') else str(cloid)
+
+
+class SimulatedExchange:
+    """
+    Local matching simulator with the SDK Exchange's order interface.
+
+    Orders sweep an L2 book - replayed l2Book snapshots (update_book /
+    apply_l2book) or a synthetic book around a mid (update_mid) - level by
+    level up to their limit price, so size beyond the displayed depth fills
+    partially and large orders pay for slippage. Liquidity taken stays taken
+    until the next book update. Taker fees, hourly funding and reduce-only /
+    tpsl trigger orders are applied like the exchange does; fills come out
+    in userFills format through `on_fill`.
+
+    Two ways to drive it:
+      - realtime=True (paper venue): market_open/market_close/bulk_orders
+        block for `latency` (the caller is a REST worker thread), then
+        match against the current book.
+      - realtime=False (backtests): submit() queues an order that arrives
+        `latency` later in book time and matches against the book in force
+        at arrival; every book update advances the clock. No sleeping.
+    """
+
+    def __init__(self, balance: float = 10000.0, latency: float = 0.05, taker_fee: float = TAKER_FEE,
+                 spread_bps: float = 1.0, level_step_bps: float = 1.0, level_notional: float = 50000.0,
+                 levels: int = 20, funding_rate: float = DEFAULT_FUNDING_RATE,
+                 funding_interval: float = FUNDING_INTERVAL, realtime: bool = True, info=None):
+        self.balance = balance                  # USDC, realized PnL, fees and funding included
+        self.latency = latency                  # Seconds from send to match
+        self.taker_fee = taker_fee
+        self.spread_bps = spread_bps            # Synthetic book: full spread around the mid
+        self.level_step_bps = level_step_bps    # Synthetic book: distance between levels
+        self.level_notional = level_notional    # Synthetic book: USD per level
+        self.levels = levels
+        self.funding_rate = funding_rate
+        self.funding_rates: Dict[str, float] = {}  # Per-coin overrides
+        self.funding_interval = funding_interval
+        self.realtime = realtime
+        self.info = info if info is not None else self  # round_price() reads exchange.info metadata
+        self.asset_to_sz_decimals: Dict = defaultdict(lambda: 4)
+        self.on_fill: Optional[Callable[[Dict], None]] = None
+
+        self.lock = threading.RLock()            # Book updates (loop) vs. orders (REST workers)
+        self.mids: Dict[str, float] = {}
+        self._books: Dict[str, Tuple[List[float], List[float], List[float], List[float]]] = {}
+        self.positions: Dict[str, SimPosition] = {}
+        self.pending = deque()                  # Backtest orders not yet arrived
+        self.triggers: Dict[str, Dict[int, SimOrder]] = {}
+        self._by_cloid: Dict[str, SimOrder] = {}
+        self._oids = itertools.count(1)
+        self._tids = itertools.count(1)
+        self.now = 0.0
+        self._next_funding: Optional[float] = None
+
+        # Metrics
+        self.orders = 0
+        self.fills = 0
+        self.partial_fills = 0
+        self.unfilled = 0
+        self.triggered = 0
+        self.volume = 0.0
+        self.fees_paid = 0.0
+        self.funding_paid = 0.0
+
+    # === SDK metadata (when no real Info is attached) ===
+
+    def name_to_asset(self, name: str) -> str:
+        return name
+
+    # === MARKET DATA ===
+
+    def update_mid(self, coin: str, mid: float, timestamp: Optional[float] = None):
+        """New mid; the synthetic book around it is built lazily on the next order"""
+        with self.lock:
+            self._advance(timestamp)
+            self.mids[coin] = mid
+            self._books.pop(coin, None)
+            if coin in self.triggers:
+                self._check_triggers(coin, mid)
+
+    def update_book(self, coin: str, bids: List[Tuple[float, float]], asks: List[Tuple[float, float]],
+                    timestamp: Optional[float] = None):
+        """Install a recorded book: (price, size) levels, best first"""
+        with self.lock:
+            self._advance(timestamp)
+            self._books[coin] = ([px for px, _ in bids], [sz for _, sz in bids],
+                                 [px for px, _ in asks], [sz for _, sz in asks])
+            mid = (bids[0][0] + asks[0][0]) / 2 if bids and asks else (bids or asks)[0][0]
+            self.mids[coin] = mid
+            if coin in self.triggers:
+                self._check_triggers(coin, mid)
+
+    def apply_l2book(self, data: Dict):
+        """Install an l2Book websocket payload ({'coin', 'time', 'levels': [bids, asks]})"""
+        bids, asks = data['levels']
+        self.update_book(data['coin'], [(float(level['px']), float(level['sz'])) for level in bids],
+                         [(float(level['px']), float(level['sz'])) for level in asks],
+                         data['time'] / 1000 if 'time' in data else None)
+
+    def _book(self, coin: str):
+        book = self._books.get(coin)
+        if book is None:
+            mid = self.mids[coin]
+            half, step = self.spread_bps / 2e4, self.level_step_bps / 1e4
+            bid_px = [mid * (1 - half - i * step) for i in range(self.levels)]
+            ask_px = [mid * (1 + half + i * step) for i in range(self.levels)]
+            book = self._books[coin] = (bid_px, [self.level_notional / px for px in bid_px],
+                                        ask_px, [self.level_notional / px for px in ask_px])
+        return book
+
+    def _advance(self, timestamp: Optional[float]):
+        """Move the clock: orders that arrived match the book in force, then funding"""
+        now = timestamp if timestamp is not None else (time.time() if self.realtime else self.now)
+        while self.pending and self.pending[0].arrival <= now:
+            order = self.pending.popleft()
+            self.now = order.arrival
+            self._execute(order)
+        self.now = now
+        if self._next_funding is None:
+            self._next_funding = (now // self.funding_interval + 1) * self.funding_interval
+        while now >= self._next_funding:
+            self._pay_funding()
+            self._next_funding += self.funding_interval
+
+    def _pay_funding(self):
+        for coin, position in self.positions.items():
+            if position.size and coin in self.mids:
+                # Positive rate: longs pay shorts
+                payment = position.size * self.mids[coin] * self.funding_rates.get(coin, self.funding_rate)
+                self.balance -= payment
+                self.funding_paid += payment
+
+    # === MATCHING ===
+
+    def _execute(self, order: SimOrder) -> Tuple[float, float]:
+        """Sweep the book up to the limit price (IOC); returns (filled size, average price)"""
+        self.orders += 1
+        size = order.size
+        position = self.positions.get(order.coin)
+        if order.reduce_only:
+            held = position.size if position else 0.0
+            if held == 0 or (held > 0) == order.is_buy:
+                self.unfilled += 1
+                return 0.0, 0.0
+            size = min(size, abs(held))
+        if order.coin not in self.mids:
+            self.unfilled += 1
+            return 0.0, 0.0
+
+        bid_px, bid_sz, ask_px, ask_sz = self._book(order.coin)
+        prices, sizes = (ask_px, ask_sz) if order.is_buy else (bid_px, bid_sz)
+        limit = order.limit_px
+        remaining, cost = size, 0.0
+        for i in range(len(prices)):
+            price = prices[i]
+            if (price > limit) if order.is_buy else (price < limit):
+                break
+            take = sizes[i] if sizes[i] < remaining else remaining
+            if take <= 0:
+                continue
+            sizes[i] -= take
+            cost += take * price
+            remaining -= take
+            if remaining <= 1e-12:
+                break
+
+        filled = size - remaining
+        if filled <= 1e-12:
+            self.unfilled += 1
+            return 0.0, 0.0
+        if remaining > 1e-12:
+            self.partial_fills += 1
+        avg_px = cost / filled
+        self._fill(order, filled, avg_px)
+        return filled, avg_px
+
+    def _fill(self, order: SimOrder, size: float, price: float):
+        coin = order.coin
+        position = self.positions.get(coin)
+        if position is None:
+            position = self.positions[coin] = SimPosition()
+        start = position.size
+        signed = size if order.is_buy else -size
+        fee = size * price * self.taker_fee
+        closed_pnl = 0.0
+
+        if start == 0 or (start > 0) == order.is_buy:
+            position.entry_price = (position.entry_price * abs(start) + price * size) / (abs(start) + size)
+            direction = "Open Long" if order.is_buy else "Open Short"
+        else:
+            closing = min(size, abs(start))
+            closed_pnl = (price - position.entry_price) * closing * (1 if start > 0 else -1)
+            direction = "Close Long" if start > 0 else "Close Short"
+            if size > abs(start):
+                position.entry_price = price  # Flipped
+                direction = "Long > Short" if start > 0 else "Short > Long"
+        position.size = start + signed
+        if abs(position.size) < 1e-12:
+            position.size = 0.0
+            position.entry_price = 0.0
+
+        self.balance += closed_pnl - fee
+        self.fees_paid += fee
+        self.volume += size * price
+        self.fills += 1
+        if self.on_fill is not None:
+            self.on_fill({
+                'coin': coin, 'px': str(price), 'sz': str(size), 'side': 'B' if order.is_buy else 'A',
+                'time': int(self.now * 1000), 'startPosition': str(start), 'dir': direction,
+                'closedPnl': str(closed_pnl), 'hash': '', 'oid': order.oid, 'crossed': True,
+                'fee': str(fee), 'tid': next(self._tids), 'feeToken': 'USDC', 'cloid': order.cloid,
+            })
+
+    def _check_triggers(self, coin: str, mark: float):
+        for order in list(self.triggers[coin].values()):
+            # Closing-side stop fires on the way against the position, take-profit on the way with it
+            above = mark >= order.trigger_px
+            fires = above if (order.tpsl == 'tp') != order.is_buy else not above
+            if fires:
+                self._remove_trigger(order)
+                self.triggered += 1
+                self._execute(order)
+
+    def _remove_trigger(self, order: SimOrder):
+        orders = self.triggers.get(order.coin)
+        if orders is not None:
+            orders.pop(order.oid, None)
+            if not orders:
+                del self.triggers[order.coin]
+        if order.cloid is not None:
+            self._by_cloid.pop(order.cloid, None)
+
+    def _add_trigger(self, order: SimOrder):
+        self.triggers.setdefault(order.coin, {})[order.oid] = order
+        if order.cloid is not None:
+            self._by_cloid[order.cloid] = order
+
+    # === BACKTEST API ===
+
+    def submit(self, coin: str, is_buy: bool, size: float, limit_px: Optional[float] = None,
+               reduce_only: bool = False, slippage: float = 0.05, cloid=None) -> int:
+        """Queue an IOC order arriving `latency` from now (book time); fills arrive through on_fill"""
+        with self.lock:
+            if limit_px is None:
+                mid = self.mids[coin]
+                limit_px = mid * (1 + slippage) if is_buy else mid * (1 - slippage)
+            order = SimOrder(next(self._oids), coin, is_buy, size, limit_px, reduce_only, _cloid_key(cloid),
+                             arrival=self.now + self.latency)
+            if self.realtime or self.latency <= 0:
+                self._execute(order)
+            else:
+                self.pending.append(order)
+            return order.oid
+
+    # === SDK EXCHANGE INTERFACE (paper venue) ===
+
+    def _wait(self):
+        if self.realtime and self.latency > 0:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _status(order: SimOrder, filled: float, avg_px: float) -> Dict:
+        if filled <= 0:
+            return {'error': f'Order could not immediately match against any resting orders. asset={order.coin}'}
+        return {'filled': {'totalSz': str(filled), 'avgPx': str(avg_px), 'oid': order.oid}}
+
+    @staticmethod
+    def _response(statuses: List, kind: str = 'order') -> Dict:
+        return {'status': 'ok', 'response': {'type': kind, 'data': {'statuses': statuses}}}
+
+    def _ioc(self, coin: str, is_buy: bool, size: float, limit_px: float, reduce_only: bool, cloid) -> Dict:
+        order = SimOrder(next(self._oids), coin, is_buy, size, limit_px, reduce_only, _cloid_key(cloid))
+        self._advance(None)
+        return self._status(order, *self._execute(order))
+
+    def market_open(self, name: str, is_buy: bool, sz: float, px: Optional[float] = None,
+                    slippage: float = 0.05, cloid=None, builder=None) -> Dict:
+        self._wait()
+        with self.lock:
+            mid = px if px is not None else self.mids.get(name)
+            if mid is None:
+                return self._response([{'error': f'No market data for {name}'}])
+            limit = mid * (1 + slippage) if is_buy else mid * (1 - slippage)
+            return self._response([self._ioc(name, is_buy, sz, limit, False, cloid)])
+
+    def market_close(self, coin: str, sz: Optional[float] = None, px: Optional[float] = None,
+                     slippage: float = 0.05, cloid=None, builder=None) -> Optional[Dict]:
+        self._wait()
+        with self.lock:
+            position = self.positions.get(coin)
+            if position is None or position.size == 0:
+                return None  # Like the SDK: nothing to close
+            is_buy = position.size < 0
+            mid = px if px is not None else self.mids[coin]
+            limit = mid * (1 + slippage) if is_buy else mid * (1 - slippage)
+            size = abs(position.size) if sz is None else min(sz, abs(position.size))
+            return self._response([self._ioc(coin, is_buy, size, limit, True, cloid)])
+
+    def bulk_orders(self, order_requests: List[Dict], builder=None, grouping: str = "na") -> Dict:
+        """IOC limit and trigger orders; with normalTpsl the trigger children follow the parent's fill"""
+        self._wait()
+        with self.lock:
+            self._advance(None)
+            statuses = []
+            parent_fill = None
+            for i, request in enumerate(order_requests):
+                order_type = request['order_type']
+                order = SimOrder(next(self._oids), request['coin'], request['is_buy'], float(request['sz']),
+                                 float(request['limit_px']), request.get('reduce_only', False),
+                                 _cloid_key(request.get('cloid')))
+                if 'trigger' in order_type:
+                    if grouping == 'normalTpsl' and i > 0:
+                        if not parent_fill:
+                            statuses.append({'error': 'Parent order did not fill'})
+                            continue
+                        order.size = parent_fill
+                    order.trigger_px = float(order_type['trigger']['triggerPx'])
+                    order.tpsl = order_type['trigger']['tpsl']
+                    order.reduce_only = True
+                    self._add_trigger(order)
+                    statuses.append('waitingForTrigger')
+                elif order_type.get('limit', {}).get('tif') == 'Ioc':
+                    filled, avg_px = self._execute(order)
+                    parent_fill = filled if i == 0 else parent_fill
+                    statuses.append(self._status(order, filled, avg_px))
+                else:
+                    statuses.append({'error': 'Simulator only matches IOC and trigger orders'})
+            return self._response(statuses)
+
+    def cancel(self, name: str, oid: int) -> Dict:
+        self._wait()
+        with self.lock:
+            order = self.triggers.get(name, {}).get(oid)
+            if order is None:
+                return self._response([{'error': 'Order was never placed, already canceled, or filled.'}], 'cancel')
+            self._remove_trigger(order)
+            return self._response(['success'], 'cancel')
+
+    def bulk_cancel_by_cloid(self, cancel_requests: List[Dict]) -> Dict:
+        self._wait()
+        with self.lock:
+            statuses = []
+            for request in cancel_requests:
+                order = self._by_cloid.get(_cloid_key(request['cloid']))
+                if order is None:
+                    statuses.append({'error': 'Order was never placed, already canceled, or filled.'})
+                else:
+                    self._remove_trigger(order)
+                    statuses.append('success')
+            return self._response(statuses, 'cancel')
+
+    def bulk_modify_orders_new(self, modify_requests: List[Dict]) -> Dict:
+        self._wait()
+        with self.lock:
+            statuses = []
+            for request in modify_requests:
+                order = self._by_cloid.get(_cloid_key(request['oid']))
+                if order is None and isinstance(request['oid'], int):
+                    order = next((o for orders in self.triggers.values() for o in orders.values()
+                                  if o.oid == request['oid']), None)
+                if order is None:
+                    statuses.append({'error': 'Cannot modify canceled or filled order'})
+                    continue
+                new = request['order']
+                order.size = float(new['sz'])
+                order.limit_px = float(new['limit_px'])
+                if 'trigger' in new['order_type']:
+                    order.trigger_px = float(new['order_type']['trigger']['triggerPx'])
+                statuses.append('success')
+            return self._response(statuses)
+
+    # === ACCOUNT (Info reads) ===
+
+    def user_state(self, address: str = None) -> Dict:
+        with self.lock:
+            unrealized = 0.0
+            notional = 0.0
+            asset_positions = []
+            for coin, position in self.positions.items():
+                if not position.size:
+                    continue
+                mark = self.mids.get(coin, position.entry_price)
+                pnl = (mark - position.entry_price) * position.size
+                unrealized += pnl
+                notional += abs(position.size) * mark
+                asset_positions.append({'type': 'oneWay', 'position': {
+                    'coin': coin, 'szi': str(position.size), 'entryPx': str(position.entry_price),
+                    'positionValue': str(abs(position.size) * mark), 'unrealizedPnl': str(pnl)}})
+            account_value = self.balance + unrealized
+            return {
+                'marginSummary': {'accountValue': str(account_value), 'totalNtlPos': str(notional)},
+                'withdrawable': str(max(account_value, 0.0)),
+                'assetPositions': asset_positions,
+            }
+
+    def open_orders(self, address: str = None) -> List[Dict]:
+        with self.lock:
+            return [{'coin': order.coin, 'side': 'B' if order.is_buy else 'A', 'limitPx': str(order.limit_px),
+                     'sz': str(order.size), 'oid': order.oid, 'timestamp': int(self.now * 1000),
+                     'triggerPx': str(order.trigger_px), 'cloid': order.cloid}
+                    for orders in self.triggers.values() for order in orders.values()]
+
+    def get_metrics(self) -> Dict:
+        account = self.user_state()
+        return {
+            'account_value': float(account['marginSummary']['accountValue']),
+            'balance': self.balance,
+            'orders': self.orders,
+            'fills': self.fills,
+            'partial_fills': self.partial_fills,
+            'unfilled': self.unfilled,
+            'triggered': self.triggered,
+            'volume': self.volume,
+            'fees_paid': self.fees_paid,
+            'funding_paid': self.funding_paid,
+        }
+
+
+class PaperInfo:
+    """Real Info for market data; account reads (user_state, open_orders) from the simulated venue"""
+
+    def __init__(self, info, venue: SimulatedExchange):
+        self._info = info
+        self.venue = venue
+
+    def user_state(self, address: str) -> Dict:
+        return self.venue.user_state(address)
+
+    def open_orders(self, address: str) -> List[Dict]:
+        return self.venue.open_orders(address)
+
+    def __getattr__(self, name):
+        return getattr(self._info, name)
@@ -0,0 +1,60 @@
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Wall-clock breakdown from module import to the first live tick.
+
+    mark(phase) books the time since the previous mark under `phase`
+    (repeated phases accumulate, e.g. one session per fleet bot); finish()
+    logs the report once. Phases listed in `attended` (prompts) are shown
+    but left out of the unattended total - that is the restart budget.
+    """
+
+    def __init__(self, attended=("configure",)):
+        self.started = time.perf_counter()
+        self.attended = attended
+        self.phases: Dict[str, float] = {}
+        self._last = self.started
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def mark(self, phase: str):
+        if self.finished:
+            return
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def finish(self, phase: str = "first tick"):
+        if self.finished:
+            return
+        self.mark(phase)
+        self.finished_at = self._last
+        logger.info("⏱️ Startup: %s", self.report())
+
+    def unattended_seconds(self) -> float:
+        return sum(seconds for phase, seconds in self.phases.items() if phase not in self.attended)
+
+    def report(self) -> str:
+        total = sum(self.phases.values())
+        parts = [f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases.items()]
+        return f"{' | '.join(parts)} | total {total:.2f}s ({self.unattended_seconds():.2f}s unattended)"
+
+    def get_metrics(self) -> Dict:
+        return {
+            'phases_ms': {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()},
+            'unattended_s': self.unattended_seconds(),
+            'finished': self.finished,
+        }
+
+
+# Process-wide: started when the bot module is first imported
+STARTUP = StartupTimer()
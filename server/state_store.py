@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import os
+import pickle
+import time
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = 'HLBOT-STATE'
+SNAPSHOT_VERSION = 1
+
+
+def atomic_write(path: str, payload: bytes):
+    """Write-then-rename so a crash mid-write never leaves a torn file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class StateSnapshotStore:
+    """
+    Incremental, crash-safe binary snapshots of bot state.
+
+    State is split into named sections (positions, counters, one history
+    section per symbol, ...). Each section lives in its own pickle file and is
+    only rewritten when its fingerprint changed since the last save, so a
+    steady-state save touches a handful of small files. Pickling and disk I/O
+    run on a worker thread; the event loop only pays for collecting the
+    section data and fingerprints. Files of sections missing from a save
+    (a removed symbol, a section that became empty) are deleted.
+    """
+
+    def __init__(self, directory: str = 'bot_state'):
+        self.directory = directory
+        self._fingerprints: Dict[str, Any] = {}
+        self._saved_names: Optional[Set[str]] = None
+        self._save_lock = asyncio.Lock()
+
+        # Metrics
+        self.saves = 0
+        self.sections_written = 0
+        self.last_save_duration = 0.0
+        self.last_save_time: Optional[float] = None
+
+    def _section_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.pkl")
+
+    def _write_sections(self, sections: Dict[str, Any], keep: Optional[Set[str]] = None):
+        os.makedirs(self.directory, exist_ok=True)
+        if keep is not None:
+            for filename in os.listdir(self.directory):
+                if filename.endswith('.pkl') and filename[:-len('.pkl')] not in keep:
+                    os.remove(os.path.join(self.directory, filename))
+        for name, data in sections.items():
+            payload = pickle.dumps({
+                'magic': SNAPSHOT_MAGIC,
+                'version': SNAPSHOT_VERSION,
+                'written_at': time.time(),
+                'data': data
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+            atomic_write(self._section_path(name), payload)
+
+    async def save(self, sections: Dict[str, tuple]):
+        """
+        Persist changed sections.
+
+        `sections` maps name -> (fingerprint, data). Sections whose fingerprint
+        matches the last save are skipped without being serialized; sections
+        left out are removed from disk.
+        """
+        async with self._save_lock:
+            started = time.perf_counter()
+            dirty = {name: data for name, (fingerprint, data) in sections.items()
+                     if self._fingerprints.get(name) != fingerprint}
+            names = set(sections)
+            # The directory is only rescanned for leftovers when the section set changes
+            keep = names if names != self._saved_names else None
+            if dirty or keep is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self._write_sections, dirty, keep)
+                self._saved_names = names
+            self._fingerprints = {name: fingerprint for name, fingerprint in self._fingerprints.items()
+                                  if name in sections}
+            for name in dirty:
+                self._fingerprints[name] = sections[name][0]
+            self.saves += 1
+            self.sections_written += len(dirty)
+            self.last_save_duration = time.perf_counter() - started
+            self.last_save_time = time.time()
+
+    def load(self) -> Dict[str, Any]:
+        """Read every readable section; corrupt or foreign files are skipped"""
+        sections = {}
+        if not os.path.isdir(self.directory):
+            return sections
+
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.pkl'):
+                continue
+            name = filename[:-len('.pkl')]
+            try:
+                with open(self._section_path(name), 'rb') as f:
+                    record = pickle.load(f)
+                if record.get('magic') != SNAPSHOT_MAGIC or record.get('version') != SNAPSHOT_VERSION:
+                    logger.warning("Skipping incompatible snapshot section %s", name)
+                    continue
+                sections[name] = record['data']
+            except Exception as e:
+                logger.warning("Could not read snapshot section %s: %s", name, e)
+        return sections
+
+    def get_metrics(self) -> Dict:
+        return {
+            'saves': self.saves,
+            'sections_written': self.sections_written,
+            'last_save_ms': round(self.last_save_duration * 1000, 2),
+            'last_save_age': round(time.time() - self.last_save_time, 1) if self.last_save_time else None,
+        }
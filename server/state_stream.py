@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, Set
+
+from background import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def diff_state(old: Dict, new: Dict) -> Dict:
+    """Nested changes from `old` to `new`; removed keys map to None"""
+    delta = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_state(previous, value)
+            if nested:
+                delta[key] = nested
+        elif value != previous:
+            delta[key] = value
+    for key in old.keys() - new.keys():
+        delta[key] = None
+    return delta
+
+
+class StateStream:
+    """
+    Local websocket feed of the bot's state for dashboards (127.0.0.1 only).
+
+    Frames are JSON text:
+        {"type": "snapshot", "seq": n, "t": ts, "data": {...}}   on connect
+        {"type": "delta", "seq": n, "t": ts, "data": {...}}      then changes only
+    A delta is merged into the state recursively; null deletes the key.
+    Deltas are numbered consecutively - a gap means reconnect for a snapshot.
+
+    One publisher task does all the work at most `max_fps` times a second:
+    collect() the state, diff it against the last frame, serialize once and
+    broadcast the same bytes to every client (new clients get the snapshot
+    in the same pass, so nothing is sent out of order). The trading code is
+    not involved, and with no clients attached nothing is collected. Clients
+    that stop reading are dropped once `max_buffer` bytes queue up.
+    """
+
+    def __init__(self, collect: Callable[[], Dict], port: int = 8766, max_fps: float = 10.0,
+                 max_buffer: int = 1 << 20):
+        self.collect = collect
+        self.port = port
+        self.max_fps = max_fps
+        self.max_buffer = max_buffer
+        self.state: Dict = {}
+        self.seq = 0
+        self.clients: Set = set()
+        self._joining: Set = set()
+        self._wake = asyncio.Event()
+        self.server = None
+        self.is_running = False
+        self.background = BackgroundTasks()
+
+        # Metrics
+        self.frames = 0
+        self.bytes_sent = 0
+        self.last_frame_bytes = 0
+        self.last_frame_ms = 0.0
+        self.max_frame_ms = 0.0
+        self.connects = 0
+        self.slow_clients_dropped = 0
+
+    async def start(self):
+        import websockets  # Loaded only when a stream port is configured
+        self.server = await websockets.serve(self._handle, "127.0.0.1", self.port, compression=None)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info("📡 State stream on ws://127.0.0.1:%s (max %.0f fps)", self.port, self.max_fps)
+
+    def close(self):
+        self.is_running = False
+        self._wake.set()
+        if self.server:
+            self.server.close()
+
+    async def _handle(self, connection):
+        self.connects += 1
+        self._joining.add(connection)
+        self._wake.set()
+        try:
+            await connection.wait_closed()
+        finally:
+            self._joining.discard(connection)
+            self.clients.discard(connection)
+
+    def _frame(self, kind: str, data: Dict) -> str:
+        return json.dumps({"type": kind, "seq": self.seq, "t": round(time.time(), 3), "data": data},
+                          separators=(',', ':'))
+
+    def publish(self):
+        """One frame: diff, serialize once, fan out (snapshots for new clients)"""
+        import websockets
+        started = time.perf_counter()
+        state = self.collect()
+        delta = diff_state(self.state, state)
+        self.state = state
+        sent = 0
+        if delta:
+            self.seq += 1
+            if self.clients:
+                message = self._frame("delta", delta)
+                websockets.broadcast(self.clients, message)
+                sent += len(message) * len(self.clients)
+        if self._joining:
+            message = self._frame("snapshot", state)
+            websockets.broadcast(self._joining, message)
+            sent += len(message) * len(self._joining)
+            self.clients |= self._joining
+            self._joining.clear()
+
+        for connection in list(self.clients):
+            transport = connection.transport
+            if transport is not None and transport.get_write_buffer_size() > self.max_buffer:
+                self.clients.discard(connection)
+                self.slow_clients_dropped += 1
+                self.background.spawn(connection.close(1008, "too slow"), name="stream-drop-slow-client")
+                logger.warning("📡 Dropped a state stream client that stopped reading")
+
+        self.frames += 1
+        self.bytes_sent += sent
+        self.last_frame_bytes = sent
+        self.last_frame_ms = (time.perf_counter() - started) * 1000
+        self.max_frame_ms = max(self.max_frame_ms, self.last_frame_ms)
+
+    async def run(self):
+        self.is_running = True
+        interval = 1.0 / self.max_fps
+        while self.is_running:
+            if not self.clients and not self._joining:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error("State stream frame failed: %s", e)
+            await asyncio.sleep(interval)
+
+    def get_metrics(self) -> Dict:
+        return {
+            'clients': len(self.clients),
+            'connects': self.connects,
+            'frames': self.frames,
+            'seq': self.seq,
+            'bytes_sent': self.bytes_sent,
+            'last_frame_bytes': self.last_frame_bytes,
+            'last_frame_ms': round(self.last_frame_ms, 3),
+            'max_frame_ms': round(self.max_frame_ms, 3),
+            'slow_clients_dropped': self.slow_clients_dropped,
+        }
@@ -0,0 +1,25 @@
+import asyncio
+import logging
+
+from background import BackgroundTasks
+
+
+def test_spawned_tasks_are_held_until_done_and_failures_logged(caplog):
+    async def boom():
+        await asyncio.sleep(0)
+        raise RuntimeError("exchange said no")
+
+    async def scenario():
+        background = BackgroundTasks()
+        background.spawn(asyncio.sleep(0), name="ok")
+        background.spawn(boom(), name="cancel-sltp-BTC")
+        assert len(background) == 2
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return background
+
+    with caplog.at_level(logging.ERROR, logger="background"):
+        background = asyncio.run(scenario())
+    assert len(background) == 0
+    assert background.get_metrics() == {'pending': 0, 'spawned': 2, 'failed': 1}
+    assert "cancel-sltp-BTC" in caplog.text and "exchange said no" in caplog.text
@@ -0,0 +1,22 @@
+from batch_scheduler import AdaptiveBatchScheduler
+
+
+def test_move_flushes_once_per_move():
+    scheduler = AdaptiveBatchScheduler(latency_target=10.0, max_batch=20, move_threshold=0.002)
+    scheduler.on_tick('BTC', 100.0, now=0.0)
+    scheduler.on_flush('BTC', 100.0, now=0.0)
+    assert scheduler.on_tick('BTC', 100.3, now=0.1) == 'move'
+    scheduler.on_flush('BTC', 100.3, now=0.1)
+    # Still well past the first flush price, but not past the new reference
+    assert scheduler.on_tick('BTC', 100.35, now=0.2) is None
+    assert scheduler.move_flushes == 1
+
+
+def test_near_stop_flushes_every_tick_without_a_move():
+    scheduler = AdaptiveBatchScheduler(latency_target=10.0, max_batch=20)
+    scheduler.on_tick('BTC', 100.0, now=0.0)
+    scheduler.on_flush('BTC', 100.0, now=0.0)
+    for i in range(1, 4):
+        assert scheduler.on_tick('BTC', 100.0, now=i * 0.1, urgent=True) == 'urgent'
+        scheduler.on_flush('BTC', 100.0, now=i * 0.1)
+    assert scheduler.urgent_flushes == 3 and scheduler.move_flushes == 0
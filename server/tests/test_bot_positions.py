@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime
+
+from bot_hyperliquid import HyperliquidAdvancedBot, Position
+
+
+def filled(size, price):
+    return {'status': 'ok', 'response': {'type': 'order', 'data': {
+        'statuses': [{'filled': {'oid': 7, 'avgPx': str(price), 'totalSz': str(size)}}]}}}
+
+
+def close_fill(size, price, start, tid):
+    return {'coin': 'BTC', 'px': str(price), 'sz': str(size), 'side': 'A', 'dir': 'Close Long',
+            'startPosition': str(start), 'fee': '0', 'closedPnl': '0', 'oid': 7, 'tid': tid, 'time': 0}
+
+
+class FillFirstRest:
+    """market_close whose userFills frames are applied before the REST reply returns"""
+
+    def __init__(self, bot, fills, reply):
+        self.bot = bot
+        self.fills = fills
+        self.reply = reply
+        self.requested = None
+
+    async def market_close(self, symbol, size):
+        self.requested = size
+        await self.bot.process_user_fills({'fills': self.fills})
+        return self.reply
+
+
+def make_bot(size=1.0):
+    bot = HyperliquidAdvancedBot()
+    bot.fill_tracking_enabled = True
+    bot.fill_tracker.set_position('BTC', size, 100.0)
+    bot.current_positions['BTC'] = Position(symbol='BTC', side='long', size=size, entry_price=100.0,
+                                            current_price=100.0, unrealized_pnl=0.0, timestamp=datetime.now())
+    bot.order_states.mark_open('BTC')
+    bot.protective_orders['BTC'] = {'sl': {'cloid': '0x' + '1' * 32, 'size': size}}
+    bot.amended, bot.cancelled = [], []
+
+    async def amend(symbol, size):
+        bot.amended.append((symbol, size))
+        for spec in bot.protective_orders[symbol].values():
+            spec['size'] = size
+
+    async def cancel(symbol):
+        bot.cancelled.append(symbol)
+        bot.protective_orders.pop(symbol, None)
+
+    bot.amend_protective_orders = amend
+    bot.cancel_protective_orders = cancel
+    return bot
+
+
+async def settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_partial_close_fill_before_reply_keeps_remainder():
+    async def scenario():
+        bot = make_bot(1.0)
+        bot.rest = FillFirstRest(bot, [close_fill(0.4, 101.0, 1.0, 1)], filled(0.4, 101.0))
+        await bot.close_position('BTC', bot.current_positions['BTC'], "test")
+        await settle()
+        return bot
+
+    bot = asyncio.run(scenario())
+    assert bot.rest.requested == 1.0
+    assert bot.current_positions['BTC'].size == 0.6
+    assert bot.cancelled == []
+    assert bot.amended == [('BTC', 0.6)]  # Once, from the fill - not shrunk again by the reply
+    assert bot.order_states.phase('BTC') == 'open'
+
+
+def test_full_close_fill_before_reply_drops_position():
+    async def scenario():
+        bot = make_bot(1.0)
+        bot.rest = FillFirstRest(bot, [close_fill(1.0, 101.0, 1.0, 2)], filled(1.0, 101.0))
+        await bot.close_position('BTC', bot.current_positions['BTC'], "test")
+        await settle()
+        return bot
+
+    bot = asyncio.run(scenario())
+    assert 'BTC' not in bot.current_positions
+    assert 'BTC' in bot.cancelled
+    assert bot.amended == []
+
+
+def test_near_stop_checks_exits_every_tick_but_does_not_reevaluate():
+    from bot_hyperliquid import MarketData
+
+    async def scenario():
+        bot = make_bot(1.0)
+        bot.stop_loss_pct = 0.02
+        bot.data_collection_complete = True
+        evaluated, exit_checks = [], []
+
+        async def analyze(symbol):
+            evaluated.append(symbol)
+
+        async def check_exit(symbol, position):
+            exit_checks.append(position.current_price)
+
+        bot.analyze_and_trade = analyze
+        bot.check_position_exit = check_exit
+        for price in (98.4, 98.41, 98.4, 98.42):  # 1.6% down, stop at 2%
+            await bot.on_market_data(MarketData(symbol='BTC', price=price, timestamp=datetime.now(), volume=1.0,
+                                                bid=price, ask=price, spread=0.0))
+        return bot, evaluated, exit_checks
+
+    bot, evaluated, exit_checks = asyncio.run(scenario())
+    assert exit_checks == [98.4, 98.41, 98.4, 98.42]
+    assert evaluated == []
+    assert bot.current_positions['BTC'].current_price == 98.42
+
+
+def test_fine_bars_do_not_evict_the_pending_strategy_bar():
+    from bar_aggregator import Bar
+    from bot_hyperliquid import MarketData
+
+    async def scenario():
+        bot = HyperliquidAdvancedBot()
+        tick = MarketData(symbol='BTC', price=100.0, timestamp=datetime.now(), volume=1.0,
+                          bid=100.0, ask=100.0, spread=0.0)
+        bot.deliver_market_data(tick, [Bar('BTC', '1m', 0.0, 99.0, 101.0, 98.0, 100.0)])
+        for second in range(1, 2 * bot.max_pending_bars):
+            bot.deliver_market_data(tick, [Bar('BTC', '1s', float(second), 100.0, 100.0, 100.0, 100.0),
+                                           Bar('BTC', '5s', float(second), 100.0, 100.0, 100.0, 100.0)])
+        return await bot.strategy_slots.take()
+
+    symbol, (tick, bars) = asyncio.run(scenario())
+    assert symbol == 'BTC' and [(bar.timeframe, bar.close) for bar in bars] == [('1m', 100.0)]
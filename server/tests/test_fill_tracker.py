@@ -0,0 +1,79 @@
+from fill_tracker import FillTracker, parse_order_status
+
+
+def fill(side, size, price, tid, start=None, fee=0.0, closed_pnl=0.0, coin='BTC'):
+    data = {'coin': coin, 'side': side, 'sz': str(size), 'px': str(price), 'tid': tid, 'fee': str(fee),
+            'closedPnl': str(closed_pnl)}
+    if start is not None:
+        data['startPosition'] = str(start)
+    return data
+
+
+def test_adds_vwap_the_entry():
+    tracker = FillTracker()
+    tracker.apply_fill(fill('B', 1.0, 100.0, 1))
+    update = tracker.apply_fill(fill('B', 3.0, 104.0, 2))
+    assert update.size == 4.0
+    assert update.entry_price == 103.0
+    assert update.closed is None
+
+
+def test_partial_reduce_keeps_entry():
+    tracker = FillTracker()
+    tracker.apply_fill(fill('B', 2.0, 100.0, 1))
+    update = tracker.apply_fill(fill('A', 0.5, 110.0, 2, closed_pnl=5.0))
+    assert update.size == 1.5 and update.entry_price == 100.0 and update.closed is None
+    assert tracker.positions['BTC'].realized_pnl == 5.0
+
+
+def test_flat_close_reports_the_finished_lifecycle():
+    tracker = FillTracker()
+    tracker.apply_fill(fill('B', 1.0, 100.0, 1, fee=0.1))
+    update = tracker.apply_fill(fill('A', 1.0, 110.0, 2, fee=0.1, closed_pnl=10.0))
+    assert update.size == 0.0 and update.entry_price == 0.0
+    assert update.closed.size == 1.0 and update.closed.entry_price == 100.0
+    assert update.closed.realized_pnl == 10.0 and abs(update.closed.fees - 0.2) < 1e-12
+    assert tracker.positions['BTC'].realized_pnl == 0.0 and tracker.positions['BTC'].fees == 0.0
+
+
+def test_flip_closes_the_old_side_and_opens_at_the_fill_price():
+    tracker = FillTracker()
+    tracker.apply_fill(fill('B', 1.0, 100.0, 1))
+    update = tracker.apply_fill(fill('A', 3.0, 95.0, 2, closed_pnl=-5.0))
+    assert update.size == -2.0 and update.entry_price == 95.0
+    assert update.closed.size == 1.0 and update.closed.realized_pnl == -5.0
+
+
+def test_duplicate_tid_is_ignored():
+    tracker = FillTracker()
+    assert tracker.apply_fill(fill('B', 1.0, 100.0, 7)) is not None
+    assert tracker.apply_fill(fill('B', 1.0, 100.0, 7)) is None
+    assert tracker.positions['BTC'].size == 1.0
+    assert tracker.duplicate_fills == 1
+
+
+def test_snapshot_fills_are_marked_seen_not_applied():
+    tracker = FillTracker()
+    tracker.mark_seen([fill('B', 1.0, 100.0, 9)])
+    assert tracker.apply_fill(fill('B', 1.0, 100.0, 9)) is None
+    assert 'BTC' not in tracker.positions
+
+
+def test_start_position_resyncs_a_missed_fill():
+    tracker = FillTracker()
+    tracker.set_position('BTC', 1.0, 100.0)
+    # We missed a 1.0 buy; the exchange says this fill started from 2.0
+    update = tracker.apply_fill(fill('A', 0.5, 105.0, 3, start=2.0))
+    assert update.size == 1.5
+    assert tracker.resyncs == 1
+
+
+def test_parse_order_status():
+    filled = parse_order_status({'status': 'ok', 'response': {'type': 'order', 'data': {
+        'statuses': [{'filled': {'totalSz': '0.4', 'avgPx': '101.5', 'oid': 11}}]}}})
+    assert filled['filled'] and filled['total_sz'] == 0.4 and filled['avg_px'] == 101.5 and filled['oid'] == 11
+    resting = parse_order_status({'status': 'ok', 'response': {'data': {'statuses': [{'resting': {'oid': 12}}]}}})
+    assert resting['resting'] and resting['oid'] == 12 and not resting['filled']
+    rejected = parse_order_status({'status': 'ok', 'response': {'data': {'statuses': [{'error': 'margin'}]}}})
+    assert rejected['error'] == 'margin'
+    assert parse_order_status({'status': 'err', 'response': 'bad'})['error']
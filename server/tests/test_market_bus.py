@@ -0,0 +1,28 @@
+from bot_hyperliquid import HyperliquidAdvancedBot
+from latency_harness import HARNESS_PRIVATE_KEY, LocalExchange, LocalInfo, SyntheticMarket
+from market_bus import MarketDataBus
+
+
+def configured(paper: bool) -> HyperliquidAdvancedBot:
+    bot = HyperliquidAdvancedBot()
+    info = LocalInfo(SyntheticMarket(['BTC'], seed=1), latency=0)
+    bot.configure_from_dict({'private_key': HARNESS_PRIVATE_KEY, 'symbols': ['BTC'], 'paper_trading': paper,
+                             'stop_loss_pct': 0.02, 'take_profit_target': 5, 'trading_strategy': 'momentum',
+                             'position_size_pct': 5, 'max_positions': 2},
+                            info=info, exchange=None if paper else LocalExchange(info, server=None, latency=0))
+    return bot
+
+
+def test_paper_bot_does_not_subscribe_to_the_account_fill_stream():
+    bus = MarketDataBus("ws://unused")
+    live, paper = configured(False), configured(True)
+    bus.attach(live)
+    bus.attach(paper)
+    assert paper in bus.bots
+    assert bus._accounts == {live.wallet.address.lower(): [live]}
+
+
+def test_paper_only_fleet_subscribes_to_market_data_only():
+    bus = MarketDataBus("ws://unused")
+    bus.attach(configured(True))
+    assert bus.subscriptions() == [{"method": "subscribe", "subscription": {"type": "allMids"}}]
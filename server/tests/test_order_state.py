@@ -0,0 +1,59 @@
+from order_state import CLOSED, CLOSING, IDLE, OPEN, OPENING, OrderStateMachine
+
+
+def test_lifecycle():
+    states = OrderStateMachine()
+    assert states.phase('BTC') == IDLE
+    assert states.begin_open('BTC') and states.phase('BTC') == OPENING
+    states.mark_open('BTC')
+    assert states.begin_close('BTC') and states.phase('BTC') == CLOSING
+    states.mark_closed('BTC')
+    assert states.phase('BTC') == CLOSED
+    assert states.begin_open('BTC')
+
+
+def test_racing_intents_are_rejected():
+    states = OrderStateMachine()
+    assert states.begin_open('BTC')
+    assert not states.begin_open('BTC')
+    assert not states.begin_close('BTC')
+    states.mark_open('BTC')
+    assert states.begin_close('BTC')
+    assert not states.begin_close('BTC')
+    assert states.rejected == {'open': 1, 'close': 2}
+
+
+def test_aborts_return_to_the_settled_phase():
+    states = OrderStateMachine()
+    states.begin_open('BTC')
+    states.abort_open('BTC')
+    assert states.phase('BTC') == IDLE
+    states.begin_open('BTC')
+    states.mark_open('BTC')
+    states.abort_open('BTC')  # No-op once open
+    assert states.phase('BTC') == OPEN
+    states.begin_close('BTC')
+    states.abort_close('BTC')  # Close left (part of) the position
+    assert states.phase('BTC') == OPEN
+
+
+def test_sync_never_overrides_an_in_flight_order():
+    states = OrderStateMachine()
+    states.begin_open('BTC')
+    states.sync('BTC', 1.0)  # Entry fill lands before the REST reply
+    assert states.phase('BTC') == OPENING
+    states.mark_open('BTC')
+    states.begin_close('BTC')
+    states.sync('BTC', 0.0)
+    assert states.phase('BTC') == CLOSING
+    assert states.count(*(OPENING, CLOSING)) == 1
+
+
+def test_sync_settles_idle_symbols():
+    states = OrderStateMachine()
+    states.sync('ETH', -2.0)  # Adopted at reconciliation
+    assert states.phase('ETH') == OPEN
+    states.sync('ETH', 0.0)  # Exchange-side stop fired
+    assert states.phase('ETH') == CLOSED
+    states.sync('SOL', 0.0)
+    assert states.phase('SOL') == IDLE
@@ -0,0 +1,32 @@
+import numpy as np
+
+from portfolio_risk import EWCovariance
+
+
+def warmed(symbols, ticks=40, seed=1):
+    rng = np.random.default_rng(seed)
+    covariance = EWCovariance(sample_interval=5.0, min_samples=10)
+    prices = {symbol: 100.0 for symbol in symbols}
+    for step in range(ticks):
+        for symbol in symbols:
+            prices[symbol] *= float(np.exp(rng.normal(0, 0.001)))
+            covariance.observe(symbol, prices[symbol], step * 5.0)
+    return covariance
+
+
+def test_check_does_not_allocate_a_slot_for_the_candidate():
+    covariance = warmed(['BTC', 'ETH'])
+    risk = covariance.portfolio_check({'BTC': 1000.0}, 'DOGE', 500.0)
+    assert 'DOGE' not in covariance.index and covariance.symbols == ['BTC', 'ETH']
+    assert risk['var_after'] > risk['var_before'] > 0
+    assert risk['correlated_notional'] == 500.0  # Unknown symbol: uncorrelated with the book
+
+
+def test_forget_frees_the_slot_and_keeps_the_rest():
+    covariance = warmed(['BTC', 'ETH', 'SOL'])
+    before = covariance.matrix()
+    covariance.forget('ETH')
+    assert covariance.symbols == ['BTC', 'SOL'] and covariance.index == {'BTC': 0, 'SOL': 1}
+    assert np.allclose(covariance.matrix(), before[np.ix_([0, 2], [0, 2])])
+    covariance.observe('ETH', 100.0, 1000.0)
+    assert covariance.index['ETH'] == 2 and covariance.matrix()[2, 2] == 0.0
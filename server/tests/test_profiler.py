@@ -0,0 +1,27 @@
+import asyncio
+import threading
+
+from profiler import ProfilingControl
+
+
+def test_alloc_snapshot_runs_off_the_event_loop(tmp_path):
+    census_threads, snapshot_threads = [], []
+
+    def census():
+        census_threads.append(threading.get_ident())
+        return {'history': {'points': 10}}
+
+    async def scenario():
+        control = ProfilingControl(census, out_dir=str(tmp_path))
+        snapshot = control.allocations.snapshot
+        control.allocations.snapshot = lambda *args: snapshot_threads.append(threading.get_ident()) or snapshot(*args)
+        first, second = await asyncio.gather(control.execute("alloc"), control.execute("alloc"))
+        stopped = await control.execute("alloc stop")
+        return threading.get_ident(), first, second, stopped
+
+    loop_thread, first, second, stopped = asyncio.run(scenario())
+    assert "baseline" in first and second == "allocation snapshot already running"
+    assert stopped == "tracemalloc stopped"
+    assert census_threads == [loop_thread]
+    assert len(snapshot_threads) == 1 and snapshot_threads[0] != loop_thread
+    assert len(list(tmp_path.iterdir())) == 1
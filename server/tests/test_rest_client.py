@@ -0,0 +1,27 @@
+import asyncio
+
+from rest_client import HyperliquidRestClient
+
+
+class StubInfo:
+    def all_mids(self):
+        return {'BTC': '100'}
+
+
+def test_fleet_client_close_keeps_shared_pool():
+    async def scenario():
+        shared = HyperliquidRestClient(StubInfo())
+        first = shared.for_exchange(object())
+        second = shared.for_exchange(object())
+        await first.all_mids()
+        first.close()
+        mids = await second.all_mids()  # Pool still running for the rest of the fleet
+        shared.close()
+        return shared, first, second, mids
+
+    shared, first, second, mids = asyncio.run(scenario())
+    assert mids == {'BTC': '100'}
+    assert first.pool is second.pool is shared.pool
+    assert shared.pool.peak_active == 1
+    assert second.get_metrics()['pool_peak_saturation'] == first.get_metrics()['pool_peak_saturation']
+    assert shared.pool.executor._shutdown
@@ -0,0 +1,19 @@
+import numpy as np
+
+from risk_engine import MonteCarloRiskEngine
+
+
+def test_held_symbol_without_a_covariance_slot():
+    engine = MonteCarloRiskEngine(paths=2000, seed=1)
+    cov = np.array([[4e-8, 1e-8], [1e-8, 1e-8]])
+    risk = engine.evaluate(10_000.0, {'BTC': 5_000.0, 'HYPE': 20_000.0}, 'ETH', 5_000.0, cov, ['BTC', 'ETH'])
+    assert 0.0 <= risk['size_fraction'] <= 1.0
+    # The unknown holding is simulated at the largest tracked variance, not dropped
+    alone = engine.evaluate(10_000.0, {'BTC': 5_000.0}, 'ETH', 5_000.0, cov, ['BTC', 'ETH'])
+    assert risk['expected_shortfall'] > alone['expected_shortfall']
+
+
+def test_involved_covariance_fills_missing_slots():
+    cov = np.array([[4.0, 1.0], [1.0, 2.0]])
+    sub = MonteCarloRiskEngine.involved_covariance(cov, [1, None, 0])
+    assert np.array_equal(sub, [[2.0, 0.0, 1.0], [0.0, 4.0, 0.0], [1.0, 0.0, 4.0]])
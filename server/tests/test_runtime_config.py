@@ -0,0 +1,56 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from runtime_config import ConfigWatcher, validate_runtime_config
+
+
+@pytest.mark.parametrize("config", [
+    {'max_positions': None},
+    {'max_positions': 2.5},
+    {'max_positions': True},
+    {'stop_loss_pct': None},
+    {'stop_loss_pct': "abc"},
+    {'take_profit_target': float('nan')},
+    {'symbols': 5},
+    {'symbols': ['BTC', 3]},
+    {'regime_strategies': []},
+    {'regime_strategies': {'trending': 5}},
+    {'trading_strategy': {}},
+    {'timeframe': ['1m']},
+])
+def test_wrong_types_are_value_errors(config):
+    with pytest.raises(ValueError):
+        validate_runtime_config(config)
+
+
+def test_valid_values_are_normalized():
+    settings = validate_runtime_config({'symbols': 'btc, eth', 'max_positions': 3.0, 'stop_loss_pct': "0.02"})
+    assert settings == {'symbols': ['BTC', 'ETH'], 'max_positions': 3, 'stop_loss_pct': 0.02}
+
+
+def test_watcher_survives_a_bad_edit(tmp_path):
+    path = tmp_path / "bot_config.json"
+    path.write_text(json.dumps({'max_positions': 2}))
+    applied = []
+
+    def apply(config_path):
+        if applied:
+            raise RuntimeError("apply blew up")
+        applied.append(config_path)
+        return "applied"
+
+    async def scenario():
+        watcher = ConfigWatcher(str(path), apply, interval=0.01)
+        task = asyncio.create_task(watcher.run())
+        for _ in range(2):
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+            await asyncio.sleep(0.05)
+        watcher.stop()
+        await task
+        return watcher
+
+    watcher = asyncio.run(scenario())
+    assert watcher.reloads == 1 and watcher.rejected == 1
@@ -0,0 +1,51 @@
+from sim_exchange import SimulatedExchange
+
+
+def venue(**kwargs):
+    fills = []
+    exchange = SimulatedExchange(latency=0, taker_fee=0.0, funding_rate=0.0, **kwargs)
+    exchange.on_fill = fills.append
+    exchange.update_book('BTC', bids=[(99.0, 1.0), (98.0, 1.0)], asks=[(101.0, 1.0), (102.0, 1.0)], timestamp=0.0)
+    return exchange, fills
+
+
+def status(response):
+    return response['response']['data']['statuses'][0]
+
+
+def test_ioc_sweeps_levels_up_to_the_limit_and_fills_partially():
+    exchange, fills = venue()
+    result = status(exchange.market_open('BTC', True, 3.0, px=100.0, slippage=0.015))  # Limit 101.5
+    assert result['filled']['totalSz'] == '1.0' and float(result['filled']['avgPx']) == 101.0
+    assert exchange.partial_fills == 1 and exchange.positions['BTC'].size == 1.0
+
+    result = status(exchange.market_open('BTC', True, 3.0, px=100.0, slippage=0.05))  # Limit 105
+    # The 101 level was taken until the next book update - the rest of the sweep is at 102
+    assert result['filled']['totalSz'] == '1.0' and float(result['filled']['avgPx']) == 102.0
+    assert [f['sz'] for f in fills] == ['1.0', '1.0']
+
+
+def test_sweep_averages_across_levels():
+    exchange, _ = venue()
+    result = status(exchange.market_open('BTC', False, 2.0, px=100.0, slippage=0.05))
+    assert result['filled']['totalSz'] == '2.0' and float(result['filled']['avgPx']) == 98.5
+
+
+def test_close_fill_reports_start_position_and_pnl():
+    exchange, fills = venue()
+    exchange.market_open('BTC', True, 1.0, px=100.0)
+    exchange.update_book('BTC', bids=[(110.0, 5.0)], asks=[(111.0, 5.0)], timestamp=1.0)
+    result = status(exchange.market_close('BTC'))
+    assert result['filled']['totalSz'] == '1.0'
+    assert fills[-1]['startPosition'] == '1.0' and fills[-1]['dir'] == 'Close Long'
+    assert float(fills[-1]['closedPnl']) == 9.0
+    assert exchange.positions['BTC'].size == 0.0
+    assert exchange.market_close('BTC') is None
+
+
+def test_reduce_only_never_opens():
+    exchange, fills = venue()
+    response = exchange.bulk_orders([{'coin': 'BTC', 'is_buy': False, 'sz': 1.0, 'limit_px': 90.0,
+                                      'order_type': {'limit': {'tif': 'Ioc'}}, 'reduce_only': True}])
+    assert 'error' in status(response)
+    assert fills == []
@@ -0,0 +1,35 @@
+import asyncio
+import os
+
+from state_store import StateSnapshotStore
+
+
+def test_save_load_round_trip_and_unchanged_sections_are_skipped(tmp_path):
+    store = StateSnapshotStore(str(tmp_path))
+    sections = {'counters': ((3, 1.5), {'total_trades': 3, 'total_pnl': 1.5}),
+                'positions': ((('BTC', 'long'),), [{'symbol': 'BTC', 'side': 'long'}])}
+    asyncio.run(store.save(sections))
+    assert store.load() == {'counters': {'total_trades': 3, 'total_pnl': 1.5},
+                            'positions': [{'symbol': 'BTC', 'side': 'long'}]}
+
+    sections['counters'] = ((4, 2.0), {'total_trades': 4, 'total_pnl': 2.0})
+    asyncio.run(store.save(sections))
+    assert store.sections_written == 3  # Only counters was rewritten the second time
+    assert store.load()['counters']['total_trades'] == 4
+
+
+def test_sections_left_out_of_a_save_are_deleted(tmp_path):
+    (tmp_path / 'history_BTC.pkl').write_bytes(b'left over by an older version')
+    store = StateSnapshotStore(str(tmp_path))
+    asyncio.run(store.save({'counters': (1, {'total_trades': 1}), 'signals': (1, {'ETH': {}})}))
+    assert sorted(os.listdir(tmp_path)) == ['counters.pkl', 'signals.pkl']
+
+    asyncio.run(store.save({'counters': (1, {'total_trades': 1})}))
+    assert store.load() == {'counters': {'total_trades': 1}}
+
+
+def test_corrupt_sections_are_skipped(tmp_path):
+    store = StateSnapshotStore(str(tmp_path))
+    asyncio.run(store.save({'counters': (1, {'total_trades': 1})}))
+    (tmp_path / 'positions.pkl').write_bytes(b'\x80garbage')
+    assert store.load() == {'counters': {'total_trades': 1}}
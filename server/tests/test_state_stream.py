@@ -0,0 +1,33 @@
+import copy
+import json
+
+from state_stream import diff_state
+
+
+def apply_delta(state, delta):
+    """What a dashboard client does with a delta frame: merge recursively, null deletes the key"""
+    for key, value in delta.items():
+        if value is None:
+            state.pop(key, None)
+        elif isinstance(value, dict) and isinstance(state.get(key), dict):
+            apply_delta(state[key], value)
+        else:
+            state[key] = value
+
+
+def test_delta_applied_to_the_old_state_reproduces_the_new_one():
+    old = {'bots': {'a': {'positions': {'BTC': {'size': 1.0, 'pnl': 2.0}, 'ETH': {'size': 3.0, 'pnl': -1.0}},
+                          'equity': 1000.0},
+                    'b': {'equity': 500.0}},
+           'seq': 1, 'latency': {'p50': 1.0}}
+    new = {'bots': {'a': {'positions': {'BTC': {'size': 1.0, 'pnl': 2.5}}, 'equity': 1000.0, 'paused': True},
+                    'b': {'equity': 500.0}},
+           'seq': 1, 'latency': 3.0}
+
+    delta = json.loads(json.dumps(diff_state(old, new)))  # As sent over the wire
+    assert delta == {'bots': {'a': {'positions': {'BTC': {'pnl': 2.5}, 'ETH': None}, 'paused': True}},
+                     'latency': 3.0}
+    state = copy.deepcopy(old)
+    apply_delta(state, delta)
+    assert state == new
+    assert diff_state(new, new) == {}
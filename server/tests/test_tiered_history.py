@@ -0,0 +1,74 @@
+import numpy as np
+
+from tiered_history import TieredPriceHistory, pack_closes, unpack_closes
+
+
+def test_fill_gap_replaces_the_carried_forward_stretch():
+    history = TieredPriceHistory(hot_capacity=64)
+    for t in range(0, 10):
+        history.append(float(t), 100.0)
+    # Feed drops for 20s, then resumes at a higher price
+    for t in range(30, 40):
+        history.append(float(t), 120.0)
+    flat = history.closes(1).copy()
+    assert np.all(flat[:30] == 100.0)
+
+    merged = history.fill_gap([15.0, 20.0, 25.0, 45.0], [105.0, 110.0, 115.0, 999.0])
+    closes = history.closes(1)
+    assert merged == 3  # 45s is past the newest tick and is skipped
+    assert closes[15] == 105.0 and closes[22] == 110.0 and closes[29] == 115.0
+    assert closes[30] == 120.0 and 999.0 not in closes
+
+
+def test_fill_gap_past_hot_capacity_evicts_into_the_tiers():
+    history = TieredPriceHistory(hot_capacity=16)
+    history.append(0.0, 1.0)
+    history.append(100.0, 2.0)
+    history.fill_gap(np.arange(1.0, 41.0), np.arange(1.0, 41.0) + 10)
+    history.append(101.0, 3.0)
+    closes = history.closes(1)
+    assert len(closes) == 101
+    assert closes[0] == 1.0 and closes[40] == 50.0 and closes[99] == 50.0 and closes[100] == 2.0
+    assert history._hot_times.shape == (16,)
+
+
+def naive_closes(times, prices, resolution):
+    """Reference resample: last price per bucket, empty buckets carry the previous close"""
+    closes = {}
+    for t, p in zip(times, prices):
+        closes[int(t // resolution)] = p
+    first, last = min(closes), max(closes)
+    result, previous = [], None
+    for bucket in range(first, last + 1):
+        previous = closes.get(bucket, previous)
+        result.append(previous)
+    return np.array(result)
+
+
+def test_pack_unpack_round_trip_is_bit_exact():
+    values = np.concatenate((np.cumsum(np.random.default_rng(3).normal(0, 0.5, 1000)) + 30000.0,
+                             [0.0, -0.0, 1e-300, np.inf, -np.inf, 100.0]))
+    restored = unpack_closes(pack_closes(values))
+    assert restored.view(np.int64).tolist() == values.view(np.int64).tolist()
+    assert np.isnan(unpack_closes(pack_closes(np.array([np.nan, 1.0])))[0])
+
+
+def test_closes_match_a_naive_resample_across_tiers():
+    rng = np.random.default_rng(7)
+    gaps = rng.choice([0.2, 0.7, 1.0, 3.0, 45.0], size=6000, p=[0.4, 0.3, 0.2, 0.09, 0.01])
+    times = 1_700_000_000.0 + np.cumsum(gaps)
+    prices = 100.0 + np.cumsum(rng.normal(0, 0.05, len(times)))
+    # Small tiers so the data flows through the hot buffer, both tiers and out of the last one
+    history = TieredPriceHistory(hot_capacity=256, tiers=((1, 60, 20), (60, 30, 4)))
+    for t, p in zip(times, prices):
+        history.append(t, p)
+    assert history.tiers[0].segments and history.tiers[1].segments
+
+    for resolution in (1, 5, 60):
+        # Each resolution reaches back to the oldest tier at least that fine; older data has aged out
+        earliest = min(tier.earliest_time() for tier in history.tiers if tier.resolution <= resolution)
+        expected = naive_closes(times, prices, resolution)[:-1]
+        got = history.closes(resolution)
+        assert len(got) == int(times[-1] // resolution - earliest // resolution), resolution
+        assert np.array_equal(got, expected[-len(got):]), resolution
+        assert history.closes(resolution, periods=10).tolist() == expected[-10:].tolist()
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from bot_hyperliquid import TradingSignal
+from trade_journal import TradeJournal
+
+
+def test_records_are_written_in_batches_and_queryable(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'journal' / 'trades.db'), flush_interval=0.05)
+    journal.start()
+    journal.record_signal('bot-a', TradingSignal('BTC', 'long', 0.8, 100.0, 98.0, 104.0, 0.2, 'hull'), 'trending')
+    journal.record_signal('bot-a', TradingSignal('ETH', 'short', 0.7, 50.0, 51.0, 48.0, 0.3, 'wma'))
+    journal.record_order('bot-b', 'BTC', 'open', 'buy', 0.5, 100.0,
+                         {'filled': True, 'resting': False, 'oid': 7, 'total_sz': 0.5, 'avg_px': 100.1,
+                          'error': None}, strategy='hull', latency_ms=12.5)
+    journal.record_fill('bot-b', {'coin': 'BTC', 'px': '100.1', 'sz': '0.5', 'side': 'B', 'dir': 'Open Long',
+                                  'startPosition': '0', 'fee': '0.02', 'closedPnl': '0', 'oid': 7, 'tid': 9,
+                                  'time': 1_700_000_000_000})
+    journal.record_position('bot-b', 'BTC', 'open', 'long', 0.5, 100.1, strategy='hull')
+    journal.close()
+
+    assert journal.get_metrics()['backlog'] == 0 and journal.errors == 0
+    signals = journal.query('signals')
+    assert [s['symbol'] for s in signals] == ['ETH', 'BTC']  # Newest first
+    assert journal.query('signals', strategy='hull')[0]['regime'] == 'trending'
+    order, = journal.query('orders', bot='bot-b', symbol='BTC')
+    assert (order['status'], order['oid'], order['avg_price'], order['latency_ms']) == ('filled', '7', 100.1, 12.5)
+    fill, = journal.query('fills', since=1_699_999_999, until=1_700_000_001)
+    assert (fill['ts'], fill['size'], fill['fee'], fill['tid']) == (1_700_000_000.0, 0.5, 0.02, '9')
+    assert journal.query('fills', since=time.time() - 60) == []
+    assert journal.query('positions', symbol='ETH') == []
+
+
+def test_query_rejects_unknown_tables_and_columns(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'trades.db'))
+    with pytest.raises(ValueError):
+        journal.query('trades')
+    with pytest.raises(ValueError):
+        journal.query('fills', strategy='hull')
@@ -0,0 +1,351 @@
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# (resolution seconds, points per compressed segment, segments kept)
+# Default: 2 hours of 1s closes, then 7 days of 1m closes
+DEFAULT_TIERS = ((1, 600, 12), (60, 240, 42))
+
+
+def resample_closes(times: np.ndarray, prices: np.ndarray, resolution: float) -> Tuple[int, np.ndarray]:
+    """
+    Last price per `resolution` bucket on a gap-free grid (empty buckets carry
+    the previous close forward). `times` must be non-decreasing.
+    Returns (first bucket index, closes).
+    """
+    buckets = np.floor_divide(times, resolution).astype(np.int64)
+    ends = np.append(np.flatnonzero(np.diff(buckets)), len(buckets) - 1)
+    buckets = buckets[ends]
+    closes = prices[ends]
+    first = int(buckets[0])
+    grid = np.arange(first, int(buckets[-1]) + 1)
+    return first, closes[np.searchsorted(buckets, grid, side='right') - 1]
+
+
+def pack_closes(values: np.ndarray) -> bytes:
+    """Lossless float64 compression: XOR with the previous value (Gorilla-style), then zlib"""
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.int64)
+    xored = np.empty_like(bits)
+    xored[0] = bits[0]
+    np.bitwise_xor(bits[1:], bits[:-1], out=xored[1:])
+    return zlib.compress(xored.tobytes(), 1)
+
+
+def unpack_closes(blob: bytes) -> np.ndarray:
+    xored = np.frombuffer(zlib.decompress(blob), dtype=np.int64)
+    return np.bitwise_xor.accumulate(xored).view(np.float64)
+
+
+@dataclass
+class Segment:
+    start: int      # First bucket index
+    count: int
+    blob: bytes
+
+    def points(self, resolution: float) -> Tuple[np.ndarray, np.ndarray]:
+        return (self.start + np.arange(self.count)) * float(resolution), unpack_closes(self.blob)
+
+
+class HistoryTier:
+    """One downsampled tier: an open (raw) buffer plus compressed, immutable segments"""
+
+    def __init__(self, resolution: float, segment_points: int, max_segments: int):
+        self.resolution = resolution
+        self.segment_points = segment_points
+        self.max_segments = max_segments
+        self.segments: deque = deque()
+        self.open_start: Optional[int] = None
+        self.open_closes = np.empty(0)
+        self.pending: Optional[Tuple[int, float]] = None  # Newest bucket - may still change
+        self.version = 0                                   # Bumped whenever the segments change
+        self.updates = 0                                   # Bumped on every ingest
+
+    def ingest(self, times: np.ndarray, prices: np.ndarray) -> List[Segment]:
+        """Fold finer, time-ordered points into this tier; returns segments aged out of it"""
+        self.updates += 1
+        if self.pending is not None:
+            times = np.concatenate(([self.pending[0] * float(self.resolution)], times))
+            prices = np.concatenate(([self.pending[1]], prices))
+        # Gaps are carried forward in full here; whatever exceeds capacity ages out below
+        first, closes = resample_closes(times, prices, self.resolution)
+
+        self.pending = (first + len(closes) - 1, float(closes[-1]))
+        finalized = closes[:-1]
+        if len(finalized):
+            if self.open_start is None or not len(self.open_closes):
+                self.open_start = first
+            self.open_closes = np.concatenate((self.open_closes, finalized))
+
+        while len(self.open_closes) >= self.segment_points:
+            self._flush(self.segment_points)
+
+        aged = []
+        while len(self.segments) > self.max_segments:
+            aged.append(self.segments.popleft())
+            self.version += 1
+        return aged
+
+    def _flush(self, count: int):
+        if count <= 0:
+            return
+        self.segments.append(Segment(self.open_start, count, pack_closes(self.open_closes[:count])))
+        self.open_closes = self.open_closes[count:].copy()
+        self.open_start += count
+        self.version += 1
+
+    def cold_points(self) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.segments:
+            return np.empty(0), np.empty(0)
+        parts = [segment.points(self.resolution) for segment in self.segments]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def recent_points(self) -> Tuple[np.ndarray, np.ndarray]:
+        times = (self.open_start + np.arange(len(self.open_closes))) * float(self.resolution) \
+            if len(self.open_closes) else np.empty(0)
+        prices = self.open_closes
+        if self.pending is not None:
+            times = np.append(times, self.pending[0] * float(self.resolution))
+            prices = np.append(prices, self.pending[1])
+        return times, prices
+
+    def earliest_time(self) -> Optional[float]:
+        if self.segments:
+            return self.segments[0].start * float(self.resolution)
+        if len(self.open_closes):
+            return self.open_start * float(self.resolution)
+        if self.pending is not None:
+            return self.pending[0] * float(self.resolution)
+        return None
+
+    def nbytes(self) -> int:
+        return sum(len(segment.blob) for segment in self.segments) + self.open_closes.nbytes
+
+
+class TieredPriceHistory:
+    """
+    Long-lookback price history for one symbol at bounded memory.
+
+    Recent raw ticks live in a hot buffer. When it fills, its older half is
+    downsampled to the first tier's resolution (last price per bucket, empty
+    buckets carried forward); every tier keeps XOR+zlib compressed segments
+    and hands its oldest ones down to the next, coarser tier. `closes()`
+    stitches the tiers into one contiguous NumPy array at any resolution the
+    data supports, so strategies can run multi-thousand-period indicators.
+    """
+
+    def __init__(self, hot_capacity: int = 8192, tiers=DEFAULT_TIERS):
+        self.hot_capacity = hot_capacity
+        self.tiers = [HistoryTier(*tier) for tier in tiers]
+        self._hot_times = np.empty(hot_capacity)
+        self._hot_prices = np.empty(hot_capacity)
+        self._hot_len = 0
+        self._cold_cache: Dict[float, tuple] = {}
+        self._view_cache: Dict[tuple, np.ndarray] = {}
+        self.appends = 0
+
+        # Metrics
+        self.evictions = 0
+        self.dropped_points = 0
+
+    def append(self, timestamp: float, price: float):
+        """Add one tick (O(1) amortized)"""
+        if self._hot_len:
+            last = self._hot_times[self._hot_len - 1]
+            if timestamp < last:
+                timestamp = last  # Never step back in time (clock adjustments)
+        if self._hot_len >= self.hot_capacity:
+            self._evict_hot()
+        self._hot_times[self._hot_len] = timestamp
+        self._hot_prices[self._hot_len] = price
+        self._hot_len += 1
+        self.appends += 1
+
+    def seed(self, times: np.ndarray, prices: np.ndarray, resolution: float):
+        """Prepend older data (e.g. candle closes) into the tier of matching resolution"""
+        earliest = self.earliest_time()
+        times = np.asarray(times, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if earliest is not None:
+            keep = times < earliest
+            times, prices = times[keep], prices[keep]
+        level = max((i for i, tier in enumerate(self.tiers) if tier.resolution <= resolution), default=None)
+        if level is None or not len(times) or self.tiers[level].earliest_time() is not None:
+            return
+        self._cascade(level, times, prices)
+        self.appends += 1
+
+    def fill_gap(self, times: np.ndarray, prices: np.ndarray) -> int:
+        """
+        Merge points into a hole inside the hot buffer (e.g. candle closes
+        backfilled after a reconnect); returns how many were merged. Points
+        outside the hot buffer's time range are skipped - older data goes
+        through seed().
+        """
+        if not self._hot_len:
+            return 0
+        times = np.asarray(times, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        hot_times = self._hot_times[:self._hot_len]
+        inside = (times > hot_times[0]) & (times < hot_times[-1])
+        times, prices = times[inside], prices[inside]
+        if not len(times):
+            return 0
+        merged_times = np.concatenate((hot_times, times))
+        merged_prices = np.concatenate((self._hot_prices[:self._hot_len], prices))
+        order = np.argsort(merged_times, kind='stable')
+        size = max(self.hot_capacity, len(order))
+        self._hot_times, self._hot_prices = np.empty(size), np.empty(size)
+        self._hot_times[:len(order)] = merged_times[order]
+        self._hot_prices[:len(order)] = merged_prices[order]
+        self._hot_len = len(order)
+        while self._hot_len >= self.hot_capacity:
+            self._evict_hot()
+        if size > self.hot_capacity:
+            self._hot_times = self._hot_times[:self.hot_capacity].copy()
+            self._hot_prices = self._hot_prices[:self.hot_capacity].copy()
+        self.appends += 1
+        return len(times)
+
+    def _evict_hot(self):
+        resolution = self.tiers[0].resolution
+        keep = self.hot_capacity // 2
+        split_bucket = np.floor_divide(self._hot_times[self._hot_len - keep], resolution)
+        # Cut on a bucket boundary so no bucket is split between the hot buffer and tier 0
+        cut = int(np.searchsorted(self._hot_times[:self._hot_len], split_bucket * resolution, side='left'))
+        if cut == 0:
+            cut = self._hot_len - keep
+        self._cascade(0, self._hot_times[:cut].copy(), self._hot_prices[:cut].copy())
+        remaining = self._hot_len - cut
+        self._hot_times[:remaining] = self._hot_times[cut:self._hot_len]
+        self._hot_prices[:remaining] = self._hot_prices[cut:self._hot_len]
+        self._hot_len = remaining
+        self.evictions += 1
+
+    def _cascade(self, level: int, times: np.ndarray, prices: np.ndarray):
+        for segment in self.tiers[level].ingest(times, prices):
+            if level + 1 < len(self.tiers):
+                self._cascade(level + 1, *segment.points(self.tiers[level].resolution))
+            else:
+                self.dropped_points += segment.count
+
+    def earliest_time(self) -> Optional[float]:
+        for tier in reversed(self.tiers):
+            earliest = tier.earliest_time()
+            if earliest is not None:
+                return earliest
+        return float(self._hot_times[0]) if self._hot_len else None
+
+    def latest_time(self) -> Optional[float]:
+        if self._hot_len:
+            return float(self._hot_times[self._hot_len - 1])
+        for tier in self.tiers:
+            if tier.pending is not None:
+                return tier.pending[0] * float(tier.resolution)
+        return None
+
+    def span(self, resolution: float) -> int:
+        """Approximate number of closed `resolution` buckets closes() can return"""
+        eligible = [tier for tier in self.tiers if tier.resolution <= resolution]
+        earliest = None
+        for tier in reversed(eligible):
+            earliest = tier.earliest_time()
+            if earliest is not None:
+                break
+        if earliest is None:
+            earliest = float(self._hot_times[0]) if self._hot_len else None
+        latest = self.latest_time()
+        if earliest is None or latest is None:
+            return 0
+        return int(latest // resolution - earliest // resolution)
+
+    def closes(self, resolution: float, periods: Optional[int] = None, closed_only: bool = True) -> np.ndarray:
+        """
+        Contiguous closes at `resolution` seconds, oldest first, from every tier
+        at least that fine plus the hot buffer. The still-forming bucket of the
+        latest tick is excluded unless closed_only=False. Read-only; cached
+        until the next append.
+        """
+        key = (resolution, periods, closed_only, self.appends)
+        cached = self._view_cache.get(key)
+        if cached is not None:
+            return cached
+
+        eligible = [tier for tier in self.tiers if tier.resolution <= resolution]
+        cold_first, cold = self._cold_closes(resolution, eligible)
+
+        # Only the finest tier's open buffer and the hot ticks change between segment rolls
+        times, prices = [], []
+        if eligible:
+            tier_times, tier_prices = eligible[0].recent_points()
+            times.append(tier_times)
+            prices.append(tier_prices)
+        times.append(self._hot_times[:self._hot_len])
+        prices.append(self._hot_prices[:self._hot_len])
+        times = np.concatenate(times)
+        prices = np.concatenate(prices)
+
+        if len(times):
+            first, recent = resample_closes(times, prices, resolution)
+            if cold_first is None:
+                result = recent
+            else:
+                cold_end = cold_first + len(cold)
+                if first < cold_end:
+                    result = np.concatenate((cold[:max(0, first - cold_first)], recent))
+                else:
+                    filler = np.full(first - cold_end, cold[-1]) if len(cold) else np.empty(0)
+                    result = np.concatenate((cold, filler, recent))
+        else:
+            result = cold if cold_first is not None else np.empty(0)
+
+        if closed_only and self._hot_len and len(result):
+            result = result[:-1]
+        if periods is not None:
+            result = result[-periods:]
+        result = np.ascontiguousarray(result)
+        result.flags.writeable = False
+
+        self._view_cache = {key: result}
+        return result
+
+    def _cold_closes(self, resolution: float, eligible: List[HistoryTier]) -> Tuple[Optional[int], np.ndarray]:
+        """
+        Resampled older data (coarser tiers in full, then the finest tier's
+        compressed segments) - only recomputed when a segment rolls
+        """
+        if not eligible:
+            return None, np.empty(0)
+        versions = (eligible[0].version,) + tuple(tier.updates for tier in eligible[1:])
+        cached = self._cold_cache.get(resolution)
+        if cached is not None and cached[0] == versions:
+            return cached[1], cached[2]
+
+        times, prices = [], []
+        for tier in reversed(eligible[1:]):
+            for tier_times, tier_prices in (tier.cold_points(), tier.recent_points()):
+                times.append(tier_times)
+                prices.append(tier_prices)
+        tier_times, tier_prices = eligible[0].cold_points()
+        times.append(tier_times)
+        prices.append(tier_prices)
+        times = np.concatenate(times) if times else np.empty(0)
+        prices = np.concatenate(prices) if prices else np.empty(0)
+        if len(times):
+            first, closes = resample_closes(times, prices, resolution)
+        else:
+            first, closes = None, np.empty(0)
+        self._cold_cache[resolution] = (versions, first, closes)
+        return first, closes
+
+    def get_metrics(self) -> Dict:
+        return {
+            'hot_ticks': self._hot_len,
+            'tiers': [{'resolution': tier.resolution, 'segments': len(tier.segments),
+                       'open': len(tier.open_closes), 'bytes': tier.nbytes()} for tier in self.tiers],
+            'memory_bytes': self._hot_times.nbytes + self._hot_prices.nbytes + sum(t.nbytes() for t in self.tiers),
+            'evictions': self.evictions,
+            'dropped_points': self.dropped_points,
+        }
@@ -0,0 +1,222 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, strategy TEXT,
+    direction TEXT, confidence REAL, entry_price REAL, stop_loss REAL, take_profit REAL, regime TEXT
+);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, strategy TEXT, action TEXT,
+    side TEXT, size REAL, price REAL, status TEXT, oid TEXT, filled_size REAL, avg_price REAL,
+    latency_ms REAL, error TEXT
+);
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, side TEXT, size REAL,
+    price REAL, fee REAL, closed_pnl REAL, direction TEXT, start_position REAL, oid TEXT, tid TEXT
+);
+CREATE TABLE IF NOT EXISTS positions (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, strategy TEXT, event TEXT,
+    side TEXT, size REAL, entry_price REAL, exit_price REAL, pnl REAL, fees REAL, reason TEXT
+);
+CREATE INDEX IF NOT EXISTS signals_symbol_ts ON signals (symbol, ts);
+CREATE INDEX IF NOT EXISTS signals_strategy_ts ON signals (strategy, ts);
+CREATE INDEX IF NOT EXISTS orders_symbol_ts ON orders (symbol, ts);
+CREATE INDEX IF NOT EXISTS orders_strategy_ts ON orders (strategy, ts);
+CREATE INDEX IF NOT EXISTS fills_symbol_ts ON fills (symbol, ts);
+CREATE INDEX IF NOT EXISTS fills_ts ON fills (ts);
+CREATE INDEX IF NOT EXISTS positions_symbol_ts ON positions (symbol, ts);
+CREATE INDEX IF NOT EXISTS positions_strategy_ts ON positions (strategy, ts);
+"""
+
+COLUMNS = {
+    'signals': ('ts', 'bot', 'symbol', 'strategy', 'direction', 'confidence', 'entry_price', 'stop_loss',
+                'take_profit', 'regime'),
+    'orders': ('ts', 'bot', 'symbol', 'strategy', 'action', 'side', 'size', 'price', 'status', 'oid',
+               'filled_size', 'avg_price', 'latency_ms', 'error'),
+    'fills': ('ts', 'bot', 'symbol', 'side', 'size', 'price', 'fee', 'closed_pnl', 'direction', 'start_position',
+              'oid', 'tid'),
+    'positions': ('ts', 'bot', 'symbol', 'strategy', 'event', 'side', 'size', 'entry_price', 'exit_price', 'pnl',
+                  'fees', 'reason'),
+}
+INSERTS = {table: f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+           for table, columns in COLUMNS.items()}
+
+
+class TradeJournal:
+    """
+    Durable journal of signals, orders, fills and position lifecycle events.
+
+    record_*() only builds a tuple and puts it on a queue - the trading loop
+    never touches the disk. A writer thread drains the queue and inserts
+    whatever accumulated (up to `batch_size` rows, or every `flush_interval`
+    seconds) in one transaction per batch. SQLite runs in WAL mode, so
+    query() and external tools can read while the bot writes.
+    """
+
+    def __init__(self, path: str = 'trade_journal.db', batch_size: int = 500, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrics
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_batch_ms = 0.0
+        self.max_batch_ms = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: durable across process crashes
+        return connection
+
+    def start(self):
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+        self._thread = threading.Thread(target=self._writer, args=(connection,), name="trade-journal", daemon=True)
+        self._thread.start()
+        logger.info("📒 Trade journal: %s", self.path)
+
+    def close(self, timeout: float = 5.0):
+        """Flush what is queued and stop the writer"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _writer(self, connection: sqlite3.Connection):
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+                while True:  # Anything queued behind the sentinel
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        batch.append(item)
+            if batch:
+                self._write(connection, batch)
+        connection.close()
+
+    def _write(self, connection: sqlite3.Connection, batch: List[tuple]):
+        started = time.perf_counter()
+        rows: Dict[str, List[tuple]] = {}
+        for table, row in batch:
+            rows.setdefault(table, []).append(row)
+        try:
+            with connection:
+                for table, table_rows in rows.items():
+                    connection.executemany(INSERTS[table], table_rows)
+            self.written += len(batch)
+            self.batches += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.error("Trade journal write failed (%s rows lost): %s", len(batch), e)
+        self.last_batch_ms = (time.perf_counter() - started) * 1000
+        self.max_batch_ms = max(self.max_batch_ms, self.last_batch_ms)
+
+    def _put(self, table: str, row: tuple):
+        self.queued += 1
+        self._queue.put((table, row))
+
+    # === RECORDING (non-blocking) ===
+
+    def record_signal(self, bot: str, signal, regime: Optional[str] = None):
+        self._put('signals', (time.time(), bot, signal.symbol, signal.strategy_used, signal.direction,
+                              signal.confidence, signal.entry_price, signal.stop_loss, signal.take_profit, regime))
+
+    def record_order(self, bot: str, symbol: str, action: str, side: str, size: float, price: Optional[float],
+                     status: Dict, strategy: Optional[str] = None, latency_ms: Optional[float] = None):
+        """`status` is a parse_order_status() result"""
+        state = 'filled' if status['filled'] else 'resting' if status['resting'] else 'rejected'
+        self._put('orders', (time.time(), bot, symbol, strategy, action, side, size, price, state,
+                             None if status['oid'] is None else str(status['oid']), status['total_sz'],
+                             status['avg_px'], latency_ms, status['error']))
+
+    def record_fill(self, bot: str, fill: Dict):
+        """One userFills entry as received from the exchange"""
+        self._put('fills', (fill.get('time', time.time() * 1000) / 1000, bot, fill['coin'], fill.get('side'),
+                            float(fill['sz']), float(fill['px']), float(fill.get('fee', 0)),
+                            float(fill.get('closedPnl', 0)), fill.get('dir'),
+                            float(fill['startPosition']) if fill.get('startPosition') is not None else None,
+                            None if fill.get('oid') is None else str(fill['oid']),
+                            None if fill.get('tid') is None else str(fill['tid'])))
+
+    def record_position(self, bot: str, symbol: str, event: str, side: str, size: float, entry_price: float,
+                        exit_price: Optional[float] = None, pnl: Optional[float] = None,
+                        fees: Optional[float] = None, strategy: Optional[str] = None, reason: Optional[str] = None):
+        """Lifecycle event: open / close / adopt / drop"""
+        self._put('positions', (time.time(), bot, symbol, strategy, event, side, size, entry_price, exit_price,
+                                pnl, fees, reason))
+
+    # === QUERIES ===
+
+    def query(self, table: str, symbol: Optional[str] = None, strategy: Optional[str] = None,
+              bot: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+              limit: int = 1000) -> List[Dict[str, Any]]:
+        """Rows by symbol / strategy / bot / time range, newest first (uses the (symbol|strategy, ts) indexes)"""
+        if table not in COLUMNS:
+            raise ValueError(f"unknown journal table '{table}'")
+        clauses, params = [], []
+        for column, value in (('symbol', symbol), ('strategy', strategy), ('bot', bot)):
+            if value is not None:
+                if column not in COLUMNS[table]:
+                    raise ValueError(f"{table} has no '{column}' column")
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        connection.row_factory = sqlite3.Row
+        try:
+            rows = connection.execute(f"SELECT * FROM {table}{where} ORDER BY ts DESC LIMIT ?",
+                                      (*params, limit)).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in rows]
+
+    def get_metrics(self) -> Dict:
+        return {
+            'queued': self.queued,
+            'written': self.written,
+            'backlog': self.queued - self.written,
+            'batches': self.batches,
+            'errors': self.errors,
+            'last_batch_ms': round(self.last_batch_ms, 2),
+            'max_batch_ms': round(self.max_batch_ms, 2),
+        }
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List
+
+from background import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+
+class FrameDeduplicator:
+    """
+    First-arrival-wins filter for frames coming from several sockets.
+
+    Byte-identical frames (the same exchange broadcast on two sockets) are
+    dropped before JSON decoding using a short time window of raw-text hashes.
+    Frames carrying an exchange timestamp are additionally kept monotonic per
+    (channel, coin), so a late copy from a slow socket can never rewind state.
+    """
+
+    def __init__(self, window_seconds: float = 5.0, max_entries: int = 4096):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._recent: OrderedDict = OrderedDict()  # hash -> arrival time
+        self._latest_time: Dict[tuple, int] = {}
+
+    def is_duplicate_raw(self, message) -> bool:
+        now = time.monotonic()
+        # Expire old hashes (OrderedDict is in arrival order)
+        while self._recent:
+            oldest_key, oldest_time = next(iter(self._recent.items()))
+            if now - oldest_time <= self.window_seconds and len(self._recent) < self.max_entries:
+                break
+            self._recent.popitem(last=False)
+
+        key = hash(message)
+        if key in self._recent:
+            return True
+        self._recent[key] = now
+        return False
+
+    def is_stale(self, data: Dict) -> bool:
+        """True if a frame with the same or newer exchange timestamp was already delivered"""
+        payload = data.get("data")
+        if not isinstance(payload, dict):
+            return False
+        exchange_time = payload.get("time")
+        if exchange_time is None:
+            return False
+        key = (data.get("channel"), payload.get("coin"))
+        if exchange_time <= self._latest_time.get(key, -1):
+            return True
+        self._latest_time[key] = exchange_time
+        return False
+
+
+class RedundantWebsocketFeed:
+    """
+    Hot-standby websocket feed: N independent connections subscribed to the
+    same channels, de-duplicated so the first arrival of every update wins.
+
+    A socket that stops receiving while its siblings are still live is treated
+    as stalled and recycled. With connections=1 this behaves like a single
+    reconnecting socket with stall detection.
+    """
+
+    def __init__(self, url: str, subscriptions: List[Dict],
+                 on_message: Callable[[Dict], Awaitable[None]],
+                 connections: int = 1, stall_timeout: float = 15.0,
+                 retry_delay: float = 1.0, max_retries: int = 3):
+        self.url = url
+        self.subscriptions = subscriptions
+        self.on_message = on_message
+        self.connections = max(1, connections)
+        self.stall_timeout = stall_timeout
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.dedup = FrameDeduplicator()
+
+        self._sockets: Dict[int, object] = {}
+        self._recycling = set()
+        self.last_frame_time: Dict[int, float] = {}
+        self.background = BackgroundTasks()
+
+        # Metrics
+        self.frames_received = {i: 0 for i in range(self.connections)}
+        self.first_arrivals = {i: 0 for i in range(self.connections)}
+        self.frames_delivered = 0
+        self.duplicates_dropped = 0
+        self.stalls_detected = 0
+        self.reconnects = 0
+
+    @property
+    def live_connections(self) -> int:
+        return len(self._sockets)
+
+    async def run(self, is_running: Callable[[], bool]):
+        """Run all connections until is_running() turns False"""
+        tasks = [asyncio.create_task(self._connection_loop(i, is_running), name=f"ws-{i}")
+                 for i in range(self.connections)]
+        tasks.append(asyncio.create_task(self._stall_watchdog(is_running), name="ws-watchdog"))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _connection_loop(self, conn_id: int, is_running: Callable[[], bool]):
+        import websockets  # Loaded with the first connection, not at import
+        retry_count = 0
+        # Stagger initial connects so the sockets don't share a failure moment
+        await asyncio.sleep(conn_id * 0.25)
+
+        while is_running():
+            try:
+                async with websockets.connect(
+                    self.url,
+                    ping_interval=30,  # Keep connection alive
+                    close_timeout=10
+                ) as websocket:
+                    for subscription in self.subscriptions:
+                        await websocket.send(json.dumps(subscription))
+                    self._sockets[conn_id] = websocket
+                    self.last_frame_time[conn_id] = time.monotonic()
+                    logger.info("Connected to Hyperliquid WebSocket [%d/%d]", conn_id + 1, self.connections)
+                    retry_count = 0  # Reset on successful connection
+
+                    async for message in websocket:
+                        if not is_running():
+                            break
+                        self.last_frame_time[conn_id] = time.monotonic()
+                        self.frames_received[conn_id] += 1
+                        await self._handle_frame(conn_id, message)
+
+            except Exception as e:
+                logger.debug("WebSocket [%s] error: %s", conn_id + 1, e)
+            finally:
+                self._sockets.pop(conn_id, None)
+                self._recycling.discard(conn_id)
+
+            if not is_running():
+                break
+
+            retry_count += 1
+            self.reconnects += 1
+            wait_time = min(60, self.retry_delay * (2 ** min(retry_count, 6)))  # Cap at 60 seconds
+            if retry_count <= self.max_retries or retry_count % 10 == 0:  # Log occasionally
+                logger.warning("🔌 WebSocket [%d] disconnected (attempt %d), retrying in %ss | %d still live",
+                               conn_id + 1, retry_count, wait_time, self.live_connections)
+            await asyncio.sleep(wait_time)
+
+    async def _handle_frame(self, conn_id: int, message):
+        if self.connections > 1 and self.dedup.is_duplicate_raw(message):
+            self.duplicates_dropped += 1
+            return
+        try:
+            data = json.loads(message)
+            if self.connections > 1 and self.dedup.is_stale(data):
+                self.duplicates_dropped += 1
+                return
+            self.first_arrivals[conn_id] += 1
+            self.frames_delivered += 1
+            await self.on_message(data)
+        except Exception as e:
+            # Individual message errors must not kill the socket
+            logger.debug("WebSocket message error: %s", e)
+
+    async def _stall_watchdog(self, is_running: Callable[[], bool]):
+        """Recycle sockets that went quiet while the feed as a whole is still flowing"""
+        while is_running():
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            freshest = max(self.last_frame_time.values(), default=now)
+            siblings_live = now - freshest < self.stall_timeout
+            for conn_id, websocket in list(self._sockets.items()):
+                if conn_id in self._recycling:
+                    continue
+                quiet_for = now - self.last_frame_time.get(conn_id, now)
+                # A lone socket, or all of them quiet for twice the timeout, is a stall too
+                stalled = quiet_for > self.stall_timeout and (siblings_live or self.connections == 1)
+                if stalled or quiet_for > 2 * self.stall_timeout:
+                    self.stalls_detected += 1
+                    self._recycling.add(conn_id)
+                    logger.warning("🔌 WebSocket [%s] stalled for %.1fs, recycling", conn_id + 1, quiet_for)
+                    self.background.spawn(websocket.close(), name=f"ws-{conn_id}-recycle")
+
+        for websocket in list(self._sockets.values()):
+            await websocket.close()
+
+    def get_metrics(self) -> Dict:
+        return {
+            'connections': self.connections,
+            'live_connections': self.live_connections,
+            'frames_received': sum(self.frames_received.values()),
+            'frames_delivered': self.frames_delivered,
+            'duplicates_dropped': self.duplicates_dropped,
+            'first_arrivals': dict(self.first_arrivals),
+            'stalls_detected': self.stalls_detected,
+            'reconnects': self.reconnects,
+        }